@@ -0,0 +1,103 @@
+"""Process-wide registry of Deep Research agents and Bing connection ids.
+
+StartResearch used to create a new agent for every job (with the user query
+baked into its instructions) and to look up the Bing grounding connection each
+time. Agents are now created once per (model deployment, deep research model,
+Bing connection id) with query-independent instructions; the query itself only
+goes into the thread message. Resolved connection ids are cached by name.
+"""
+from typing import Any, Callable, Dict, Tuple
+import logging
+import threading
+
+AGENT_NAME = "Deep Research Agent"
+AGENT_INSTRUCTIONS = (
+    "あなたは詳細な調査を行う専門的なリサーチエージェントです。\n\n"
+    "ユーザーメッセージの質問について、Deep Research toolを使用して包括的な回答を生成してください。"
+)
+
+AgentKey = Tuple[str, str, str]
+
+
+class AgentRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._agents: Dict[AgentKey, str] = {}
+        # One creation lock per key: a slow create_agent only blocks launches waiting for the same agent
+        self._creating: Dict[AgentKey, threading.Lock] = {}
+        self._connections: Dict[str, str] = {}
+        self._stats: Dict[str, int] = {
+            'agent_hits': 0,
+            'agents_created': 0,
+            'connection_hits': 0,
+            'connection_lookups': 0,
+            'invalidated': 0,
+        }
+
+    def resolve_connection_id(self, project, name: str) -> str:
+        with self._lock:
+            conn_id = self._connections.get(name)
+            if conn_id:
+                self._stats['connection_hits'] += 1
+                return conn_id
+        conn_id = project.connections.get(name=name).id
+        with self._lock:
+            self._connections[name] = conn_id
+            self._stats['connection_lookups'] += 1
+        return conn_id
+
+    def get_agent_id(self, project, model: str, deep_research_model: str, bing_connection_id: str,
+                     tool_factory: Callable[[], Any]) -> Tuple[str, bool]:
+        """Return (agent_id, created) for the key, creating the agent on first use."""
+        key = (model, deep_research_model, bing_connection_id)
+        with self._lock:
+            agent_id = self._agents.get(key)
+            if agent_id:
+                self._stats['agent_hits'] += 1
+                return agent_id, False
+            creating = self._creating.setdefault(key, threading.Lock())
+        # Concurrent launches for the same key wait here and then reuse the agent the first one created
+        with creating:
+            with self._lock:
+                agent_id = self._agents.get(key)
+                if agent_id:
+                    self._stats['agent_hits'] += 1
+                    return agent_id, False
+            agent = project.agents.create_agent(
+                model=model,
+                name=AGENT_NAME,
+                instructions=AGENT_INSTRUCTIONS,
+                tools=tool_factory().definitions
+            )
+            with self._lock:
+                self._agents[key] = agent.id
+                self._stats['agents_created'] += 1
+        logging.info(f"Created Deep Research agent {agent.id} for model={model} dr_model={deep_research_model}")
+        return agent.id, True
+
+    def invalidate_agent(self, agent_id: str):
+        with self._lock:
+            for key, val in list(self._agents.items()):
+                if val == agent_id:
+                    del self._agents[key]
+                    self._stats['invalidated'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._agents.clear()
+            self._connections.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'cached_agents': len(self._agents), 'cached_connections': len(self._connections), **self._stats}
+
+
+_registry = AgentRegistry()
+
+
+def get_agent_registry() -> AgentRegistry:
+    return _registry
+
+
+def is_not_found_error(exc: BaseException) -> bool:
+    return exc.__class__.__name__ == 'ResourceNotFoundError' or getattr(exc, 'status_code', None) == 404
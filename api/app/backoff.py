@@ -0,0 +1,154 @@
+"""Per-job run-status polling schedule.
+
+Deep Research runs take minutes, so polling every run at the same rate spends
+most Foundry calls on runs that are nowhere near done. PollSchedule decides when
+each run is due for its next remote poll:
+
+ - the delay grows by STATUS_POLL_BACKOFF_FACTOR after every poll that saw the
+   same run_status, from STATUS_POLL_MIN_DELAY_SECONDS up to STATUS_POLL_MAX_DELAY_SECONDS
+ - it is also capped at a fraction of the run's age, so young runs (which may
+   fail or finish quickly) are polled fast and completion of a short run is
+   still noticed within a few seconds
+ - an observed run_status transition resets the backoff (requires_action is
+   always polled at the minimum delay)
+ - +/- STATUS_POLL_JITTER spreads runs started together over time
+
+The background poller only polls due runs; inline-mode CheckStatus calls
+Foundry only when the run is due. retry_after() turns the schedule into the
+client hint returned by CheckStatus (``retry_after_ms`` / ``Retry-After``).
+
+Tunables (env / Key Vault):
+ - STATUS_POLL_MIN_DELAY_SECONDS   (default: 3)
+ - STATUS_POLL_MAX_DELAY_SECONDS   (default: 20)
+ - STATUS_POLL_BACKOFF_FACTOR      (default: 1.5)
+ - STATUS_POLL_JITTER              (default: 0.2)  fraction of the delay
+"""
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import random
+import threading
+import time
+
+from .config import get_float_config
+
+TERMINAL_STATUSES = ('completed', 'failed')
+AGE_RATIO = 0.1        # delay never exceeds this fraction of the run's age
+CLIENT_MARGIN = 1.0    # seconds a client hint trails the next server-side poll
+MAX_TRACKED = 10000
+
+
+def _age_seconds(created_at: Any, now: datetime) -> Optional[float]:
+    if not created_at:
+        return None
+    try:
+        if isinstance(created_at, datetime):
+            dt = created_at
+        else:
+            dt = datetime.fromisoformat(str(created_at).replace('Z', '').replace(' ', 'T'))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return max(0.0, (now - dt).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class PollSchedule:
+    def __init__(self, min_delay: Optional[float] = None, max_delay: Optional[float] = None,
+                 factor: Optional[float] = None, jitter: Optional[float] = None):
+        self.min_delay = max(0.5, min_delay if min_delay is not None else get_float_config('STATUS_POLL_MIN_DELAY_SECONDS', 3.0))
+        self.max_delay = max(self.min_delay, max_delay if max_delay is not None else get_float_config('STATUS_POLL_MAX_DELAY_SECONDS', 20.0))
+        self.factor = max(1.0, factor if factor is not None else get_float_config('STATUS_POLL_BACKOFF_FACTOR', 1.5))
+        self.jitter = min(0.5, max(0.0, jitter if jitter is not None else get_float_config('STATUS_POLL_JITTER', 0.2)))
+        self._lock = threading.Lock()
+        # job_id -> {'run_status', 'streak' (polls since last transition), 'next_due' (monotonic)}
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._stats = {'observed': 0, 'transitions': 0}
+
+    def delay(self, streak: int, run_status: Optional[str], age: Optional[float]) -> float:
+        """Seconds until the next poll after ``streak`` polls without a status change (no jitter)."""
+        if run_status == 'requires_action':
+            return self.min_delay
+        delay = self.min_delay * (self.factor ** max(0, streak))
+        if age is not None:
+            delay = min(delay, age * AGE_RATIO)
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def observe(self, job: Dict[str, Any], run_status: Optional[str]) -> float:
+        """Record a poll result; returns the delay until the job is due again.
+        A None run_status (failed poll) keeps backing off on the last known status."""
+        job_id = job['id']
+        now = time.monotonic()
+        age = _age_seconds(job.get('created_at'), datetime.now(timezone.utc))
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if run_status is None and entry is not None:
+                run_status = entry['run_status']
+            if entry is None or entry['run_status'] != run_status:
+                if entry is not None:
+                    self._stats['transitions'] += 1
+                entry = {'run_status': run_status, 'streak': 0, 'next_due': now}
+            else:
+                entry['streak'] += 1
+            delay = self.delay(entry['streak'], run_status, age)
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+            entry['next_due'] = now + delay
+            self._entries[job_id] = entry
+            self._entries.move_to_end(job_id)
+            while len(self._entries) > MAX_TRACKED:
+                self._entries.popitem(last=False)
+            self._stats['observed'] += 1
+        return delay
+
+    def is_due(self, job_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(job_id)
+            return entry is None or time.monotonic() >= entry['next_due']
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the earliest tracked job is due (None when nothing is tracked)."""
+        with self._lock:
+            if not self._entries:
+                return None
+            return max(0.0, min(e['next_due'] for e in self._entries.values()) - time.monotonic())
+
+    def retry_after(self, job: Dict[str, Any], margin: float = CLIENT_MARGIN) -> Optional[float]:
+        """Seconds a client should wait before asking again; None once the job is terminal."""
+        if job.get('status') in TERMINAL_STATUSES:
+            return None
+        with self._lock:
+            entry = self._entries.get(job.get('id'))
+            if entry is None:
+                return self.min_delay
+            return max(self.min_delay, entry['next_due'] - time.monotonic() + margin)
+
+    def forget(self, job_id: str):
+        with self._lock:
+            self._entries.pop(job_id, None)
+
+    def retain(self, job_ids):
+        """Drop entries of jobs no longer polled (finished, deleted or handled elsewhere)."""
+        keep = set(job_ids)
+        with self._lock:
+            for job_id in [j for j in self._entries if j not in keep]:
+                del self._entries[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'scheduled': len(self._entries), 'min_delay_seconds': self.min_delay,
+                    'max_delay_seconds': self.max_delay, 'backoff_factor': self.factor,
+                    'jitter': self.jitter, **self._stats}
+
+
+_schedule: Optional[PollSchedule] = None
+_schedule_lock = threading.Lock()
+
+
+def get_poll_schedule() -> PollSchedule:
+    """Process-wide schedule shared by the background poller and inline CheckStatus."""
+    global _schedule
+    if _schedule is None:
+        with _schedule_lock:
+            if _schedule is None:
+                _schedule = PollSchedule()
+    return _schedule
@@ -0,0 +1,130 @@
+"""Process-wide AIProjectClient factory.
+
+DeepResearchService and StatusService used to build a fresh DefaultAzureCredential
+and AIProjectClient per call, re-running the credential chain and opening new
+HTTPS connections every time. This module keeps one client per endpoint, all of
+them sharing a single credential (and therefore its token cache) and a single
+HTTP transport (and therefore its connection pool). Clients are rebuilt after
+PROJECT_CLIENT_MAX_AGE_SECONDS or when invalidated after an auth failure.
+
+For offline benchmarks/local dev, a different constructor can be swapped in via
+set_project_client_factory(lambda endpoint: FakeClient(...)).
+
+Tunables (env / Key Vault):
+ - PROJECT_CLIENT_MAX_AGE_SECONDS   (default: 3600)
+ - FOUNDRY_HTTP_POOL_SIZE           (default: 16)  connections kept per host
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+from .config import get_int_config
+
+try:
+    from azure.ai.projects import AIProjectClient
+    from azure.identity import DefaultAzureCredential
+except Exception:  # pragma: no cover - libs may not be installed in all envs
+    AIProjectClient = None  # type: ignore
+    DefaultAzureCredential = None  # type: ignore
+
+try:
+    import requests
+    from azure.core.pipeline.transport import RequestsTransport
+except Exception:  # pragma: no cover
+    requests = None  # type: ignore
+    RequestsTransport = None  # type: ignore
+
+_lock = threading.Lock()
+_credential: Any = None
+_transport: Any = None
+_clients: Dict[str, Tuple[Any, float]] = {}
+_custom_factory: Optional[Callable[[str], Any]] = None
+_max_age: Optional[int] = None
+_stats: Dict[str, int] = {'created': 0, 'hits': 0, 'expired': 0, 'invalidated': 0}
+
+
+def _shared_credential():
+    global _credential
+    if _credential is None:
+        _credential = DefaultAzureCredential()
+    return _credential
+
+
+def _shared_transport():
+    global _transport
+    if _transport is None and RequestsTransport is not None and requests is not None:
+        pool_size = max(1, get_int_config('FOUNDRY_HTTP_POOL_SIZE', 16))
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        # session_owner=False: a client being dropped/closed must not tear down the shared pool
+        _transport = RequestsTransport(session=session, session_owner=False)
+    return _transport
+
+
+def _default_factory(endpoint: str):
+    kwargs: Dict[str, Any] = {}
+    transport = _shared_transport()
+    if transport is not None:
+        kwargs['transport'] = transport
+    return AIProjectClient(endpoint=endpoint, credential=_shared_credential(), **kwargs)
+
+
+def project_clients_available() -> bool:
+    return _custom_factory is not None or (AIProjectClient is not None and DefaultAzureCredential is not None)
+
+
+def get_project_client(endpoint: str):
+    """Return the cached client for ``endpoint`` (None if the SDK is unavailable)."""
+    if not project_clients_available():
+        return None
+    global _max_age
+    if _max_age is None:
+        _max_age = get_int_config('PROJECT_CLIENT_MAX_AGE_SECONDS', 3600)
+    max_age = _max_age
+    now = time.monotonic()
+    with _lock:
+        entry = _clients.get(endpoint)
+        if entry is not None:
+            client, created = entry
+            if max_age <= 0 or now - created < max_age:
+                _stats['hits'] += 1
+                return client
+            _stats['expired'] += 1
+            logging.info(f"Project client for {endpoint} expired; rebuilding")
+        factory = _custom_factory or _default_factory
+        client = factory(endpoint)
+        _clients[endpoint] = (client, now)
+        _stats['created'] += 1
+        return client
+
+
+def invalidate_project_client(endpoint: Optional[str] = None):
+    """Drop cached client(s) so the next call rebuilds them (e.g. after an auth error)."""
+    global _credential
+    with _lock:
+        if endpoint is None:
+            _stats['invalidated'] += len(_clients)
+            _clients.clear()
+            _credential = None
+        elif _clients.pop(endpoint, None) is not None:
+            _stats['invalidated'] += 1
+
+
+def set_project_client_factory(factory: Optional[Callable[[str], Any]]):
+    """Swap the client constructor (e.g. with a local fake); None restores the SDK default."""
+    global _custom_factory
+    with _lock:
+        _custom_factory = factory
+        _clients.clear()
+
+
+def is_auth_error(exc: BaseException) -> bool:
+    return exc.__class__.__name__ in ('ClientAuthenticationError', 'CredentialUnavailableError')
+
+
+def get_client_stats() -> Dict[str, Any]:
+    with _lock:
+        return {'cached_endpoints': len(_clients), **_stats}
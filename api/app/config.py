@@ -0,0 +1,50 @@
+"""Typed accessors for runtime tunables.
+
+Values are resolved through shared.settings.get_config (Key Vault first, then
+environment) and parsed leniently: malformed values fall back to the default
+instead of failing app startup.
+"""
+from typing import Optional
+import logging
+
+try:
+    from shared.settings import get_config, prefetch_config, get_settings_stats  # type: ignore
+except Exception:  # pragma: no cover
+    from DeepResearchFunctionApp.shared.settings import get_config, prefetch_config, get_settings_stats  # type: ignore
+
+
+def get_str_config(name: str, default: Optional[str] = None) -> Optional[str]:
+    val = get_config(name, default)
+    if val is None:
+        return default
+    val = str(val).strip()
+    return val or default
+
+
+def get_int_config(name: str, default: int) -> int:
+    val = get_str_config(name)
+    if val is None:
+        return default
+    try:
+        return int(val)
+    except ValueError:
+        logging.warning(f"Invalid integer for {name}={val!r}; using default {default}")
+        return default
+
+
+def get_float_config(name: str, default: float) -> float:
+    val = get_str_config(name)
+    if val is None:
+        return default
+    try:
+        return float(val)
+    except ValueError:
+        logging.warning(f"Invalid number for {name}={val!r}; using default {default}")
+        return default
+
+
+def get_bool_config(name: str, default: bool) -> bool:
+    val = get_str_config(name)
+    if val is None:
+        return default
+    return val.lower() not in ('0', 'false', 'no', 'off')
@@ -0,0 +1,54 @@
+"""In-process job change notifications.
+
+Writers that persist job changes (status poller, launch workers, endpoints)
+call notify(job_id); SSE streams subscribe() once, clear the event before each
+read of the job store and wait on it afterwards, so a change landing between
+the read and the wait is never lost. notify() may be called from worker
+threads; wakeups are marshalled onto the event loop bound at startup.
+"""
+from typing import Dict, Optional, Set
+import asyncio
+
+
+class JobChangeNotifier:
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def notify(self, job_id: str):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake(job_id)
+        else:
+            loop.call_soon_threadsafe(self._wake, job_id)
+
+    def _wake(self, job_id: str):
+        for ev in self._waiters.get(job_id, ()):
+            ev.set()
+
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        ev = asyncio.Event()
+        self._waiters.setdefault(job_id, set()).add(ev)
+        return ev
+
+    def unsubscribe(self, job_id: str, ev: asyncio.Event):
+        waiters = self._waiters.get(job_id)
+        if waiters is not None:
+            waiters.discard(ev)
+            if not waiters:
+                self._waiters.pop(job_id, None)
+
+    def listener_count(self) -> int:
+        return sum(len(v) for v in self._waiters.values())
+
+
+job_events = JobChangeNotifier()
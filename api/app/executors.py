@@ -0,0 +1,77 @@
+"""Dedicated thread pools for blocking calls made from async code.
+
+The job backends (sqlite3, Cosmos SDK) and the Azure AI Foundry SDK are
+synchronous. Handlers and background tasks never call them on the event loop;
+they await run_in_store / run_in_foundry instead. The two pools are separate so
+that slow Foundry calls (run creation, polling, message reads) can saturate
+their own workers without starving the fast job-store reads behind ListJobs,
+CheckStatus and the SSE streams (asyncio.to_thread would share one default pool).
+
+Tunables (env / Key Vault):
+ - JOB_STORE_WORKERS   (default: 8)   threads (= SQLite connections) for job store calls
+ - FOUNDRY_WORKERS     (default: 16)  concurrent blocking Foundry calls
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import contextvars
+import functools
+import threading
+
+from .config import get_int_config
+
+_lock = threading.Lock()
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_active: Dict[str, int] = {'store': 0, 'foundry': 0}
+_SIZES = {'store': ('JOB_STORE_WORKERS', 8), 'foundry': ('FOUNDRY_WORKERS', 16)}
+
+
+def _pool(name: str) -> ThreadPoolExecutor:
+    pool = _pools.get(name)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(name)
+            if pool is None:
+                key, default = _SIZES[name]
+                pool = _pools[name] = ThreadPoolExecutor(max_workers=max(1, get_int_config(key, default)),
+                                                         thread_name_prefix=f'{name}-io')
+    return pool
+
+
+async def _run(name: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    _active[name] += 1
+    try:
+        return await loop.run_in_executor(_pool(name), call)
+    finally:
+        _active[name] -= 1
+
+
+async def run_in_store(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    return await _run('store', fn, *args, **kwargs)
+
+
+async def run_in_foundry(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    return await _run('foundry', fn, *args, **kwargs)
+
+
+def shutdown_executors(wait: bool = False):
+    """Stop both pools (lifespan shutdown); they are recreated on next use."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def executor_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = {}
+    for name, (key, default) in _SIZES.items():
+        pool: Optional[ThreadPoolExecutor] = _pools.get(name)
+        stats[name] = {
+            'workers': pool._max_workers if pool is not None else None,
+            'in_flight': _active[name],
+            'queued': pool._work_queue.qsize() if pool is not None else 0,
+        }
+    return stats
@@ -0,0 +1,209 @@
+"""Read-through cache in front of a job backend.
+
+CheckStatus, GetResult, DeleteJob and the SSE stream re-read the same job (and
+its steps) many times per poll; on Cosmos every miss is a request unit charge.
+CachedJobManager keeps recent jobs and step lists in an LRU and passes every
+other call through to the wrapped backend:
+
+ - every mutating method invalidates the job's entries after the write
+   (write-through), so callers in this process always see their own writes
+ - entries for non-terminal jobs expire after JOB_CACHE_TTL_SECONDS, which bounds
+   staleness for writes made by other instances
+ - completed / failed jobs do not change any more and are kept until evicted
+   (or until this process writes to them, e.g. citations or messages added after completion)
+
+A read that raced with a write is not stored (per-job generation check), so a
+slow miss can never re-populate the cache with data older than the write.
+
+Tunables (env / Key Vault):
+ - JOB_CACHE_ENABLED      (default: true)
+ - JOB_CACHE_SIZE         (default: 2048) cached jobs (step lists are bounded the same)
+ - JOB_CACHE_TTL_SECONDS  (default: 5)    lifetime of non-terminal entries
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+
+from .config import get_bool_config, get_float_config, get_int_config
+
+try:
+    from shared.projection import resolve_fields  # type: ignore
+except Exception:  # pragma: no cover
+    from DeepResearchFunctionApp.shared.projection import resolve_fields  # type: ignore
+
+TERMINAL_STATUSES = ('completed', 'failed')
+_MISSING = object()
+
+
+class _LRU:
+    """OrderedDict LRU of key -> (value, expires_at or None = no expiry)."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self.items: 'OrderedDict[str, Tuple[Any, Optional[float]]]' = OrderedDict()
+
+    def get(self, key: str, now: float):
+        entry = self.items.get(key)
+        if entry is None:
+            return _MISSING, False
+        value, expires_at = entry
+        if expires_at is not None and now >= expires_at:
+            del self.items[key]
+            return _MISSING, True
+        self.items.move_to_end(key)
+        return value, False
+
+    def put(self, key: str, value: Any, expires_at: Optional[float]):
+        self.items[key] = (value, expires_at)
+        self.items.move_to_end(key)
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+
+class CachedJobManager:
+    """Caching decorator for a JobManager (see module docstring)."""
+
+    _MUTATORS = ('delete_job', 'update_job_status', 'update_job_result', 'update_job_error',
+                 'add_job_step', 'add_job_steps', 'add_job_citations', 'add_job_messages')
+
+    def __init__(self, backend: Any, size: int = 2048, ttl_seconds: float = 5.0):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._jobs = _LRU(size)
+        self._steps = _LRU(size)
+        self._gens: 'OrderedDict[str, int]' = OrderedDict()  # job_id -> write generation
+        self._gen_seq = 0
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'step_hits': 0, 'step_misses': 0,
+                       'invalidations': 0, 'discarded': 0}
+        for name in self._MUTATORS:
+            if hasattr(backend, name):
+                setattr(self, name, self._write_through(name))
+
+    def __getattr__(self, name: str):
+        # Everything not cached here (lists, counts, results, citations, get_stats, close...) passes through
+        return getattr(self.backend, name)
+
+    # --- invalidation ------------------------------------------------------------------
+    def _write_through(self, name: str):
+        method = getattr(self.backend, name)
+
+        def call(job_id: str, *args: Any, **kwargs: Any):
+            try:
+                return method(job_id, *args, **kwargs)
+            finally:
+                self.invalidate(job_id)
+        call.__name__ = name
+        return call
+
+    def invalidate(self, job_id: str):
+        with self._lock:
+            self._jobs.items.pop(job_id, None)
+            self._steps.items.pop(job_id, None)
+            self._gen_seq += 1
+            self._gens[job_id] = self._gen_seq
+            self._gens.move_to_end(job_id)
+            while len(self._gens) > self._jobs.size * 2:
+                self._gens.popitem(last=False)
+            self._stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._jobs.items.clear()
+            self._steps.items.clear()
+
+    def _expiry(self, job: Optional[Dict[str, Any]], now: float) -> Optional[float]:
+        if job is not None and job.get('status') in TERMINAL_STATUSES:
+            return None
+        return now + self.ttl_seconds
+
+    # --- cached reads ------------------------------------------------------------------
+    def _cached_job(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            job, expired = self._jobs.get(job_id, now)
+            if job is not _MISSING:
+                self._stats['hits'] += 1
+                return job
+            self._stats['expired' if expired else 'misses'] += 1
+            gen = self._gens.get(job_id)
+        job = self.backend.get_job(job_id, user_id=user_id)
+        with self._lock:
+            if self._gens.get(job_id) != gen:
+                self._stats['discarded'] += 1  # written meanwhile; do not cache what may be older
+            elif job is not None:
+                self._jobs.put(job_id, job, self._expiry(job, now))
+        return job
+
+    def get_job(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        job = self._cached_job(job_id, user_id)
+        return dict(job) if job is not None else None
+
+    def get_jobs_by_ids(self, job_ids: List[str], user_id: Optional[str] = None, fields: Any = None) -> List[Dict[str, Any]]:
+        """Cached jobs are answered locally; the misses go to the backend in one call."""
+        columns = resolve_fields(fields)
+        now = time.monotonic()
+        ids = list(dict.fromkeys(job_ids))
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for job_id in ids:
+                job, expired = self._jobs.get(job_id, now)
+                if job is not _MISSING:
+                    self._stats['hits'] += 1
+                    found[job_id] = job
+                else:
+                    self._stats['expired' if expired else 'misses'] += 1
+            gens = {job_id: self._gens.get(job_id) for job_id in ids if job_id not in found}
+        if gens:
+            fetched = self.backend.get_jobs_by_ids(list(gens), user_id=user_id, fields=fields)
+            with self._lock:
+                for job in fetched:
+                    found[job['id']] = job
+                    # Only whole rows can stand in for get_job
+                    if columns is None and self._gens.get(job['id']) == gens.get(job['id']):
+                        self._jobs.put(job['id'], job, self._expiry(job, now))
+        return [{c: found[i].get(c) for c in columns} if columns else dict(found[i]) for i in ids if i in found]
+
+    def get_job_version(self, job_id: str) -> Optional[int]:
+        job = self._cached_job(job_id)
+        return job.get('version') if job is not None else None
+
+    def get_job_run_id(self, job_id: str) -> Optional[str]:
+        job = self._cached_job(job_id)
+        return job.get('run_id') if job is not None else None
+
+    def get_job_steps(self, job_id: str) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            steps, _ = self._steps.get(job_id, now)
+            if steps is not _MISSING:
+                self._stats['step_hits'] += 1
+                return [dict(s) for s in steps]
+            self._stats['step_misses'] += 1
+            gen = self._gens.get(job_id)
+            job, _ = self._jobs.get(job_id, now)
+        steps = self.backend.get_job_steps(job_id)
+        with self._lock:
+            if self._gens.get(job_id) != gen:
+                self._stats['discarded'] += 1
+            else:
+                # Steps of a finished job are as immutable as the job itself
+                self._steps.put(job_id, steps, self._expiry(job if job is not _MISSING else None, now))
+        return [dict(s) for s in steps]
+
+    def cache_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses'] + self._stats['expired']
+            return {'size': len(self._jobs.items), 'steps_size': len(self._steps.items), 'max_size': self._jobs.size,
+                    'ttl_seconds': self.ttl_seconds,
+                    'terminal': sum(1 for _, exp in self._jobs.items.values() if exp is None),
+                    'hit_rate': round(self._stats['hits'] / lookups, 3) if lookups else None, **self._stats}
+
+
+def wrap_job_manager(backend: Any) -> Any:
+    """Apply the cache unless JOB_CACHE_ENABLED is off."""
+    if not get_bool_config('JOB_CACHE_ENABLED', True):
+        return backend
+    return CachedJobManager(backend, size=get_int_config('JOB_CACHE_SIZE', 2048),
+                            ttl_seconds=get_float_config('JOB_CACHE_TTL_SECONDS', 5.0))
@@ -0,0 +1,72 @@
+"""Async job-manager interface used by the FastAPI app.
+
+JobManager describes the (synchronous) contract every storage backend in
+shared/ implements. AsyncJobManager wraps one so that each call is awaited on
+the job-store executor (app/executors.py) instead of blocking the event loop:
+
+    jobs = get_async_job_manager()
+    job = await jobs.get_job(job_id, user_id=...)
+
+Services that run entirely on worker threads (DeepResearchService,
+StatusService) keep using the synchronous backend via ``jobs.backend``.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from .executors import run_in_store
+from .storage import get_job_manager
+
+
+class JobManager(Protocol):
+    def create_job(self, query: str, user_id: str, idempotency_key: Optional[str] = None,
+                   query_hash: Optional[str] = None, key_created_after: Optional[str] = None) -> str: ...
+    def delete_job(self, job_id: str) -> None: ...
+    def get_job(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]: ...
+    def get_job_by_idempotency_key(self, user_id: str, idempotency_key: str,
+                                   created_after: Optional[str] = None) -> Optional[Dict[str, Any]]: ...
+    def get_latest_completed_job(self, user_id: str, query_hash: str,
+                                 completed_after: Optional[str] = None) -> Optional[Dict[str, Any]]: ...
+    def get_jobs_by_ids(self, job_ids: List[str], user_id: Optional[str] = None,
+                        fields: Any = None) -> List[Dict[str, Any]]: ...
+    def get_job_result(self, job_id: str) -> Optional[str]: ...
+    def get_job_version(self, job_id: str) -> Optional[int]: ...
+    def get_jobs(self, user_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50,
+                 fields: Any = None) -> List[Dict[str, Any]]: ...
+    def get_jobs_page(self, user_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50,
+                      cursor: Optional[str] = None, fields: Any = None) -> Tuple[List[Dict[str, Any]], Optional[str]]: ...
+    def count_jobs_by_status(self, user_id: Optional[str] = None) -> Dict[str, int]: ...
+    def update_job_status(self, job_id: str, status: str, current_step: Optional[str] = None,
+                          thread_id: Optional[str] = None, run_id: Optional[str] = None,
+                          agent_id: Optional[str] = None) -> None: ...
+    def update_job_result(self, job_id: str, result: str, current_step: Optional[str] = None) -> None: ...
+    def update_job_error(self, job_id: str, error_message: str) -> None: ...
+    def add_job_step(self, job_id: str, step_name: str, step_details: Optional[str] = None) -> None: ...
+    def add_job_steps(self, job_id: str, steps: List[Tuple[str, Optional[str]]]) -> None: ...
+    def get_job_steps(self, job_id: str) -> List[Dict[str, Any]]: ...
+    def add_job_citations(self, job_id: str, citations: List[Dict[str, Any]]) -> int: ...
+    def get_job_citations(self, job_id: str) -> List[Dict[str, Any]]: ...
+    def add_job_messages(self, job_id: str, messages: List[Dict[str, Any]]) -> int: ...
+    def get_job_messages(self, job_id: str, since_message_id: Optional[str] = None) -> List[Dict[str, Any]]: ...
+
+
+class AsyncJobManager:
+    """Awaitable facade over a JobManager; every method runs on the job-store executor."""
+
+    def __init__(self, backend: JobManager):
+        self.backend = backend
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.backend, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await run_in_store(attr, *args, **kwargs)
+        call.__name__ = name
+        setattr(self, name, call)  # resolve each method once
+        return call
+
+
+@lru_cache
+def get_async_job_manager() -> AsyncJobManager:
+    return AsyncJobManager(get_job_manager())
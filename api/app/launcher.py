@@ -0,0 +1,390 @@
+"""Admission control and in-process launch queue for StartResearch.
+
+Every Deep Research run holds Foundry quota until it finishes, so the number of
+concurrently active runs (jobs in ``starting`` / ``in_progress``) is capped
+globally and per user. A submission that does not fit is persisted with status
+``queued`` and dispatched as slots free up: pending launches are kept per user
+and served round-robin, so one user's burst cannot starve the others. Worker
+tasks then run DeepResearchService.launch (connection lookup, agent, thread,
+message, run), which records each launch step on the job.
+
+Active runs are counted from the job store (so runs finished by the poller, by
+inline CheckStatus or by another replica free their slot) plus launches this
+process has admitted but not yet recorded. The dispatcher re-checks on every
+submit / finished run and at least every START_RESEARCH_RECHECK_SECONDS.
+Orphans never hold a slot for good: a job created more than
+START_RESEARCH_MAX_RUN_AGE_SECONDS ago (e.g. an in_progress run whose polls keep
+failing) is not counted, nor is a ``starting`` job this process is not launching
+that has stayed ``starting`` for START_RESEARCH_LAUNCH_TIMEOUT_SECONDS.
+
+In async mode (and in sync mode when no slot is free) StartResearch only
+creates the job and enqueues it here, then returns 202 with the job id. The
+queue is bounded: when full, StartResearch answers 503 instead of accepting
+unbounded work. Jobs still queued at shutdown stay ``queued``; with
+START_RESEARCH_RECOVER_QUEUED they are picked up again at the next start (launch
+options other than the query fall back to the defaults). Recovery also fails
+jobs left ``starting`` without a run_id (launch interrupted by a crash or
+restart), but only once they are still in that state START_RESEARCH_LAUNCH_TIMEOUT_SECONDS
+later, so launches in flight on other replicas are left alone. A worker only
+launches a job that is still ``queued`` in the store. Recovery is off by
+default: with several processes sharing one store, turn it on in one only.
+
+Tunables (env / Key Vault):
+ - START_RESEARCH_MODE                     (default: sync)  sync | async
+                                            ("Prefer: respond-async" opts in per request)
+ - START_RESEARCH_QUEUE_SIZE               (default: 100)
+ - START_RESEARCH_WORKERS                  (default: 2)    concurrent launch calls
+ - START_RESEARCH_MAX_ACTIVE_RUNS          (default: 10)   0 = unlimited
+ - START_RESEARCH_MAX_ACTIVE_RUNS_PER_USER (default: 3)    0 = unlimited
+ - START_RESEARCH_RECHECK_SECONDS          (default: 5)
+ - START_RESEARCH_RECOVER_QUEUED           (default: false)
+ - START_RESEARCH_MAX_RUN_AGE_SECONDS      (default: 10800) 0 = no limit
+ - START_RESEARCH_LAUNCH_TIMEOUT_SECONDS   (default: 300)
+"""
+from collections import Counter, OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Optional
+import asyncio
+import logging
+import time
+import uuid
+
+from .config import get_bool_config, get_float_config, get_int_config
+from .executors import run_in_foundry
+from .jobs import AsyncJobManager
+from .research import DeepResearchService
+from .events import job_events
+
+ACTIVE_RUN_STATUSES = ('starting', 'in_progress')
+ACTIVE_SCAN_LIMIT = 1000
+
+
+class ResearchLauncher:
+    def __init__(self, jobs: AsyncJobManager, queue_size: Optional[int] = None, workers: Optional[int] = None,
+                 max_active: Optional[int] = None, max_active_per_user: Optional[int] = None):
+        self.jobs = jobs
+        self.queue_size = max(1, queue_size if queue_size is not None else get_int_config('START_RESEARCH_QUEUE_SIZE', 100))
+        self.worker_count = max(1, workers if workers is not None else get_int_config('START_RESEARCH_WORKERS', 2))
+        self.max_active = max(0, max_active if max_active is not None else get_int_config('START_RESEARCH_MAX_ACTIVE_RUNS', 10))
+        self.max_active_per_user = max(0, max_active_per_user if max_active_per_user is not None
+                                       else get_int_config('START_RESEARCH_MAX_ACTIVE_RUNS_PER_USER', 3))
+        self.recheck_seconds = max(0.5, get_float_config('START_RESEARCH_RECHECK_SECONDS', 5.0))
+        self.max_run_age = max(0.0, get_float_config('START_RESEARCH_MAX_RUN_AGE_SECONDS', 10800.0))
+        self.launch_timeout = max(1.0, get_float_config('START_RESEARCH_LAUNCH_TIMEOUT_SECONDS', 300.0))
+        # user_id -> pending launches (oldest first); key order is the round-robin order
+        self._pending: 'OrderedDict[str, Deque[Dict[str, Any]]]' = OrderedDict()
+        self._depth = 0
+        # job id (or sync reservation token) -> user_id: admitted but maybe not yet active in the store
+        self._reserved: Dict[str, str] = {}
+        # 'starting' job launched elsewhere -> monotonic time this process first saw it starting
+        self._starting_seen: Dict[str, float] = {}
+        # 'starting' jobs without a run found at recovery -> monotonic time to fail them if still unchanged
+        self._interrupted_due: Dict[str, float] = {}
+        self._positions: Optional[Dict[str, int]] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._launches: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._admit_lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._busy = 0
+        self._last_active = 0
+        self._last_stale = 0
+        self._counters: Dict[str, int] = {'enqueued': 0, 'rejected': 0, 'launched': 0, 'failed': 0, 'cancelled': 0,
+                                          'admitted_inline': 0, 'deferred_inline': 0, 'dispatched': 0, 'recovered': 0,
+                                          'interrupted': 0, 'skipped': 0}
+
+    def start(self):
+        if self._dispatcher is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._admit_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.worker_count)
+        self._dispatcher = asyncio.create_task(self._run(), name='research-dispatcher')
+        logging.info(f"ResearchLauncher started (workers={self.worker_count}, queue_size={self.queue_size}, "
+                     f"max_active={self.max_active}, max_active_per_user={self.max_active_per_user})")
+
+    async def stop(self):
+        tasks = [t for t in (self._dispatcher, *self._launches) if t is not None]
+        self._dispatcher = None
+        for t in tasks:
+            t.cancel()
+        for t in tasks:
+            try:
+                await t
+            except asyncio.CancelledError:
+                pass
+        # Pending launches stay persisted as 'queued'; the next start recovers them
+        self._counters['cancelled'] += self._depth
+        self._pending.clear()
+        self._depth = 0
+        self._positions = None
+        logging.info("ResearchLauncher stopped")
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None
+
+    def wake(self):
+        """Re-check admission now (a run finished or a job was deleted). Safe from any thread."""
+        loop, wakeup = self._loop, self._wakeup
+        if wakeup is None or loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def is_full(self) -> bool:
+        return not self.running or self._depth >= self.queue_size
+
+    def submit(self, job_id: str, query: str, user_id: Optional[str] = None, **options: Any) -> bool:
+        """Enqueue a launch; False if the queue is full or the launcher is not running."""
+        if self.is_full():
+            self._counters['rejected'] += 1
+            return False
+        self._push({'job_id': job_id, 'query': query, 'user_id': user_id, **options})
+        self._counters['enqueued'] += 1
+        self.wake()
+        return True
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a pending launch (job deleted while queued)."""
+        for user, q in list(self._pending.items()):
+            for item in q:
+                if item['job_id'] == job_id:
+                    q.remove(item)
+                    if not q:
+                        del self._pending[user]
+                    self._depth -= 1
+                    self._positions = None
+                    self._counters['cancelled'] += 1
+                    return True
+        return False
+
+    def _push(self, item: Dict[str, Any]):
+        self._pending.setdefault(item.get('user_id') or 'anonymous', deque()).append(item)
+        self._depth += 1
+        self._positions = None
+
+    # --- admission -------------------------------------------------------
+    async def _active_runs(self) -> Dict[str, str]:
+        """job id -> user_id of runs holding a slot: active in the store (orphans excluded) plus admitted launches."""
+        active: Dict[str, str] = {}
+        oldest = ''
+        if self.max_run_age > 0:
+            oldest = (datetime.utcnow() - timedelta(seconds=self.max_run_age)).replace(microsecond=0).isoformat() + 'Z'
+        now = time.monotonic()
+        starting_seen: Dict[str, float] = {}
+        stale = 0
+        for status in ACTIVE_RUN_STATUSES:
+            for job in await self.jobs.get_jobs(user_id=None, status=status, limit=ACTIVE_SCAN_LIMIT,
+                                                fields=('id', 'user_id', 'created_at')):
+                job_id = job['id']
+                if str(job.get('created_at') or '').replace(' ', 'T') < oldest:
+                    stale += 1
+                    continue
+                if status == 'starting' and job_id not in self._reserved:
+                    seen = starting_seen[job_id] = self._starting_seen.get(job_id, now)
+                    if now - seen > self.launch_timeout:
+                        stale += 1
+                        continue
+                active[job_id] = job.get('user_id') or 'anonymous'
+        self._starting_seen = starting_seen
+        active.update(self._reserved)
+        self._last_active = len(active)
+        self._last_stale = stale
+        return active
+
+    def _has_room(self, total: int, user_total: int) -> bool:
+        return ((self.max_active <= 0 or total < self.max_active)
+                and (self.max_active_per_user <= 0 or user_total < self.max_active_per_user))
+
+    async def reserve(self, user_id: Optional[str]) -> Optional[str]:
+        """Admit one inline (sync mode) launch. Returns a token to release() afterwards, or None
+        when the caps are reached or earlier submissions are still waiting (queue instead)."""
+        if not self.running:
+            return None
+        user = user_id or 'anonymous'
+        async with self._admit_lock:
+            if self.max_active <= 0 and self.max_active_per_user <= 0:
+                self._counters['admitted_inline'] += 1
+                return 'unlimited'
+            if self._depth:
+                self._counters['deferred_inline'] += 1
+                return None
+            active = await self._active_runs()
+            if not self._has_room(len(active), sum(1 for u in active.values() if u == user)):
+                self._counters['deferred_inline'] += 1
+                return None
+            token = f'inline-{uuid.uuid4()}'
+            self._reserved[token] = user
+            self._counters['admitted_inline'] += 1
+            return token
+
+    def release(self, token: str):
+        self._reserved.pop(token, None)
+        self.wake()
+
+    async def _run(self):
+        if get_bool_config('START_RESEARCH_RECOVER_QUEUED', False):
+            try:
+                await self._recover()
+            except Exception as e:  # pragma: no cover
+                logging.error(f"ResearchLauncher failed to recover queued jobs: {e}")
+        while True:
+            self._wakeup.clear()
+            if self._interrupted_due:
+                try:
+                    await self._fail_interrupted()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"ResearchLauncher failed to check interrupted launches: {e}")
+            if self._depth:
+                try:
+                    await self._dispatch()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"ResearchLauncher dispatch failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.recheck_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _recover(self):
+        # A 'starting' job without a run is either a launch cut short or one in flight on another
+        # replica; only the former is still unchanged once the launch timeout has passed
+        starting = await self.jobs.get_jobs(user_id=None, status='starting', limit=ACTIVE_SCAN_LIMIT, fields=('id', 'run_id'))
+        due = time.monotonic() + self.launch_timeout
+        for job in starting:
+            if not job.get('run_id'):
+                self._interrupted_due[job['id']] = due
+        queued = await self.jobs.get_jobs(user_id=None, status='queued', limit=self.queue_size,
+                                          fields=('id', 'user_id', 'query', 'created_at'))
+        known = {item['job_id'] for q in self._pending.values() for item in q}
+        for job in reversed(queued):  # oldest first
+            if job['id'] not in known:
+                self._push({'job_id': job['id'], 'query': job.get('query') or '', 'user_id': job.get('user_id')})
+                self._counters['recovered'] += 1
+        if queued:
+            logging.info(f"ResearchLauncher recovered {len(queued)} queued job(s)")
+
+    async def _fail_interrupted(self):
+        now = time.monotonic()
+        for job_id in [j for j, due in self._interrupted_due.items() if due <= now]:
+            del self._interrupted_due[job_id]
+            if job_id in self._reserved:
+                continue
+            job = await self.jobs.get_job(job_id)
+            if not job or job.get('status') != 'starting' or job.get('run_id'):
+                continue
+            await self.jobs.update_job_error(job_id, 'Launch interrupted (process stopped while starting)')
+            await self.jobs.add_job_step(job_id, 'error', 'エラー: 起動処理中にプロセスが停止しました')
+            job_events.notify(job_id)
+            self._counters['interrupted'] += 1
+            logging.warning(f"ResearchLauncher failed interrupted launch of job {job_id}")
+
+    async def _dispatch(self):
+        async with self._admit_lock:
+            active = await self._active_runs()
+            total = len(active)
+            per_user = Counter(active.values())
+            dispatched = []
+            while self._pending:
+                # Round-robin: first user (in rotation order) with room; they go to the back afterwards
+                user = next((u for u in self._pending if self._has_room(total, per_user[u])), None)
+                if user is None:
+                    break
+                item = self._pending[user].popleft()
+                if self._pending[user]:
+                    self._pending.move_to_end(user)
+                else:
+                    del self._pending[user]
+                self._depth -= 1
+                self._reserved[item['job_id']] = user
+                total += 1
+                per_user[user] += 1
+                dispatched.append(item)
+            if not dispatched:
+                return
+            self._positions = None
+            self._counters['dispatched'] += len(dispatched)
+        for item in dispatched:
+            task = asyncio.create_task(self._launch(item), name=f"research-launch-{item['job_id']}")
+            self._launches.add(task)
+            task.add_done_callback(self._launches.discard)
+        for q in self._pending.values():  # queue positions moved
+            for item in q:
+                job_events.notify(item['job_id'])
+
+    async def _launch(self, item: Dict[str, Any]):
+        job_id = item['job_id']
+        options = {k: v for k, v in item.items() if k != 'user_id'}
+        try:
+            job = await self.jobs.get_job(job_id)
+            if not job or job.get('status') != 'queued':
+                # Deleted, or launched meanwhile by another replica that recovered the same queue
+                self._counters['skipped'] += 1
+                return
+            async with self._slots:
+                self._busy += 1
+                try:
+                    resp = await run_in_foundry(
+                        DeepResearchService(self.jobs.backend).launch,
+                        fetch_early_messages=False,
+                        incremental=True,
+                        **options
+                    )
+                finally:
+                    self._busy -= 1
+            if resp.get('status') == 'failed':
+                self._counters['failed'] += 1
+            else:
+                self._counters['launched'] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._counters['failed'] += 1
+            logging.error(f"ResearchLauncher launch failed for job {job_id}: {e}")
+        finally:
+            self._reserved.pop(job_id, None)
+            job_events.notify(job_id)
+            self.wake()
+
+    # --- queue position ----------------------------------------------------
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based dispatch order of a queued job in this process (round-robin estimate), else None."""
+        if self._positions is None:
+            positions: Dict[str, int] = {}
+            queues = [list(q) for q in self._pending.values()]
+            for i in range(max((len(q) for q in queues), default=0)):
+                for q in queues:
+                    if i < len(q):
+                        positions[q[i]['job_id']] = len(positions) + 1
+            self._positions = positions
+        return self._positions.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.running,
+            'workers': self.worker_count,
+            'busy_workers': self._busy,
+            'queue_size': self.queue_size,
+            'queue_depth': self._depth,
+            'queued_users': len(self._pending),
+            'max_active_runs': self.max_active,
+            'max_active_runs_per_user': self.max_active_per_user,
+            'active_runs': self._last_active,
+            'stale_runs_ignored': self._last_stale,
+            'max_run_age_seconds': self.max_run_age,
+            'launch_timeout_seconds': self.launch_timeout,
+            'admitted_launches': len(self._reserved),
+            **self._counters,
+        }
@@ -1,14 +1,117 @@
 from fastapi import FastAPI, Depends, HTTPException, Request, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from fastapi.encoders import jsonable_encoder
+from contextlib import asynccontextmanager
+import asyncio
+import math
+from datetime import datetime, timezone
 from typing import Optional
 from .security import get_current_principal
 from .storage import get_job_manager, get_backend_debug
-from .models import StartResearchRequest
+from .jobs import AsyncJobManager, get_async_job_manager
+from .executors import run_in_foundry, shutdown_executors, executor_stats
+from .models import StartResearchRequest, CheckStatusBatchRequest
 from .research import DeepResearchService
 from .status import StatusService
+from .poller import RunStatusPoller
+from .backoff import get_poll_schedule
+from .launcher import ResearchLauncher
+from .config import get_bool_config, get_int_config, get_str_config, prefetch_config, get_settings_stats
+from .events import job_events
+from .reuse import research_reuse, query_fingerprint, IdempotencyConflict, MAX_IDEMPOTENCY_KEY_LENGTH
+from .stream import job_event_stream
+from .clients import get_client_stats
+from .agents import get_agent_registry
 import logging
 
-app = FastAPI(title="Deep Research API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_events.bind(asyncio.get_running_loop())
+    try:
+        # Key Vault の設定値を並列に先読み (以降の get_config はキャッシュヒット)
+        await asyncio.to_thread(prefetch_config)
+    except Exception as e:  # pragma: no cover
+        logging.warning(f"Config prefetch failed: {e}")
+    launcher = ResearchLauncher(get_async_job_manager())
+    launcher.start()
+    app.state.research_launcher = launcher
+    poller = None
+    if get_bool_config('STATUS_POLLER_ENABLED', True):
+        poller = RunStatusPoller(get_async_job_manager(), on_finished=launcher.wake)
+        poller.start()
+    app.state.status_poller = poller
+    try:
+        yield
+    finally:
+        await launcher.stop()
+        if poller is not None:
+            await poller.stop()
+        shutdown_executors()
+        backend = get_job_manager()
+        if hasattr(backend, 'snapshot'):
+            backend.close()  # in-memory backend: write the final snapshot
+
+
+app = FastAPI(title="Deep Research API", version="0.1.0", lifespan=lifespan)
+
+
+def _status_poller() -> Optional[RunStatusPoller]:
+    return getattr(app.state, 'status_poller', None)
+
+
+def _research_launcher() -> Optional[ResearchLauncher]:
+    return getattr(app.state, 'research_launcher', None)
+
+
+def _queue_position(job: dict) -> Optional[int]:
+    launcher = _research_launcher()
+    if launcher is None or job.get('status') != 'queued':
+        return None
+    return launcher.queue_position(job.get('id') or job.get('job_id'))
+
+
+def _wants_async_start(request: Request) -> bool:
+    if (get_str_config('START_RESEARCH_MODE', 'sync') or 'sync').lower() == 'async':
+        return True
+    prefer = request.headers.get('prefer') or ''
+    return 'respond-async' in prefer.lower()
+
+
+TERMINAL_STATUSES = ('completed', 'failed')
+ACTIVE_STATUSES = ('created', 'queued', 'starting', 'in_progress')
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'private, no-cache'
+
+
+def _job_etag(job: dict, *parts) -> str:
+    tag = '-'.join(str(p) for p in (job.get('version') or 0, *parts))
+    return f'"{tag}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    candidates = [t.strip() for t in header.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+
+def _cache_headers(etag: str, immutable: bool) -> dict:
+    return {'ETag': etag, 'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL}
+
+
+def _retry_headers(retry_after: Optional[float]) -> dict:
+    # Retry-After takes whole seconds; retry_after_ms in the body carries the precise hint
+    return {'Retry-After': str(max(1, math.ceil(retry_after)))} if retry_after is not None else {}
+
+
+def _not_modified(etag: str, immutable: bool, extra_headers: Optional[dict] = None) -> Response:
+    return Response(status_code=304, headers={**_cache_headers(etag, immutable), **(extra_headers or {})})
+
+
+def _cached_json(content: dict, etag: str, immutable: bool, extra_headers: Optional[dict] = None) -> JSONResponse:
+    return JSONResponse(content=jsonable_encoder(content), headers={**_cache_headers(etag, immutable), **(extra_headers or {})})
 
 
 @app.get("/healthz")
@@ -16,12 +119,43 @@ async def healthz():
     return {"status": "ok"}
 
 
+@app.get("/healthz/poller")
+async def healthz_poller():
+    poller = _status_poller()
+    if poller is None:
+        return {"status": "disabled"}
+    return {"status": "ok" if poller.running else "stopped", **poller.stats()}
+
+
+@app.get("/healthz/launcher")
+async def healthz_launcher():
+    launcher = _research_launcher()
+    if launcher is None:
+        return {"status": "disabled"}
+    return {"status": "ok" if launcher.running else "stopped", **launcher.stats()}
+
+
+@app.get("/healthz/reuse")
+async def healthz_reuse():
+    return {"status": "ok", **research_reuse.stats()}
+
+
+@app.get("/healthz/clients")
+async def healthz_clients():
+    return {"status": "ok", **get_client_stats(), "agents": get_agent_registry().stats(), "executors": executor_stats()}
+
+
+@app.get("/healthz/settings")
+async def healthz_settings():
+    return {"status": "ok", **get_settings_stats()}
+
+
 @app.get("/healthz/storage")
 async def healthz_storage():
     import os
     provider = (os.getenv('DATABASE_PROVIDER') or 'sqlite').lower()
     jm = get_job_manager()
-    mod = jm.__class__.__module__
+    mod = getattr(jm, 'backend', jm).__class__.__module__
     if 'db_cosmos' in mod:
         backend = 'cosmos'
     elif 'db_sqlite' in mod:
@@ -38,7 +172,9 @@ async def healthz_storage():
         'backend': backend,
         'requested': provider,
         'warning': warning,
-        'debug': get_backend_debug()
+        'debug': get_backend_debug(),
+        'stats': jm.get_stats() if hasattr(jm, 'get_stats') else None,
+        'cache': jm.cache_stats() if hasattr(jm, 'cache_stats') else None
     }
 
 
@@ -48,28 +184,38 @@ async def list_jobs(
     limit: int = Query(50, ge=1, le=200),
     status: Optional[str] = None,
     user_id: Optional[str] = None,
+    cursor: Optional[str] = None,
     principal=Depends(get_current_principal),
-    job_manager=Depends(get_job_manager)
+    jobs: AsyncJobManager = Depends(get_async_job_manager)
 ):
     try:
         # user_id指定が無ければ本人
         target_user = user_id or principal.get('user_id')
-        jobs = job_manager.get_jobs(user_id=target_user, status=status, limit=limit)
-        all_jobs = job_manager.get_jobs(user_id=target_user, limit=1000)
-        for job in jobs:
+        try:
+            items, next_cursor = await jobs.get_jobs_page(user_id=target_user, status=status, limit=limit, cursor=cursor, fields='summary')
+        except ValueError:
+            raise HTTPException(status_code=400, detail="invalid cursor")
+        counts = await jobs.count_jobs_by_status(target_user)
+        for job in items:
             created = job.get('created_at')
             if created and isinstance(created, str) and not created.endswith('Z'):
                 job['start_time'] = created + 'Z'
             else:
                 job['start_time'] = created
             job['thread_id'] = job.get('thread_id', '-')
+            if job.get('status') == 'queued':
+                job['queue_position'] = _queue_position(job)
         stats = {
-            'total': len(all_jobs),
-            'completed': len([j for j in all_jobs if j['status'] == 'completed']),
-            'in_progress': len([j for j in all_jobs if j['status'] in ['created', 'starting', 'in_progress']]),
-            'failed': len([j for j in all_jobs if j['status'] == 'failed'])
+            'total': sum(counts.values()),
+            'completed': counts.get('completed', 0),
+            'in_progress': sum(counts.get(st, 0) for st in ACTIVE_STATUSES),
+            'queued': counts.get('queued', 0),
+            'failed': counts.get('failed', 0)
         }
-        return {"jobs": jobs, "stats": stats, "filters": {"user_id": target_user, "status": status, "limit": limit}}
+        return {"jobs": items, "stats": stats, "next_cursor": next_cursor,
+                "filters": {"user_id": target_user, "status": status, "limit": limit, "cursor": cursor}}
+    except HTTPException:
+        raise
     except Exception as e:
         logging.exception("ListJobs error")
         raise HTTPException(status_code=500, detail=str(e))
@@ -77,55 +223,142 @@ async def list_jobs(
 
 @app.post("/api/StartResearch")
 async def start_research(
+    request: Request,
     payload: StartResearchRequest,
     principal=Depends(get_current_principal),
-    job_manager=Depends(get_job_manager)
+    jobs: AsyncJobManager = Depends(get_async_job_manager)
 ):
+    user_id = principal.get('user_id')
+    idempotency_key = (request.headers.get('idempotency-key') or payload.idempotency_key or '').strip() or None
+    if idempotency_key and len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key is too long (max {MAX_IDEMPOTENCY_KEY_LENGTH})")
+    fingerprint = query_fingerprint(payload.query, payload.deep_research_model, payload.tool_choice,
+                                    payload.bing_grounding_connections)
+    # Held until the job exists, so a retry with the same key waits and then gets that job
+    async with research_reuse.key_lock(user_id, idempotency_key):
+        if idempotency_key:
+            existing = await research_reuse.find_replay(jobs, user_id, idempotency_key)
+            if existing is not None:
+                return _existing_job_response(existing, "Existing job for this Idempotency-Key", replayed=True)
+        cached = await research_reuse.find_cached(jobs, user_id, fingerprint, payload.reuse_result)
+        if cached is not None:
+            return _existing_job_response(cached, "Reused the result of a recent identical query", reused=True)
+        return await _launch_research(request, payload, principal, jobs, idempotency_key, fingerprint)
+
+
+def _existing_job_response(job: dict, message: str, **flags) -> dict:
+    def ensure_z(dt):
+        if dt and isinstance(dt, str) and not dt.endswith('Z'):
+            return dt + 'Z'
+        return dt
+    return {
+        "job_id": job['id'],
+        "status": job.get('status'),
+        "message": message,
+        "created_at": ensure_z(job.get('created_at')),
+        "completed_at": ensure_z(job.get('completed_at')),
+        "queue_position": _queue_position(job),
+        "messages": [],
+        **flags
+    }
+
+
+async def _launch_research(request: Request, payload: StartResearchRequest, principal, jobs: AsyncJobManager,
+                           idempotency_key: Optional[str], query_hash: str):
+    launcher = _research_launcher()
+    token = None
+    reuse = {'idempotency_key': idempotency_key, 'query_hash': query_hash,
+             'key_created_after': research_reuse.key_cutoff() if idempotency_key else None}
+    if launcher is not None and launcher.running:
+        if _wants_async_start(request):
+            return await _enqueue_research(launcher, payload, principal, jobs, **reuse)
+        # Sync start still respects the active-run caps: without a free slot the job is queued (202)
+        token = await launcher.reserve(principal.get('user_id'))
+        if token is None:
+            return await _enqueue_research(launcher, payload, principal, jobs, **reuse)
     try:
-        service = DeepResearchService(job_manager)
-        resp = service.start_research(
+        # Job creation + agent/thread/run creation are blocking Foundry calls: keep them off the loop
+        service = DeepResearchService(jobs.backend)
+        resp = await run_in_foundry(
+            service.start_research,
             query=payload.query,
             user_id=principal.get('user_id'),
             tool_choice=payload.tool_choice,
             deep_research_model=payload.deep_research_model,
-            bing_grounding_connections=payload.bing_grounding_connections
+            bing_grounding_connections=payload.bing_grounding_connections,
+            **reuse
         )
         if resp.get('status') == 'failed':
             raise HTTPException(status_code=500, detail=resp.get('error', 'Failed'))
         return resp
     except HTTPException:
         raise
+    except IdempotencyConflict as e:
+        return _key_conflict_response(e)
     except Exception as e:
         logging.exception("StartResearch error")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if token is not None:
+            launcher.release(token)
+
+
+def _key_conflict_response(conflict: IdempotencyConflict) -> dict:
+    # Another process created the job for this key first: answer with it, never launch it again
+    research_reuse.record_conflict()
+    return _existing_job_response(conflict.job, "Existing job for this Idempotency-Key", replayed=True)
+
+
+async def _enqueue_research(launcher: ResearchLauncher, payload: StartResearchRequest, principal, jobs: AsyncJobManager,
+                            idempotency_key: Optional[str] = None, query_hash: Optional[str] = None,
+                            key_created_after: Optional[str] = None):
+    if launcher.is_full():
+        raise HTTPException(status_code=503, detail="Research launch queue is full; retry later")
+    try:
+        job_id = await jobs.create_job(payload.query, principal.get('user_id'), idempotency_key=idempotency_key,
+                                       query_hash=query_hash, key_created_after=key_created_after)
+    except IdempotencyConflict as e:
+        return _key_conflict_response(e)
+    # Persisted before the dispatcher can see it, so 'queued' never overwrites 'starting'
+    await jobs.update_job_status(job_id, 'queued', '起動待ち')
+    queued = launcher.submit(
+        job_id,
+        payload.query,
+        user_id=principal.get('user_id'),
+        tool_choice=payload.tool_choice,
+        deep_research_model=payload.deep_research_model,
+        bing_grounding_connections=payload.bing_grounding_connections
+    )
+    if not queued:
+        await jobs.update_job_error(job_id, 'Research launch queue is full')
+        raise HTTPException(status_code=503, detail="Research launch queue is full; retry later")
+    await jobs.add_job_step(job_id, 'launch_queued', '起動キューに登録しました')
+    logging.info(f"Queued research job {job_id} for async launch")
+    return JSONResponse(status_code=202, content={
+        "job_id": job_id,
+        "status": "queued",
+        "message": "Research job accepted; launch is queued",
+        "created_at": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        "queue_position": launcher.queue_position(job_id),
+        "messages": []
+    })
 
 
 @app.get("/api/GetResult/{job_id}")
-async def get_result(job_id: str, principal=Depends(get_current_principal), job_manager=Depends(get_job_manager)):
-    job = job_manager.get_job(job_id)
+async def get_result(request: Request, job_id: str, principal=Depends(get_current_principal), jobs: AsyncJobManager = Depends(get_async_job_manager)):
+    job = await jobs.get_job(job_id, user_id=principal.get('user_id'))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     req_user = principal.get('user_id')
     if job.get('user_id') not in (req_user, None, 'anonymous'):
         raise HTTPException(status_code=403, detail="Forbidden")
-    steps = job_manager.get_job_steps(job_id)
-    citations = []
-    for step in steps:
-        if step.get('step_name') == 'citation':
-            detail = step.get('step_details', '')
-            if ':' in detail:
-                try:
-                    citation_id = detail.split(':')[0].strip()
-                    rest = detail.split(':', 1)[1].strip()
-                    if '[' in rest and ']' in rest:
-                        url = rest.split('[')[0].strip()
-                        title = rest.split('[')[1].split(']')[0].strip()
-                    else:
-                        url = rest
-                        title = ''
-                    citations.append({'id': citation_id, 'url': url, 'title': title})
-                except Exception:
-                    pass
+    etag = _job_etag(job)
+    immutable = job.get('status') in TERMINAL_STATUSES
+    if _etag_matches(request, etag):
+        return _not_modified(etag, immutable)
+    steps = await jobs.get_job_steps(job_id)
+    # 'id' keeps the legacy {id, url, title} shape readable for older clients
+    citations = [{'id': c.get('marker'), **c} for c in await jobs.get_job_citations(job_id)]
     def ensure_z(dt):
         if dt and isinstance(dt, str) and not dt.endswith('Z'):
             return dt + 'Z'
@@ -140,7 +373,7 @@ async def get_result(job_id: str, principal=Depends(get_current_principal), job_
         "citations": citations
     }
     if job['status'] == 'completed':
-        resp['result'] = job['result']
+        resp['result'] = await jobs.get_job_result(job_id)
         resp['success'] = True
     elif job['status'] == 'failed':
         resp['error'] = job['error_message']
@@ -149,27 +382,29 @@ async def get_result(job_id: str, principal=Depends(get_current_principal), job_
         resp['current_step'] = job.get('current_step')
         resp['success'] = False
         resp['message'] = f"Job is still {job['status']}"
-    return resp
+    return _cached_json(resp, etag, immutable)
 
 
 # --- Compatibility alias routes (legacy frontend expects lowercase /api/research/*) ---
 @app.post("/api/research/start")
 async def start_research_alias(
+    request: Request,
     payload: StartResearchRequest,
     principal=Depends(get_current_principal),
-    job_manager=Depends(get_job_manager)
+    jobs: AsyncJobManager = Depends(get_async_job_manager)
 ):
-    return await start_research(payload, principal, job_manager)  # type: ignore
+    return await start_research(request, payload, principal, jobs)  # type: ignore
 
 
 @app.get("/api/research/result/{job_id}")
-async def get_result_alias(job_id: str, principal=Depends(get_current_principal), job_manager=Depends(get_job_manager)):
-    return await get_result(job_id, principal, job_manager)  # type: ignore
+async def get_result_alias(request: Request, job_id: str, principal=Depends(get_current_principal), jobs: AsyncJobManager = Depends(get_async_job_manager)):
+    return await get_result(request, job_id, principal, jobs)  # type: ignore
 
 
 @app.get("/api/CheckStatus/{job_id}")
-async def check_status(job_id: str, principal=Depends(get_current_principal), job_manager=Depends(get_job_manager)):
-    job = job_manager.get_job(job_id)
+async def check_status(request: Request, job_id: str, since_message_id: Optional[str] = None,
+                       principal=Depends(get_current_principal), jobs: AsyncJobManager = Depends(get_async_job_manager)):
+    job = await jobs.get_job(job_id, user_id=principal.get('user_id'))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     req_user = principal.get('user_id')
@@ -183,18 +418,52 @@ async def check_status(job_id: str, principal=Depends(get_current_principal), jo
     if 'error_message' not in job:
         job['error_message'] = None
 
-    status_service = StatusService(job_manager)
-    status_info = status_service.update_and_collect(job)
-    if status_info.get('updated'):
-        job = job_manager.get_job(job_id) or job
-    steps = job_manager.get_job_steps(job_id)
+    etag = None
+    schedule = get_poll_schedule()
+    poller = _status_poller()
+    if poller is not None:
+        # Run status and messages are persisted by the background poller; only read local state here.
+        # since_message_id selects a different (delta) representation, so it is part of the validator,
+        # as is the queue position of a queued job (it moves without a job write)
+        position = _queue_position(job)
+        etag = _job_etag(job, since_message_id or '', *(() if position is None else (f'q{position}',)))
+        if _etag_matches(request, etag):
+            return _not_modified(etag, _status_immutable(job, bool(job.get('last_message_id'))),
+                                 _retry_headers(schedule.retry_after(job)))
+        messages = await poller.messages_for(job, since_message_id=since_message_id)
+        if messages is not None and not job.get('last_message_id'):
+            job = await jobs.get_job(job_id, user_id=job.get('user_id')) or job  # backfilled just now
+        etag = _job_etag(job, since_message_id or '', *(() if position is None else (f'q{position}',)))
+        retry_after = schedule.retry_after(job)
+    else:
+        status_info = {}
+        if job.get('status') in TERMINAL_STATUSES:
+            if not job.get('last_message_id'):
+                status_info = await run_in_foundry(StatusService(jobs.backend).update_and_collect, job)
+        elif schedule.is_due(job_id):
+            # Clients polling faster than the schedule are answered from the store without a Foundry call
+            status_info = await run_in_foundry(StatusService(jobs.backend).update_and_collect, job)
+            if job.get('run_id'):
+                schedule.observe(job, status_info.get('run_status'))
+        if status_info.get('updated'):
+            job = await jobs.get_job(job_id, user_id=job.get('user_id')) or job
+        if job.get('status') in TERMINAL_STATUSES:
+            schedule.forget(job_id)
+            if status_info.get('run_status') in ('completed', 'failed', 'expired') and _research_launcher() is not None:
+                _research_launcher().wake()  # the run's slot is free
+        retry_after = schedule.retry_after(job, margin=0)
+        if job.get('last_message_id'):
+            messages = await jobs.get_job_messages(job_id, since_message_id=since_message_id)
+        else:
+            messages = status_info.get('messages')
+    steps = await jobs.get_job_steps(job_id)
 
     def ensure_z(dt):
         if dt and isinstance(dt, str) and not dt.endswith('Z'):
             return dt + 'Z'
         return dt
 
-    return {
+    resp = {
         "job_id": job_id,
         "status": job.get('status'),
         "query": job.get('query'),
@@ -202,40 +471,126 @@ async def check_status(job_id: str, principal=Depends(get_current_principal), jo
         "created_at": ensure_z(job.get('created_at')),
         "completed_at": ensure_z(job.get('completed_at')),
         "steps": steps,
-        "has_result": bool(job.get('result')),
+        "has_result": bool(job.get('result') or job.get('result_ref')),
         "has_error": bool(job.get('error_message')),
         "error_message": job.get('error_message'),
         "thread_id": job.get('thread_id'),
         "run_id": job.get('run_id'),
-        "messages": status_info.get('messages')
+        "messages": messages,
+        "last_message_id": job.get('last_message_id'),
+        "queue_position": _queue_position(job),
+        # When to ask again (follows the per-job poll schedule); null once the job is finished
+        "retry_after_ms": int(retry_after * 1000) if retry_after is not None else None
     }
+    if etag is None:
+        # Inline (poller disabled) mode refreshes from Foundry per request; no validators
+        return JSONResponse(content=jsonable_encoder(resp), headers=_retry_headers(retry_after))
+    return _cached_json(resp, etag, _status_immutable(job, messages is not None), _retry_headers(retry_after))
+
+
+def _status_immutable(job: dict, has_messages: bool) -> bool:
+    # Terminal jobs never change again once their final messages are known
+    return job.get('status') in TERMINAL_STATUSES and (has_messages or not job.get('run_id'))
 
 
 @app.get("/api/research/status/{job_id}")
-async def check_status_alias(job_id: str, principal=Depends(get_current_principal), job_manager=Depends(get_job_manager)):
-    return await check_status(job_id, principal, job_manager)  # type: ignore
+async def check_status_alias(request: Request, job_id: str, since_message_id: Optional[str] = None,
+                             principal=Depends(get_current_principal), jobs: AsyncJobManager = Depends(get_async_job_manager)):
+    return await check_status(request, job_id, since_message_id, principal, jobs)  # type: ignore
 
 
 @app.get("/api/CheckStatus")
-async def check_status_query(job_id: str = Query(...), principal=Depends(get_current_principal), job_manager=Depends(get_job_manager)):
-    return await check_status(job_id, principal, job_manager)  # type: ignore
+async def check_status_query(request: Request, job_id: str = Query(...), since_message_id: Optional[str] = None,
+                             principal=Depends(get_current_principal), jobs: AsyncJobManager = Depends(get_async_job_manager)):
+    return await check_status(request, job_id, since_message_id, principal, jobs)  # type: ignore
+
+
+# Columns a batch status entry needs: the list summary plus the (short) error text and result ref
+_BATCH_STATUS_FIELDS = ('id', 'user_id', 'query', 'status', 'created_at', 'completed_at', 'current_step', 'result_ref',
+                        'result_size', 'error_message', 'thread_id', 'run_id', 'last_message_id', 'version')
+
+
+@app.post("/api/CheckStatusBatch")
+async def check_status_batch(payload: CheckStatusBatchRequest, principal=Depends(get_current_principal), jobs: AsyncJobManager = Depends(get_async_job_manager)):
+    """Status of many jobs with one store query. Local state only (no steps / messages / Foundry calls)."""
+    job_ids = list(dict.fromkeys(payload.job_ids))
+    max_jobs = get_int_config('CHECK_STATUS_BATCH_MAX_JOBS', 100)
+    if len(job_ids) > max_jobs:
+        raise HTTPException(status_code=400, detail=f"Too many job_ids (max {max_jobs})")
+    req_user = principal.get('user_id')
+    found = {j['id']: j for j in await jobs.get_jobs_by_ids(job_ids, user_id=req_user, fields=_BATCH_STATUS_FIELDS)}
+
+    def ensure_z(dt):
+        if dt and isinstance(dt, str) and not dt.endswith('Z'):
+            return dt + 'Z'
+        return dt
+
+    results = []
+    for job_id in job_ids:
+        job = found.get(job_id)
+        if job is None:
+            results.append({"job_id": job_id, "error": "Job not found"})
+        elif job.get('user_id') not in (req_user, None, 'anonymous'):
+            results.append({"job_id": job_id, "error": "Forbidden"})
+        else:
+            results.append({
+                "job_id": job_id,
+                "status": job.get('status'),
+                "query": job.get('query'),
+                "current_step": job.get('current_step'),
+                "created_at": ensure_z(job.get('created_at')),
+                "completed_at": ensure_z(job.get('completed_at')),
+                # result body is not read here; legacy inline results count via the completed status
+                "has_result": bool(job.get('result_ref') or job.get('result_size') or job.get('status') == 'completed'),
+                "has_error": bool(job.get('error_message')),
+                "error_message": job.get('error_message'),
+                "thread_id": job.get('thread_id'),
+                "run_id": job.get('run_id'),
+                "last_message_id": job.get('last_message_id'),
+                "queue_position": _queue_position(job),
+                "version": job.get('version') or 0,
+            })
+    return {"jobs": results}
+
+
+@app.get("/api/research/stream/{job_id}")
+async def stream_job(job_id: str, request: Request, principal=Depends(get_current_principal), jobs: AsyncJobManager = Depends(get_async_job_manager)):
+    job = await jobs.get_job(job_id, user_id=principal.get('user_id'))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    req_user = principal.get('user_id')
+    if job.get('user_id') not in (req_user, None, 'anonymous'):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return StreamingResponse(
+        job_event_stream(job_id, jobs, _status_poller(), request, _research_launcher()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.delete("/api/DeleteJob/{job_id}")
-async def delete_job(job_id: str, principal=Depends(get_current_principal), job_manager=Depends(get_job_manager)):
-    job = job_manager.get_job(job_id)
+async def delete_job(job_id: str, principal=Depends(get_current_principal), jobs: AsyncJobManager = Depends(get_async_job_manager)):
+    job = await jobs.get_job(job_id, user_id=principal.get('user_id'))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     req_user = principal.get('user_id')
     if job.get('user_id') not in (req_user, None, 'anonymous'):
         raise HTTPException(status_code=403, detail="Forbidden")
-    job_manager.delete_job(job_id)
+    await jobs.delete_job(job_id)
+    poller = _status_poller()
+    if poller is not None:
+        poller.forget(job_id)
+    launcher = _research_launcher()
+    if launcher is not None:
+        launcher.cancel(job_id)
+        launcher.wake()
+    job_events.notify(job_id)
     return {"success": True, "message": f"Job {job_id} deleted"}
 
 
 @app.delete("/api/research/delete/{job_id}")
-async def delete_job_alias(job_id: str, principal=Depends(get_current_principal), job_manager=Depends(get_job_manager)):
-    return await delete_job(job_id, principal, job_manager)  # type: ignore
+async def delete_job_alias(job_id: str, principal=Depends(get_current_principal), jobs: AsyncJobManager = Depends(get_async_job_manager)):
+    return await delete_job(job_id, principal, jobs)  # type: ignore
 
 
 @app.exception_handler(HTTPException)
@@ -6,3 +6,8 @@ class StartResearchRequest(BaseModel):
     tool_choice: Optional[str] = None
     deep_research_model: Optional[str] = None
     bing_grounding_connections: Optional[Any] = None
+    idempotency_key: Optional[str] = Field(None, description="Same as the Idempotency-Key header (the header wins)")
+    reuse_result: Optional[bool] = Field(None, description="Return a recent completed job for the same query (default: RESULT_CACHE_ENABLED)")
+
+class CheckStatusBatchRequest(BaseModel):
+    job_ids: List[str] = Field(..., min_length=1, description="Job ids (max CHECK_STATUS_BATCH_MAX_JOBS)")
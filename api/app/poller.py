@@ -0,0 +1,189 @@
+"""Background run-status poller.
+
+Takes Foundry polling out of the CheckStatus request path: a single asyncio task
+(started from the FastAPI lifespan) periodically lists the ``in_progress`` jobs
+and refreshes those due according to the per-job backoff schedule (app/backoff.py)
+through StatusService, with a bounded number of concurrent remote polls, and
+persists the outcome (status, result and new thread messages) to the job store.
+CheckStatus, the SSE stream and history views then only read the store; finished
+jobs are never polled again.
+
+Tunables (env / Key Vault):
+ - STATUS_POLLER_ENABLED            (default: true)
+ - STATUS_POLL_INTERVAL_SECONDS     (default: 5)    how often new in_progress jobs are picked up
+ - STATUS_POLL_MAX_CONCURRENCY      (default: 4)
+ - STATUS_POLL_BATCH_SIZE           (default: 500)  max in_progress jobs per cycle
+ - STATUS_POLL_MIN/MAX_DELAY_SECONDS, STATUS_POLL_BACKOFF_FACTOR, STATUS_POLL_JITTER  (see app/backoff.py)
+"""
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from .backoff import PollSchedule, get_poll_schedule
+from .config import get_int_config, get_float_config
+from .executors import run_in_foundry
+from .jobs import AsyncJobManager
+from .status import StatusService
+from .events import job_events
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+class RunStatusPoller:
+    def __init__(self, jobs: AsyncJobManager, interval: Optional[float] = None,
+                 max_concurrency: Optional[int] = None, batch_size: Optional[int] = None,
+                 schedule: Optional[PollSchedule] = None, on_finished: Optional[Callable[[], None]] = None):
+        self.jobs = jobs
+        self.on_finished = on_finished  # e.g. ResearchLauncher.wake: a finished run frees a slot
+        self.schedule = schedule if schedule is not None else get_poll_schedule()
+        self.interval = max(0.5, interval if interval is not None else get_float_config('STATUS_POLL_INTERVAL_SECONDS', 5.0))
+        self.max_concurrency = max(1, max_concurrency if max_concurrency is not None else get_int_config('STATUS_POLL_MAX_CONCURRENCY', 4))
+        self.batch_size = max(1, batch_size if batch_size is not None else get_int_config('STATUS_POLL_BATCH_SIZE', 500))
+        self._task: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._backfills: Dict[str, asyncio.Future] = {}
+        self._tracked: set = set()
+        self._in_flight = 0
+        self._counters: Dict[str, Any] = {
+            'cycles': 0,
+            'polls': 0,
+            'deferred': 0,
+            'updates': 0,
+            'errors': 0,
+            'terminal_transitions': 0,
+            'message_backfills': 0,
+            'last_cycle_at': None,
+            'last_cycle_ms': None,
+        }
+
+    # --- lifecycle -------------------------------------------------------
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._task = asyncio.create_task(self._run(), name='run-status-poller')
+        logging.info(f"RunStatusPoller started (interval={self.interval}s, max_concurrency={self.max_concurrency})")
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        logging.info("RunStatusPoller stopped")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._counters['errors'] += 1
+                logging.error(f"RunStatusPoller cycle failed: {e}")
+                await asyncio.sleep(self.interval)
+                continue
+            # Wake for the next due run, but at least every interval to pick up new jobs
+            due_in = self.schedule.next_due_in()
+            await asyncio.sleep(self.interval if due_in is None else min(self.interval, max(0.5, due_in)))
+
+    # --- polling ---------------------------------------------------------
+    async def poll_once(self):
+        started = time.perf_counter()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        jobs = await self.jobs.get_jobs(user_id=None, status='in_progress', limit=self.batch_size, fields='summary')
+        jobs = [j for j in jobs if j.get('run_id') and j.get('thread_id')]
+        self._tracked = {j['id'] for j in jobs}
+        self.schedule.retain(self._tracked)
+        due = [j for j in jobs if self.schedule.is_due(j['id'])]
+        self._counters['deferred'] += len(jobs) - len(due)
+        if due:
+            await asyncio.gather(*(self._poll_job(j) for j in due))
+        self._counters['cycles'] += 1
+        self._counters['last_cycle_at'] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        self._counters['last_cycle_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _poll_job(self, job: Dict[str, Any]):
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                info = await run_in_foundry(StatusService(self.jobs.backend).update_and_collect, job)
+            except Exception as e:
+                self._counters['errors'] += 1
+                logging.error(f"RunStatusPoller poll failed for job {job.get('id')}: {e}")
+                self.schedule.observe(job, None)  # back off instead of retrying on every wakeup
+                return
+            finally:
+                self._in_flight -= 1
+        self._counters['polls'] += 1
+        if info.get('error'):
+            self._counters['errors'] += 1
+        if info.get('updated'):
+            self._counters['updates'] += 1
+            job_events.notify(job['id'])
+        if info.get('run_status') in ('completed', 'failed', 'expired'):
+            self._counters['terminal_transitions'] += 1
+            self.forget(job['id'])
+            if self.on_finished is not None:
+                self.on_finished()
+        else:
+            self.schedule.observe(job, info.get('run_status'))
+
+    async def messages_for(self, job: Dict[str, Any], since_message_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Thread messages of a job from the job store, newest first (only those after
+        since_message_id if given). None while a run has produced no messages yet.
+
+        Finished jobs from before messages were persisted are backfilled from Foundry
+        once (concurrent requests share the fetch) and read locally from then on.
+        """
+        job_id = job.get('id')
+        if not job.get('last_message_id'):
+            if job.get('status') not in TERMINAL_STATUSES or not job.get('run_id'):
+                return None
+            if not await self._backfill(job):
+                return None
+        return await self.jobs.get_job_messages(job_id, since_message_id=since_message_id)
+
+    async def _backfill(self, job: Dict[str, Any]) -> bool:
+        job_id = job['id']
+        future = self._backfills.get(job_id)
+        if future is None:
+            self._counters['message_backfills'] += 1
+            future = self._backfills[job_id] = asyncio.ensure_future(
+                run_in_foundry(StatusService(self.jobs.backend).backfill_messages, job))
+            future.add_done_callback(lambda _: self._backfills.pop(job_id, None))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Message backfill failed for job {job_id}: {e}")
+            return False
+
+    def forget(self, job_id: str):
+        self._tracked.discard(job_id)
+        self.schedule.forget(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.running,
+            'interval_seconds': self.interval,
+            'max_concurrency': self.max_concurrency,
+            'tracked_runs': len(self._tracked),
+            'in_flight': self._in_flight,
+            'backfills_in_flight': len(self._backfills),
+            'polls_per_finished_run': (round(self._counters['polls'] / self._counters['terminal_transitions'], 1)
+                                       if self._counters['terminal_transitions'] else None),
+            'schedule': self.schedule.stats(),
+            **self._counters,
+        }
@@ -1,8 +1,8 @@
 """Deep Research orchestration extracted from original Azure Function.
 
 This module ports the StartResearch logic to a service callable inside FastAPI.
-Currently synchronous for MVP; can later move to background tasks (e.g. Celery,
-Azure Container Apps Job, or async TaskGroup) without changing endpoint surface.
+start_research() creates the job and launches the run inline; launch() alone is
+what the in-process worker queue (app/launcher.py) runs for async StartResearch.
 """
 from typing import Dict, Any, List, Optional
 import logging
@@ -17,14 +17,13 @@ except Exception:  # fallback to legacy path if running in original layout
     from DeepResearchFunctionApp.shared.database import ResearchJobManager  # type: ignore
 
 try:
-    from azure.ai.projects import AIProjectClient
-    from azure.identity import DefaultAzureCredential
     from azure.ai.agents.models import DeepResearchTool
 except Exception:  # pragma: no cover - libs may not be installed in all envs
-    AIProjectClient = None  # type: ignore
-    DefaultAzureCredential = None  # type: ignore
     DeepResearchTool = None  # type: ignore
 
+from .clients import get_project_client, invalidate_project_client, is_auth_error, project_clients_available
+from .agents import get_agent_registry, is_not_found_error
+
 
 class DeepResearchService:
     def __init__(self, job_manager: ResearchJobManager):
@@ -32,13 +31,34 @@ class DeepResearchService:
 
     def start_research(self, query: str, user_id: str, tool_choice: Optional[str] = None,
                        deep_research_model: Optional[str] = None,
-                       bing_grounding_connections: Optional[Any] = None) -> Dict[str, Any]:
-        job_id = self.job_manager.create_job(query, user_id)
+                       bing_grounding_connections: Optional[Any] = None,
+                       idempotency_key: Optional[str] = None, query_hash: Optional[str] = None,
+                       key_created_after: Optional[str] = None) -> Dict[str, Any]:
+        # IdempotencyConflict (key held by a live job) propagates before anything is launched
+        job_id = self.job_manager.create_job(query, user_id, idempotency_key=idempotency_key, query_hash=query_hash,
+                                             key_created_after=key_created_after)
         logging.info(f"Created research job {job_id} for query={query}")
-
+        return self.launch(job_id, query, tool_choice=tool_choice,
+                           deep_research_model=deep_research_model,
+                           bing_grounding_connections=bing_grounding_connections)
+
+    def launch(self, job_id: str, query: str, tool_choice: Optional[str] = None,
+               deep_research_model: Optional[str] = None,
+               bing_grounding_connections: Optional[Any] = None,
+               fetch_early_messages: bool = True, incremental: bool = False) -> Dict[str, Any]:
+        """Create agent/thread/message/run for an existing job, recording each step.
+
+        fetch_early_messages=False skips the post-create message read (nobody is
+        waiting on the response when launched from the worker queue).
+        incremental=True (worker queue) marks the job 'starting' and writes each
+        step as it happens, so a job picked from the queue shows its progress;
+        inline launches write all steps at once with the run ids (or the error).
+        """
         # Early exit if libraries missing (local dev fallback)
-        if AIProjectClient is None or DefaultAzureCredential is None or DeepResearchTool is None:
+        if not project_clients_available() or DeepResearchTool is None:
             logging.warning("Azure AI packages not available - returning stub response")
+            # Leave no job behind as 'queued' when it came through the launch queue
+            self.job_manager.update_job_status(job_id, 'created', 'Azure AI packages missing; processing skipped')
             return {
                 "job_id": job_id,
                 "status": "created",
@@ -47,13 +67,25 @@ class DeepResearchService:
                 "messages": []
             }
 
+        project_endpoint = None
+        pending_steps: List[Any] = []
+
+        def record(*steps):
+            if incremental:
+                self.job_manager.add_job_steps(job_id, list(steps))
+            else:
+                pending_steps.extend(steps)
+
         try:
             project_endpoint = get_config("PROJECT_ENDPOINT")
             if not project_endpoint:
                 raise RuntimeError("PROJECT_ENDPOINT not configured")
 
-            credential = DefaultAzureCredential()
-            project = AIProjectClient(endpoint=project_endpoint, credential=credential)
+            project = get_project_client(project_endpoint)
+            if incremental:
+                self.job_manager.update_job_status(job_id, 'starting', 'Deep Research起動中...')
+
+            registry = get_agent_registry()
 
             # Resolve Bing grounding connection ID
             dr_bing_id = None
@@ -63,32 +95,28 @@ class DeepResearchService:
                 bing_resource_name = get_config("BING_RESOURCE_NAME")
                 if bing_resource_name:
                     try:
-                        conn = project.connections.get(name=bing_resource_name)
-                        dr_bing_id = conn.id
+                        dr_bing_id = registry.resolve_connection_id(project, bing_resource_name)
                     except Exception as e:
                         raise RuntimeError(f"Failed to fetch Bing connection id: {e}")
             if not dr_bing_id:
                 raise RuntimeError("Bing connection id not resolved")
 
             dr_model = deep_research_model or get_config("DEEP_RESEARCH_MODEL_DEPLOYMENT_NAME", "latest")
-            deep_research_tool = DeepResearchTool(
-                bing_grounding_connection_id=dr_bing_id,
-                deep_research_model=dr_model
-            )
+            model = get_config("MODEL_DEPLOYMENT_NAME", "gpt-4o")
 
-            agent = project.agents.create_agent(
-                model=get_config("MODEL_DEPLOYMENT_NAME", "gpt-4o"),
-                name="Deep Research Agent",
-                instructions=(
-                    "あなたは詳細な調査を行う専門的なリサーチエージェントです。\n\n"
-                    f"ユーザー質問: {query}\n\n"
-                    "Deep Research toolを使用して包括的な回答を生成してください。"
-                ),
-                tools=deep_research_tool.definitions
-            )
+            def make_tool():
+                return DeepResearchTool(
+                    bing_grounding_connection_id=dr_bing_id,
+                    deep_research_model=dr_model
+                )
+
+            agent_id, created = registry.get_agent_id(project, model, dr_model, dr_bing_id, make_tool)
+            record(('connection_resolved', f'Bing connection: {dr_bing_id}'),
+                   ('agent_ready', f"Agent ID: {agent_id} ({'created' if created else 'reused'})"))
 
             run_tool_choice = {"type": "deep_research"}
             thread = project.agents.threads.create()
+            record(('thread_created', f'Thread ID: {thread.id}'))
             project.agents.messages.create(
                 thread_id=thread.id,
                 role="user",
@@ -97,11 +125,26 @@ class DeepResearchService:
                     f"{query}"
                 )
             )
-            run = project.agents.runs.create(
-                thread_id=thread.id,
-                agent_id=agent.id,
-                tool_choice=run_tool_choice
-            )
+            record(('message_created', 'ユーザーメッセージ送信済み'))
+            try:
+                run = project.agents.runs.create(
+                    thread_id=thread.id,
+                    agent_id=agent_id,
+                    tool_choice=run_tool_choice
+                )
+            except Exception as e:
+                if created or not is_not_found_error(e):
+                    raise
+                # Cached agent was deleted remotely: recreate once and retry
+                logging.warning(f"Cached agent {agent_id} not found; recreating")
+                registry.invalidate_agent(agent_id)
+                agent_id, _ = registry.get_agent_id(project, model, dr_model, dr_bing_id, make_tool)
+                record(('agent_ready', f'Agent ID: {agent_id} (recreated)'))
+                run = project.agents.runs.create(
+                    thread_id=thread.id,
+                    agent_id=agent_id,
+                    tool_choice=run_tool_choice
+                )
 
             self.job_manager.update_job_status(
                 job_id,
@@ -109,27 +152,30 @@ class DeepResearchService:
                 'Deep Research実行中...',
                 thread_id=thread.id,
                 run_id=run.id,
-                agent_id=agent.id
+                agent_id=agent_id
             )
-            self.job_manager.add_job_step(job_id, 'id_debug', f"thread_id={thread.id}, run_id={run.id}, agent_id={agent.id}")
-            self.job_manager.add_job_step(job_id, 'run_created', f'Run ID: {run.id} executing')
+            self.job_manager.add_job_steps(job_id, pending_steps + [
+                ('id_debug', f"thread_id={thread.id}, run_id={run.id}, agent_id={agent_id}"),
+                ('run_created', f'Run ID: {run.id} executing'),
+            ])
 
             # Early assistant messages (may be empty)
             assistant_msgs: List[Dict[str, Any]] = []
-            try:
-                messages = project.agents.runs.get_messages(run_id=run.id)
-                for msg in messages:
-                    if getattr(msg, 'role', None) == 'assistant':
-                        content = getattr(msg, 'content', None)
-                        created_at = getattr(msg, 'created_at', None)
-                        annotations = getattr(msg, 'annotations', None)
-                        assistant_msgs.append({
-                            "content": content,
-                            "created_at": created_at,
-                            "annotations": annotations
-                        })
-            except Exception as e:
-                logging.debug(f"Early message fetch failed: {e}")
+            if fetch_early_messages:
+                try:
+                    messages = project.agents.runs.get_messages(run_id=run.id)
+                    for msg in messages:
+                        if getattr(msg, 'role', None) == 'assistant':
+                            content = getattr(msg, 'content', None)
+                            created_at = getattr(msg, 'created_at', None)
+                            annotations = getattr(msg, 'annotations', None)
+                            assistant_msgs.append({
+                                "content": content,
+                                "created_at": created_at,
+                                "annotations": annotations
+                            })
+                except Exception as e:
+                    logging.debug(f"Early message fetch failed: {e}")
 
             return {
                 "job_id": job_id,
@@ -140,8 +186,10 @@ class DeepResearchService:
             }
         except Exception as e:
             logging.error(f"DeepResearchService error: {e}")
+            if project_endpoint and is_auth_error(e):
+                invalidate_project_client(project_endpoint)
             self.job_manager.update_job_error(job_id, str(e))
-            self.job_manager.add_job_step(job_id, 'error', f'エラー: {e}')
+            self.job_manager.add_job_steps(job_id, pending_steps + [('error', f'エラー: {e}')])
             return {
                 "job_id": job_id,
                 "status": "failed",
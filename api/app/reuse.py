@@ -0,0 +1,130 @@
+"""Idempotent StartResearch and reuse of recent results.
+
+A Deep Research run takes many minutes, so a resubmitted query should not start
+another one:
+
+ - Idempotency-Key: a StartResearch carrying a key the same user already sent
+   (within IDEMPOTENCY_KEY_TTL_SECONDS) returns the job created by the first
+   request instead of a new run (double clicks, client retries after a network
+   error). The key is stored on the job; requests with the same key in this
+   process are serialized, and create_job refuses a key still held within the
+   TTL (IdempotencyConflict, answered as a replay; SQLite backs it with a unique
+   index). An expired key is released and starts a new job.
+ - Result cache (opt-in): every job records a fingerprint of its normalized
+   query, Deep Research model and tool options. With RESULT_CACHE_ENABLED (or
+   ``"reuse_result": true`` in the request) a StartResearch whose fingerprint
+   matches one of the same user's jobs completed within
+   RESULT_CACHE_MAX_AGE_SECONDS returns that job at once. ``"reuse_result": false``
+   always starts a new run. Results are never shared between users.
+
+Hit rates are reported by GET /healthz/reuse.
+
+Tunables (env / Key Vault):
+ - IDEMPOTENCY_KEY_TTL_SECONDS    (default: 86400)
+ - RESULT_CACHE_ENABLED           (default: false)
+ - RESULT_CACHE_MAX_AGE_SECONDS   (default: 86400)
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import asyncio
+import hashlib
+import json
+import re
+import unicodedata
+import weakref
+
+from .config import get_bool_config, get_float_config, get_str_config
+
+try:
+    from shared.errors import IdempotencyConflict  # type: ignore  # noqa: F401 (re-exported)
+except Exception:  # pragma: no cover
+    from DeepResearchFunctionApp.shared.errors import IdempotencyConflict  # type: ignore  # noqa: F401
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(query: str) -> str:
+    """Width / case / whitespace-insensitive form of a query (NFKC, casefold, single spaces)."""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', query or '')).strip().casefold()
+
+
+def query_fingerprint(query: str, deep_research_model: Optional[str] = None, tool_choice: Optional[str] = None,
+                      bing_grounding_connections: Optional[Any] = None) -> str:
+    connections = []
+    for c in bing_grounding_connections or []:
+        connections.append(c.get('connection_id') if isinstance(c, dict) else str(c))
+    key = {
+        'query': normalize_query(query),
+        # The effective model, so changing the deployment setting does not reuse older answers
+        'model': deep_research_model or get_str_config('DEEP_RESEARCH_MODEL_DEPLOYMENT_NAME', 'latest'),
+        'tool_choice': tool_choice,
+        'connections': sorted(c for c in connections if c),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _iso_ago(seconds: float) -> str:
+    return (datetime.utcnow() - timedelta(seconds=seconds)).replace(microsecond=0).isoformat() + 'Z'
+
+
+class ResearchReuse:
+    def __init__(self):
+        self._locks: 'weakref.WeakValueDictionary[tuple, asyncio.Lock]' = weakref.WeakValueDictionary()
+        self._stats = {'idempotent_requests': 0, 'idempotent_replays': 0, 'key_conflicts': 0, 'cache_lookups': 0, 'cache_hits': 0}
+
+    @asynccontextmanager
+    async def key_lock(self, user_id: Optional[str], idempotency_key: Optional[str]):
+        """Serialize requests carrying the same (user, Idempotency-Key); no-op without a key."""
+        if not idempotency_key:
+            yield
+            return
+        lock = self._locks.get((user_id, idempotency_key))
+        if lock is None:
+            lock = self._locks[(user_id, idempotency_key)] = asyncio.Lock()
+        async with lock:
+            yield
+
+    def key_cutoff(self) -> str:
+        """Keys of jobs created before this (ISO UTC) have expired."""
+        return _iso_ago(get_float_config('IDEMPOTENCY_KEY_TTL_SECONDS', 86400.0))
+
+    async def find_replay(self, jobs, user_id: str, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        self._stats['idempotent_requests'] += 1
+        job = await jobs.get_job_by_idempotency_key(user_id, idempotency_key, created_after=self.key_cutoff())
+        if job is not None:
+            self._stats['idempotent_replays'] += 1
+        return job
+
+    def record_conflict(self):
+        """create_job found the key taken after find_replay missed it (another process won the race)."""
+        self._stats['key_conflicts'] += 1
+        self._stats['idempotent_replays'] += 1
+
+    def cache_enabled(self, requested: Optional[bool]) -> bool:
+        return requested if requested is not None else get_bool_config('RESULT_CACHE_ENABLED', False)
+
+    async def find_cached(self, jobs, user_id: str, fingerprint: str, requested: Optional[bool]) -> Optional[Dict[str, Any]]:
+        if not self.cache_enabled(requested):
+            return None
+        self._stats['cache_lookups'] += 1
+        max_age = get_float_config('RESULT_CACHE_MAX_AGE_SECONDS', 86400.0)
+        job = await jobs.get_latest_completed_job(user_id, fingerprint, completed_after=_iso_ago(max_age))
+        if job is not None:
+            self._stats['cache_hits'] += 1
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        s = self._stats
+        return {
+            'result_cache_enabled': get_bool_config('RESULT_CACHE_ENABLED', False),
+            'result_cache_max_age_seconds': get_float_config('RESULT_CACHE_MAX_AGE_SECONDS', 86400.0),
+            'idempotency_key_ttl_seconds': get_float_config('IDEMPOTENCY_KEY_TTL_SECONDS', 86400.0),
+            'idempotent_replay_rate': round(s['idempotent_replays'] / s['idempotent_requests'], 3) if s['idempotent_requests'] else None,
+            'cache_hit_rate': round(s['cache_hits'] / s['cache_lookups'], 3) if s['cache_lookups'] else None,
+            **s,
+        }
+
+
+research_reuse = ResearchReuse()
@@ -10,13 +10,9 @@ from typing import Optional, Dict, Any
 #   ALLOW_ANONYMOUS=0 / false / no で匿名拒否
 ALLOW_ANONYMOUS_DEFAULT = os.getenv('ALLOW_ANONYMOUS','1').lower() not in ['0','false','no']
 
-_cached_api_key: Optional[str] = None
-
 def _load_expected_api_key() -> Optional[str]:
-    """Key Vault または環境変数から API キー取得 (API_KEY / API-KEY)。結果はプロセス内キャッシュ。"""
-    global _cached_api_key
-    if _cached_api_key is not None:
-        return _cached_api_key
+    """Key Vault または環境変数から API キー取得 (API_KEY / API-KEY)。
+    Key Vault の値は shared.settings の TTL キャッシュ経由なので、ローテーションも TTL 内に反映される。"""
     try:
         # 遅延 import (Key Vault / identity 失敗時も graceful)
         from shared.settings import get_config  # type: ignore
@@ -34,9 +30,8 @@ def _load_expected_api_key() -> Optional[str]:
             pass
     for val in candidates:
         if val and val.strip():
-            _cached_api_key = val.strip()
-            break
-    return _cached_api_key
+            return val.strip()
+    return None
 
 def _secure_compare(a: str, b: str) -> bool:
     try:
@@ -2,10 +2,16 @@
 
 Ports logic from original Azure Functions CheckStatus:
  - Query Azure AI Foundry run status if run/thread IDs exist
+ - Persist new thread messages once complete (per-job last_message_id cursor; the
+   cursor stops before the first message still being written)
  - Persist result & citations on completion
+ - Never contact Foundry for finished jobs (except a one-time message backfill for old jobs)
  - Update progress or mark failure accordingly
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from collections.abc import Mapping
+from datetime import datetime
+import json
 import logging
 
 try:
@@ -13,18 +19,118 @@ try:
 except Exception:  # pragma: no cover
     from DeepResearchFunctionApp.shared.settings import get_config  # type: ignore
 
-try:
-    from azure.ai.projects import AIProjectClient
-    from azure.identity import DefaultAzureCredential
-except Exception:  # pragma: no cover
-    AIProjectClient = None  # type: ignore
-    DefaultAzureCredential = None  # type: ignore
+from .clients import get_project_client, invalidate_project_client, is_auth_error, project_clients_available
+
+TERMINAL_STATUSES = ('completed', 'failed')
+COMPLETED_STEP = 'Deep Research調査が完了しました'
+
+
+def _to_json(value: Any):
+    if hasattr(value, 'as_dict'):
+        return value.as_dict()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
 
 
 class StatusService:
     def __init__(self, job_manager):
         self.job_manager = job_manager
 
+    def _get_project(self):
+        if not project_clients_available():
+            logging.debug("AI packages missing; skipping remote run status check")
+            return None
+        project_endpoint = get_config("PROJECT_ENDPOINT")
+        if not project_endpoint:
+            logging.debug("PROJECT_ENDPOINT not configured; skipping remote status check")
+            return None
+        return get_project_client(project_endpoint)
+
+    def _on_remote_error(self, e: Exception):
+        if is_auth_error(e):
+            invalidate_project_client(get_config("PROJECT_ENDPOINT"))
+
+    @staticmethod
+    def _message_dict(m) -> Dict[str, Any]:
+        msg_dict = {
+            'id': getattr(m, 'id', None),
+            'role': getattr(m, 'role', None),
+            'created_at': getattr(m, 'created_at', None),
+            'status': getattr(m, 'status', None),
+            'content': getattr(m, 'content', None)
+        }
+        annotations = getattr(m, 'annotations', None)
+        if annotations:
+            msg_dict['annotations'] = annotations
+        # Plain JSON (SDK models -> dicts, datetimes -> ISO strings) so messages can be persisted
+        return json.loads(json.dumps(msg_dict, default=_to_json))
+
+    def _fetch_messages(self, project, thread_id: str, run_id: str, after_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Messages of the run newer than ``after_id`` (all if None), newest first.
+
+        messages.list pages newest-first, so iteration stops at the cursor and only
+        the pages holding new messages are requested.
+        """
+        messages_data = []
+        try:
+            lister = getattr(getattr(project.agents, 'messages', None), 'list', None)
+            if lister is not None and thread_id:
+                msgs = lister(thread_id=thread_id, run_id=run_id, order='desc')
+            else:
+                msgs = project.agents.runs.get_messages(run_id=run_id)
+            for m in msgs:
+                if after_id is not None and getattr(m, 'id', None) == after_id:
+                    break
+                messages_data.append(self._message_dict(m))
+        except Exception as e:  # pragma: no cover
+            logging.debug(f"Message fetch failure: {e}")
+        return messages_data
+
+    @staticmethod
+    def _settled(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Oldest-first prefix of newest-first ``messages`` that is complete (no status: older SDKs).
+        Stored messages are never rewritten, so anything after an in_progress / incomplete one waits."""
+        settled = []
+        for m in reversed(messages):
+            if m.get('status') not in (None, 'completed'):
+                break
+            settled.append(m)
+        return settled
+
+    def _store_settled(self, job_id: str, messages: List[Dict[str, Any]]) -> int:
+        settled = self._settled(messages)
+        if settled:
+            self.job_manager.add_job_messages(job_id, settled)
+        return len(settled)
+
+    def collect_messages(self, job: Dict[str, Any]):
+        """Read-only message fetch (no job store writes). Returns None if not applicable."""
+        run_id = job.get('run_id')
+        if not run_id or not job.get('thread_id'):
+            return None
+        try:
+            project = self._get_project()
+            if project is None:
+                return None
+            return self._fetch_messages(project, job.get('thread_id'), run_id)
+        except Exception as e:  # pragma: no cover
+            logging.error(f"StatusService message collect error: {e}")
+            self._on_remote_error(e)
+            return None
+
+    def backfill_messages(self, job: Dict[str, Any]) -> bool:
+        """Store the whole thread of a finished job that has no stored messages (jobs from
+        before messages were persisted). Runs once per job; afterwards it is read locally."""
+        if job.get('last_message_id') or job.get('status') not in TERMINAL_STATUSES:
+            return False
+        messages = self.collect_messages(job)
+        if not messages:
+            return False
+        return self.job_manager.add_job_messages(job['id'], list(reversed(messages))) > 0
+
     def update_and_collect(self, job: Dict[str, Any]) -> Dict[str, Any]:
         messages_data = None
         updated = False
@@ -32,49 +138,41 @@ class StatusService:
         thread_id = job.get('thread_id')
         if not run_id or not thread_id:
             return {"messages": messages_data, "updated": updated}
-
-        if AIProjectClient is None or DefaultAzureCredential is None:
-            logging.debug("AI packages missing; skipping remote run status check")
-            return {"messages": messages_data, "updated": updated}
-
-        project_endpoint = get_config("PROJECT_ENDPOINT")
-        if not project_endpoint:
-            logging.debug("PROJECT_ENDPOINT not configured; skipping remote status check")
-            return {"messages": messages_data, "updated": updated}
+        if job.get('status') in TERMINAL_STATUSES:
+            # Finished runs never change: everything is served from the job store
+            return {"messages": messages_data, "updated": self.backfill_messages(job)}
 
         try:
-            project = AIProjectClient(
-                endpoint=project_endpoint,
-                credential=DefaultAzureCredential()
-            )
+            project = self._get_project()
+            if project is None:
+                return {"messages": messages_data, "updated": updated}
             run = project.agents.runs.get(thread_id=thread_id, run_id=run_id)
             run_status = getattr(run, 'status', None)
             logging.info(f"Run status for job {job.get('id')}: {run_status}")
 
-            # Fetch messages (best effort)
-            messages_data = []
-            try:
-                msgs = project.agents.runs.get_messages(run_id=run_id)
-                for m in msgs:
-                    msg_dict = {
-                        'id': getattr(m, 'id', None),
-                        'role': getattr(m, 'role', None),
-                        'created_at': getattr(m, 'created_at', None),
-                        'content': getattr(m, 'content', None)
-                    }
-                    annotations = getattr(m, 'annotations', None)
-                    if annotations:
-                        msg_dict['annotations'] = annotations
-                    messages_data.append(msg_dict)
-            except Exception as e:  # pragma: no cover
-                logging.debug(f"Message fetch failure: {e}")
+            # Only messages newer than the job's cursor; complete ones are persisted (best effort)
+            messages_data = self._fetch_messages(project, thread_id, run_id, job.get('last_message_id'))
+            stored = self._store_settled(job['id'], messages_data)
+            if stored:
+                updated = True
 
             if run_status == 'completed':
-                content_text = self._extract_primary_content(messages_data)
+                pending = messages_data[:len(messages_data) - stored]
+                if pending:
+                    # The run is over: re-read the messages (final answer included) that were still being written
+                    cursor = messages_data[len(pending)]['id'] if stored else job.get('last_message_id')
+                    pending = self._fetch_messages(project, thread_id, run_id, cursor)
+                    pending = pending[:len(pending) - self._store_settled(job['id'], pending)]
+                # Result and citations come from the whole thread: stored history plus anything still unsettled
+                all_messages = pending + self.job_manager.get_job_messages(job['id'])
+                content_text = self._extract_primary_content(all_messages)
+                # Citations first, then result + step + terminal status in one write: whoever sees
+                # 'completed' (and caches it as immutable) already sees the final job
+                self._extract_and_store_citations(job['id'], all_messages)
                 if content_text:
-                    self.job_manager.update_job_result(job['id'], content_text)
-                self.job_manager.update_job_status(job['id'], 'completed', 'Deep Research調査が完了しました')
-                self._extract_and_store_citations(job['id'], messages_data)
+                    self.job_manager.update_job_result(job['id'], content_text, current_step=COMPLETED_STEP)
+                else:
+                    self.job_manager.update_job_status(job['id'], 'completed', COMPLETED_STEP)
                 updated = True
             elif run_status in ('failed', 'expired'):
                 self.job_manager.update_job_error(job['id'], f"Run ended with status {run_status}")
@@ -84,10 +182,11 @@ class StatusService:
                 self.job_manager.update_job_status(job['id'], 'in_progress', current_step)
                 updated = True
                 if run_status == 'requires_action':
-                    self.job_manager.add_job_step(job['id'], 'requires_action', 'アクションが必要です')
-            return {"messages": messages_data, "updated": updated}
+                    self.job_manager.add_job_steps(job['id'], [('requires_action', 'アクションが必要です')])
+            return {"messages": messages_data, "updated": updated, "run_status": run_status}
         except Exception as e:  # pragma: no cover
             logging.error(f"StatusService error: {e}")
+            self._on_remote_error(e)
             return {"messages": messages_data, "updated": updated, "error": str(e)}
 
     def _extract_primary_content(self, messages: List[Dict[str, Any]]):
@@ -109,37 +208,37 @@ class StatusService:
             return c
         return None
 
+    def _extract_citations(self, messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Typed citations from message annotations, deduplicated, in order of first appearance."""
+        citations = []
+        seen = set()
+        for msg in messages:
+            for ann in msg.get('annotations') or []:
+                if not isinstance(ann, dict):
+                    continue
+                t = ann.get('type')
+                if t not in ('url_citation', 'file_citation'):
+                    continue
+                obj = ann.get(t) or {}
+                if isinstance(obj, str):
+                    try:
+                        obj = json.loads(obj)
+                    except Exception:  # pragma: no cover
+                        obj = {}
+                if t == 'url_citation':
+                    c = {'type': t, 'marker': ann.get('text') or '', 'url': obj.get('url') or '', 'title': obj.get('title') or ''}
+                    key = (t, c['marker'], c['url'])
+                else:
+                    c = {'type': t, 'marker': ann.get('text') or '', 'file_id': obj.get('file_id') or '', 'quote': obj.get('quote') or ''}
+                    key = (t, c['marker'], c['file_id'])
+                if key in seen:
+                    continue
+                seen.add(key)
+                citations.append(c)
+        return citations
+
     def _extract_and_store_citations(self, job_id: str, messages: List[Dict[str, Any]]):
         try:
-            for msg in messages:
-                anns = msg.get('annotations') or []
-                for ann in anns:
-                    if not isinstance(ann, dict):
-                        continue
-                    t = ann.get('type')
-                    if t == 'url_citation':
-                        url_citation_obj = ann.get('url_citation') or {}
-                        if isinstance(url_citation_obj, str):
-                            import json
-                            try:
-                                url_citation_obj = json.loads(url_citation_obj)
-                            except Exception:  # pragma: no cover
-                                url_citation_obj = {}
-                        citation_id = ann.get('text', '')
-                        citation_url = url_citation_obj.get('url', '')
-                        citation_title = url_citation_obj.get('title', '')
-                        self.job_manager.add_job_step(job_id, 'citation', f"{citation_id}: {citation_url} [{citation_title}]")
-                    elif t == 'file_citation':
-                        file_citation_obj = ann.get('file_citation') or {}
-                        if isinstance(file_citation_obj, str):
-                            import json
-                            try:
-                                file_citation_obj = json.loads(file_citation_obj)
-                            except Exception:  # pragma: no cover
-                                file_citation_obj = {}
-                        citation_id = ann.get('text', '')
-                        citation_url = file_citation_obj.get('file_id', '')
-                        citation_title = file_citation_obj.get('quote', '')
-                        self.job_manager.add_job_step(job_id, 'citation', f"{citation_id}: {citation_url} [{citation_title}]")
+            self.job_manager.add_job_citations(job_id, self._extract_citations(messages))
         except Exception as e:  # pragma: no cover
-            logging.debug(f"Citation extraction failed: {e}")
+            logging.warning(f"Citation storage failed for job {job_id}: {e}")
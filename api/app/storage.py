@@ -1,7 +1,8 @@
 """Backend selector for job storage.
 
-Respects DATABASE_PROVIDER env/secret (sqlite|cosmos). Default sqlite.
-Falls back gracefully to in-memory if import chain fails (local dev safety net).
+Respects DATABASE_PROVIDER env/secret (sqlite|cosmos|memory). Default sqlite.
+Falls back gracefully to the in-memory backend (shared/db_memory.py) if the import
+chain fails (local dev safety net).
 """
 from functools import lru_cache
 from typing import Any
@@ -9,6 +10,8 @@ import os
 import logging
 import traceback
 
+from .job_cache import wrap_job_manager
+
 # Debug metadata for introspection
 _backend_provider: str | None = None
 _backend_selected_base: str | None = None
@@ -16,6 +19,15 @@ _backend_errors: list[str] = []
 _backend_init_error: str | None = None
 
 
+def _memory_backend():
+    for base in ('shared', 'DeepResearchFunctionApp.shared'):
+        try:
+            return getattr(__import__(f'{base}.db_memory', fromlist=['ResearchJobManager']), 'ResearchJobManager')
+        except Exception as e:  # pragma: no cover
+            _backend_errors.append(f"{base}.db_memory: {e}")
+    raise RuntimeError('in-memory job backend unavailable')
+
+
 def _load_backend():
     global _backend_provider, _backend_selected_base, _backend_errors
     provider = (os.getenv('DATABASE_PROVIDER') or 'sqlite').lower()
@@ -30,6 +42,8 @@ def _load_backend():
         try:
             if provider == 'cosmos':
                 mod = __import__(f'{base}.db_cosmos', fromlist=['ResearchJobManager'])
+            elif provider == 'memory':
+                mod = __import__(f'{base}.db_memory', fromlist=['ResearchJobManager'])
             else:
                 mod = __import__(f'{base}.db_sqlite', fromlist=['ResearchJobManager'])
             logging.info(f"Selected backend '{provider}' via module base '{base}'")
@@ -41,40 +55,7 @@ def _load_backend():
             logging.warning(f"Backend import failed for base '{base}' (provider={provider}): {e}")
             continue
     logging.error(f"All backend imports failed for provider '{provider}' (last error: {last_err}); falling back to in-memory store")
-    # Fallback dummy (in-memory)
-    class FallbackJobManager:  # type: ignore
-        def __init__(self):
-            self._jobs = {}
-            self._steps = {}
-        def create_job(self, query: str, user_id: str):
-            jid = f"mem-{len(self._jobs)+1}"
-            self._jobs[jid] = {
-                "id": jid,
-                "query": query,
-                "status": "created",
-                "user_id": user_id,
-                "created_at": None,
-                "current_step": None,
-                "result": None,
-                "error_message": None,
-                "thread_id": None,
-                "run_id": None
-            }
-            return jid
-        def get_job(self, job_id: str):
-            return self._jobs.get(job_id)
-        def get_jobs(self, user_id=None, status=None, limit=50):
-            vals = list(self._jobs.values())
-            if user_id:
-                vals = [v for v in vals if v.get('user_id') == user_id]
-            if status:
-                vals = [v for v in vals if v.get('status') == status]
-            return vals[:limit]
-        def get_job_steps(self, job_id: str):
-            return []
-        def delete_job(self, job_id: str):
-            self._jobs.pop(job_id, None)
-    return FallbackJobManager
+    return _memory_backend()
 
 
 def get_backend_debug() -> dict:
@@ -88,6 +69,11 @@ def get_backend_debug() -> dict:
 
 @lru_cache
 def get_job_manager() -> Any:
+    """The process-wide job backend behind the read-through cache (app/job_cache.py)."""
+    return wrap_job_manager(_create_backend())
+
+
+def _create_backend() -> Any:
     cls = _load_backend()
     try:
         return cls()
@@ -105,35 +91,4 @@ def get_job_manager() -> Any:
             return SqliteManager()
         except Exception as e2:
             logging.warning(f"Sqlite fallback failed ({e2}); using in-memory store")
-            class FallbackJobManager:  # type: ignore
-                def __init__(self):
-                    self._jobs = {}
-                def create_job(self, query: str, user_id: str):
-                    jid = f"mem-{len(self._jobs)+1}"
-                    self._jobs[jid] = {
-                        "id": jid,
-                        "query": query,
-                        "status": "created",
-                        "user_id": user_id,
-                        "created_at": None,
-                        "current_step": None,
-                        "result": None,
-                        "error_message": None,
-                        "thread_id": None,
-                        "run_id": None
-                    }
-                    return jid
-                def get_job(self, job_id: str):
-                    return self._jobs.get(job_id)
-                def get_jobs(self, user_id=None, status=None, limit=50):
-                    vals = list(self._jobs.values())
-                    if user_id:
-                        vals = [v for v in vals if v.get('user_id') == user_id]
-                    if status:
-                        vals = [v for v in vals if v.get('status') == status]
-                    return vals[:limit]
-                def get_job_steps(self, job_id: str):
-                    return []
-                def delete_job(self, job_id: str):
-                    self._jobs.pop(job_id, None)
-            return FallbackJobManager()
+            return _memory_backend()()
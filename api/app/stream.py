@@ -0,0 +1,157 @@
+"""Server-Sent Events stream of job progress.
+
+GET /api/research/stream/{job_id} replaces client-side CheckStatus polling. The
+stream is fed from the job store (status, steps and the persisted thread
+messages): it re-reads local state whenever a writer signals a change through
+app.events.job_events, or every keepalive interval as a safety net for changes
+made by other replicas. With the status poller disabled (STATUS_POLLER_ENABLED=false)
+nothing else refreshes the run, so the stream itself calls StatusService when the
+run is due on the shared poll schedule (app/backoff.py), like inline CheckStatus.
+
+Events (``data`` is JSON):
+ - status   {status, current_step, created_at, completed_at, thread_id, run_id, queue_position}
+ - step     one job_steps row
+ - message  one thread message (as in CheckStatus ``messages``)
+ - result   {status, result | error_message} once the job is terminal
+ - end      {} then the stream closes
+
+Tunables (env / Key Vault):
+ - SSE_KEEPALIVE_SECONDS      (default: 15)
+ - SSE_MAX_DURATION_SECONDS   (default: 3600)
+"""
+from typing import Any, AsyncIterator, Dict, Optional
+import asyncio
+import json
+import time
+
+from .backoff import get_poll_schedule
+from .config import get_float_config
+from .events import job_events
+from .executors import run_in_foundry
+from .status import StatusService
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+def _ensure_z(dt):
+    if dt and isinstance(dt, str) and not dt.endswith('Z'):
+        return dt + 'Z'
+    return dt
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    for line in payload.splitlines() or ['']:
+        lines.append(f"data: {line}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _refresh_inline(job: Dict[str, Any], jobs, launcher) -> Optional[Dict[str, Any]]:
+    """Poller disabled: update the job from Foundry when its run is due; returns the current job."""
+    schedule = get_poll_schedule()
+    if job.get('status') in TERMINAL_STATUSES:
+        if job.get('last_message_id') or not job.get('run_id'):
+            return job
+        # Finished before messages were persisted: one-time backfill
+        info = await run_in_foundry(StatusService(jobs.backend).update_and_collect, job)
+    elif job.get('run_id') and schedule.is_due(job['id']):
+        info = await run_in_foundry(StatusService(jobs.backend).update_and_collect, job)
+        schedule.observe(job, info.get('run_status'))
+    else:
+        return job
+    if info.get('updated'):
+        job = await jobs.get_job(job['id'], user_id=job.get('user_id'))
+    if job and job.get('status') in TERMINAL_STATUSES:
+        schedule.forget(job['id'])
+        if info.get('run_status') in ('completed', 'failed', 'expired') and launcher is not None:
+            launcher.wake()  # the run's slot is free
+    return job
+
+
+async def job_event_stream(job_id: str, jobs, poller, request, launcher=None) -> AsyncIterator[str]:
+    keepalive = max(1.0, get_float_config('SSE_KEEPALIVE_SECONDS', 15.0))
+    deadline = time.monotonic() + get_float_config('SSE_MAX_DURATION_SECONDS', 3600.0)
+    changed = job_events.subscribe(job_id)
+    seq = 0
+    last_status: Optional[Dict[str, Any]] = None
+    sent_steps = 0
+    sent_message_ids = set()
+    last_message_id: Optional[str] = None  # newest message sent; later reads fetch only what follows
+    try:
+        yield f"retry: {int(keepalive * 1000)}\n\n"
+        while time.monotonic() < deadline:
+            if await request.is_disconnected():
+                return
+            changed.clear()
+            job = await jobs.get_job(job_id)
+            if job and poller is None:
+                job = await _refresh_inline(job, jobs, launcher)
+            if not job:
+                seq += 1
+                yield format_sse('end', {'reason': 'deleted'}, seq)
+                return
+
+            status = {
+                'status': job.get('status'),
+                'current_step': job.get('current_step'),
+                'created_at': _ensure_z(job.get('created_at')),
+                'completed_at': _ensure_z(job.get('completed_at')),
+                'thread_id': job.get('thread_id'),
+                'run_id': job.get('run_id'),
+                'queue_position': (launcher.queue_position(job_id)
+                                   if launcher is not None and job.get('status') == 'queued' else None),
+            }
+            if status != last_status:
+                seq += 1
+                yield format_sse('status', status, seq)
+                last_status = status
+
+            steps = await jobs.get_job_steps(job_id)
+            for step in steps[sent_steps:]:
+                seq += 1
+                yield format_sse('step', step, seq)
+            sent_steps = max(sent_steps, len(steps))
+
+            if poller is not None:
+                messages = await poller.messages_for(job, since_message_id=last_message_id)
+            elif job.get('last_message_id'):
+                messages = await jobs.get_job_messages(job_id, since_message_id=last_message_id)
+            else:
+                messages = None
+            if messages:
+                last_message_id = messages[0].get('id') or last_message_id
+            for idx, msg in enumerate(messages or []):
+                key = msg.get('id') or f"idx-{idx}"
+                if key in sent_message_ids:
+                    continue
+                sent_message_ids.add(key)
+                seq += 1
+                yield format_sse('message', msg, seq)
+
+            if job.get('status') in TERMINAL_STATUSES:
+                final = {'status': job.get('status')}
+                if job.get('status') == 'completed':
+                    final['result'] = await jobs.get_job_result(job_id)
+                else:
+                    final['error_message'] = job.get('error_message')
+                seq += 1
+                yield format_sse('result', final, seq)
+                seq += 1
+                yield format_sse('end', {}, seq)
+                return
+
+            wait = keepalive
+            if poller is None and job.get('run_id'):
+                wait = min(keepalive, get_poll_schedule().retry_after(job, margin=0) or keepalive)
+            try:
+                await asyncio.wait_for(changed.wait(), wait)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+        seq += 1
+        yield format_sse('end', {'reason': 'timeout'}, seq)
+    finally:
+        job_events.unsubscribe(job_id, changed)
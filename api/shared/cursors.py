@@ -0,0 +1,19 @@
+# Opaque pagination cursors shared by the job backends.
+# A cursor is base64url(JSON); clients must treat it as an opaque string.
+import base64, json
+from typing import Any, Dict
+
+def encode_cursor(data: Dict[str, Any]) -> str:
+    raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Raises ValueError for anything that is not a cursor we issued."""
+    try:
+        padding = '=' * ((4 - len(cursor) % 4) % 4)
+        data = json.loads(base64.urlsafe_b64decode(cursor + padding).decode('utf-8'))
+    except Exception as e:
+        raise ValueError(f'invalid cursor: {e}')
+    if not isinstance(data, dict):
+        raise ValueError('invalid cursor')
+    return data
@@ -1,9 +1,12 @@
 # copied from DeepResearchFunctionApp/shared/db_cosmos.py
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime
-import uuid, logging, os, traceback
+import uuid, logging, os, traceback, hashlib, threading, time
+from collections import OrderedDict
 try:
     from azure.cosmos import CosmosClient, PartitionKey
+    from azure.cosmos.exceptions import CosmosResourceNotFoundError, CosmosAccessConditionFailedError
+    from azure.core import MatchConditions
 except Exception:
     CosmosClient = None  # type: ignore
 try:
@@ -11,9 +14,23 @@ try:
 except Exception:
     DefaultAzureCredential = None  # type: ignore
 from .settings import get_config
+from .cursors import encode_cursor, decode_cursor
+from .projection import resolve_fields
+from .errors import IdempotencyConflict
+from .result_store import ResultStores, CosmosResultStore, BlobResultStore
+
+# id -> user_id (the jobs partition key) remembered per process so job reads are point reads
+PK_CACHE_SIZE = int(os.getenv('COSMOS_PK_CACHE_SIZE') or 10000)
+# Attempts for etag-guarded patches before giving up on a contended job
+PATCH_RETRIES = 3
+TERMINAL_STATUSES = ('completed', 'failed')
+JOB_STATUSES = ('created', 'queued', 'starting', 'in_progress', 'completed', 'failed')
 class ResearchJobManager:
     def __init__(self):
-        self._client=None; self._db=None; self._jobs=None; self._steps=None
+        self._client=None; self._db=None; self._jobs=None; self._steps=None; self._citations=None; self._messages=None; self._results=None
+        self._pk_cache: 'OrderedDict[str, str]'=OrderedDict(); self._pk_lock=threading.Lock()
+        self._step_seq=0; self._seq_lock=threading.Lock()
+        self._stats={'point_reads':0,'pk_lookups':0,'patches':0,'patch_conflicts':0}
         self._init_cosmos()
     def _init_cosmos(self):
         if CosmosClient is None:
@@ -30,6 +47,8 @@ class ResearchJobManager:
         database_name = get_config('COSMOS_DB_DATABASE', 'DeepResearch')
         jobs_container = get_config('COSMOS_JOBS_CONTAINER', 'research_jobs')
         steps_container = get_config('COSMOS_STEPS_CONTAINER', 'job_steps')
+        citations_container = get_config('COSMOS_CITATIONS_CONTAINER', 'job_citations')
+        messages_container = get_config('COSMOS_MESSAGES_CONTAINER', 'job_messages')
         debug = os.getenv('LOG_COSMOS_DEBUG', '').lower() in ('1','true','yes')
         try:
             if use_identity:
@@ -48,61 +67,264 @@ class ResearchJobManager:
             self._db = self._client.create_database_if_not_exists(id=database_name)
             self._jobs = self._db.create_container_if_not_exists(id=jobs_container, partition_key=PartitionKey(path='/user_id'))
             self._steps = self._db.create_container_if_not_exists(id=steps_container, partition_key=PartitionKey(path='/job_id'))
-            logging.info('Cosmos init success: db=%s containers=[%s,%s]', database_name, jobs_container, steps_container)
+            self._citations = self._db.create_container_if_not_exists(id=citations_container, partition_key=PartitionKey(path='/job_id'))
+            self._messages = self._db.create_container_if_not_exists(id=messages_container, partition_key=PartitionKey(path='/job_id'))
+            logging.info('Cosmos init success: db=%s containers=[%s,%s,%s,%s]', database_name, jobs_container, steps_container, citations_container, messages_container)
         except Exception as e:
             if debug:
                 logging.error('Cosmos database/container ensure failed: %s\n%s', e, traceback.format_exc())
             raise RuntimeError(f'Failed ensuring database/containers: {e}')
+        # Result bodies live outside the job document (RESULT_STORE: cosmos | blob | inline)
+        results_container = get_config('COSMOS_RESULTS_CONTAINER', 'job_results')
+        self._results = ResultStores(get_config('RESULT_STORE', 'cosmos'), {
+            'cosmos': lambda: CosmosResultStore(self._db.create_container_if_not_exists(id=results_container, partition_key=PartitionKey(path='/job_id'))),
+            'blob': BlobResultStore.from_config,
+        })
+    def _remember_pk(self, job_id: str, user_id: Optional[str]):
+        if user_id is None: return
+        with self._pk_lock:
+            self._pk_cache[job_id]=user_id; self._pk_cache.move_to_end(job_id)
+            while len(self._pk_cache)>PK_CACHE_SIZE: self._pk_cache.popitem(last=False)
+    def _forget_pk(self, job_id: str):
+        with self._pk_lock: self._pk_cache.pop(job_id, None)
+    def _partition_for(self, job_id: str) -> Optional[str]:
+        with self._pk_lock: pk=self._pk_cache.get(job_id)
+        if pk is not None: return pk
+        # Cache miss (other replica created it / evicted): one cheap cross-partition lookup of the key only
+        self._stats['pk_lookups']+=1
+        items=list(self._jobs.query_items(query='SELECT VALUE c.user_id FROM c WHERE c.id=@id', parameters=[{'name':'@id','value':job_id}], enable_cross_partition_query=True))
+        if not items: return None
+        self._remember_pk(job_id, items[0]); return items[0]
+    def _read_job(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict]:
+        # Point read with the cached / hinted partition key; a wrong hint falls back to the lookup once
+        pk=self._partition_for(job_id) if user_id is None else user_id
+        for attempt in range(2):
+            if pk is None: return None
+            try:
+                self._stats['point_reads']+=1
+                job=self._jobs.read_item(item=job_id, partition_key=pk)
+                self._remember_pk(job_id, job.get('user_id')); return job
+            except CosmosResourceNotFoundError:
+                self._forget_pk(job_id)
+                if attempt: return None
+                pk=self._partition_for(job_id)
+        return None
+    def _patch_job(self, job_id: str, ops: List[Dict], guard=None) -> Optional[Dict]:
+        """Partial update + version increment in one request.
+
+        ``guard(job) -> bool``: read first and apply only if it holds, with the read's etag as
+        precondition; on a concurrent write (412) re-read and re-check. Without a guard the patch
+        is blind (no read). Returns the patched document, or None if missing / guard refused.
+        """
+        ops=ops+[{'op':'incr','path':'/version','value':1}]
+        for attempt in range(PATCH_RETRIES):
+            kwargs={}
+            if guard is not None:
+                job=self._read_job(job_id)
+                if job is None or not guard(job): return None
+                pk=job['user_id']; kwargs={'etag':job.get('_etag'),'match_condition':MatchConditions.IfNotModified}
+            else:
+                pk=self._partition_for(job_id)
+                if pk is None: return None
+            try:
+                self._stats['patches']+=1
+                return self._jobs.patch_item(item=job_id, partition_key=pk, patch_operations=ops, **kwargs)
+            except CosmosAccessConditionFailedError:
+                self._stats['patch_conflicts']+=1
+            except CosmosResourceNotFoundError:
+                self._forget_pk(job_id)
+                if attempt: return None
+        logging.warning('Cosmos patch gave up after %d conflicts: job=%s', PATCH_RETRIES, job_id)
+        return None
     def delete_job(self, job_id: str):
-        items = list(self._jobs.query_items(query='SELECT c.id, c.user_id FROM c WHERE c.id=@id', parameters=[{'name':'@id','value':job_id}], enable_cross_partition_query=True))
-        if not items: return
-        user_id = items[0]['user_id']
-        for step in self._steps.query_items(query='SELECT c.id FROM c WHERE c.job_id=@job_id', parameters=[{'name':'@job_id','value':job_id}], enable_cross_partition_query=True):
+        job = self._read_job(job_id)
+        if not job: return
+        for step in self._steps.query_items(query='SELECT c.id FROM c', partition_key=job_id):
             self._steps.delete_item(item=step['id'], partition_key=job_id)
-        self._jobs.delete_item(item=job_id, partition_key=user_id)
-    def create_job(self, query: str, user_id: str = 'anonymous') -> str:
+        for cit in self._citations.query_items(query='SELECT c.id FROM c', partition_key=job_id):
+            self._citations.delete_item(item=cit['id'], partition_key=job_id)
+        for msg in self._messages.query_items(query='SELECT c.id FROM c', partition_key=job_id):
+            self._messages.delete_item(item=msg['id'], partition_key=job_id)
+        if job.get('result_ref'): self._results.delete(job['result_ref'])
+        self._jobs.delete_item(item=job_id, partition_key=job['user_id']); self._forget_pk(job_id)
+    def create_job(self, query: str, user_id: str = 'anonymous', idempotency_key: str = None, query_hash: str = None,
+                   key_created_after: str = None) -> str:
+        # No unique index here: a key held within the TTL window is checked by query first
+        # (concurrent replicas can still race; StartResearch serializes same-key requests per process)
+        if idempotency_key:
+            holder=self.get_job_by_idempotency_key(user_id, idempotency_key, created_after=key_created_after)
+            if holder: raise IdempotencyConflict(holder)
         job_id = str(uuid.uuid4())
-        doc = {'id':job_id,'user_id':user_id,'query':query,'status':'created','created_at':datetime.utcnow().replace(microsecond=0).isoformat()+'Z'}
-        self._jobs.create_item(doc); return job_id
+        doc = {'id':job_id,'user_id':user_id,'query':query,'status':'created','created_at':datetime.utcnow().replace(microsecond=0).isoformat()+'Z','version':0}
+        if idempotency_key: doc['idempotency_key']=idempotency_key
+        if query_hash: doc['query_hash']=query_hash
+        self._jobs.create_item(doc); self._remember_pk(job_id, user_id); return job_id
     def update_job_status(self, job_id: str, status: str, current_step: str = None, thread_id: str = None, run_id: str = None, agent_id: str = None):
-        job = self.get_job(job_id);
-        if not job: return
-        job['status']=status
-        if current_step is not None: job['current_step']=current_step
-        if thread_id is not None: job['thread_id']=thread_id
-        if run_id is not None: job['run_id']=run_id
-        if agent_id is not None: job['agent_id']=agent_id
-        if status in ('completed','failed'): job['completed_at']=datetime.utcnow().replace(microsecond=0).isoformat()+'Z'
-        self._jobs.replace_item(item=job, body=job)
-    def update_job_result(self, job_id: str, result: str):
-        job = self.get_job(job_id);
-        if not job: return
-        job['result']=result; job['status']='completed'; job['completed_at']=datetime.utcnow().replace(microsecond=0).isoformat()+'Z'
-        self._jobs.replace_item(item=job, body=job)
+        ops=[{'op':'set','path':'/status','value':status}]
+        if current_step is not None: ops.append({'op':'set','path':'/current_step','value':current_step})
+        if thread_id is not None: ops.append({'op':'set','path':'/thread_id','value':thread_id})
+        if run_id is not None: ops.append({'op':'set','path':'/run_id','value':run_id})
+        if agent_id is not None: ops.append({'op':'set','path':'/agent_id','value':agent_id})
+        if status in TERMINAL_STATUSES:
+            ops.append({'op':'set','path':'/completed_at','value':datetime.utcnow().replace(microsecond=0).isoformat()+'Z'})
+            self._patch_job(job_id, ops)
+        else:
+            # Progress updates must not drag a job another poller already finished back to in_progress
+            self._patch_job(job_id, ops, guard=lambda job: job.get('status') not in TERMINAL_STATUSES)
+    def update_job_result(self, job_id: str, result: str, current_step: str = None):
+        ops=[{'op':'set','path':'/status','value':'completed'},{'op':'set','path':'/completed_at','value':datetime.utcnow().replace(microsecond=0).isoformat()+'Z'}]
+        if current_step is not None: ops.append({'op':'set','path':'/current_step','value':current_step})
+        if self._results.inline: ops.append({'op':'set','path':'/result','value':result})
+        else:
+            ref, size=self._results.put(job_id, result)
+            ops+=[{'op':'set','path':'/result_ref','value':ref},{'op':'set','path':'/result_size','value':size}]
+        self._patch_job(job_id, ops)
     def update_job_error(self, job_id: str, error_message: str):
-        job = self.get_job(job_id);
-        if not job: return
-        job['error_message']=error_message; job['status']='failed'; job['completed_at']=datetime.utcnow().replace(microsecond=0).isoformat()+'Z'
-        self._jobs.replace_item(item=job, body=job)
-    def get_job(self, job_id: str) -> Optional[Dict]:
-        items = list(self._jobs.query_items(query='SELECT * FROM c WHERE c.id=@id', parameters=[{'name':'@id','value':job_id}], enable_cross_partition_query=True))
+        self._patch_job(job_id, [{'op':'set','path':'/error_message','value':error_message},{'op':'set','path':'/status','value':'failed'},
+                                 {'op':'set','path':'/completed_at','value':datetime.utcnow().replace(microsecond=0).isoformat()+'Z'}])
+    def get_job(self, job_id: str, user_id: str = None) -> Optional[Dict]:
+        return self._read_job(job_id, user_id)
+    def get_job_by_idempotency_key(self, user_id: str, idempotency_key: str, created_after: str = None) -> Optional[Dict]:
+        # Single-partition query (jobs are partitioned by user_id)
+        items=list(self._jobs.query_items(query='SELECT TOP 1 * FROM c WHERE c.idempotency_key=@k AND c.created_at >= @t ORDER BY c.created_at DESC',
+            parameters=[{'name':'@k','value':idempotency_key},{'name':'@t','value':created_after or ''}], partition_key=user_id))
+        if items: self._remember_pk(items[0]['id'], user_id)
+        return items[0] if items else None
+    def get_latest_completed_job(self, user_id: str, query_hash: str, completed_after: str = None) -> Optional[Dict]:
+        items=list(self._jobs.query_items(query="SELECT TOP 1 * FROM c WHERE c.query_hash=@h AND c.status='completed' AND c.completed_at >= @t ORDER BY c.completed_at DESC",
+            parameters=[{'name':'@h','value':query_hash},{'name':'@t','value':completed_after or ''}], partition_key=user_id))
+        if items: self._remember_pk(items[0]['id'], user_id)
         return items[0] if items else None
+    def get_jobs_by_ids(self, job_ids: List[str], user_id: str = None, fields=None) -> List[Dict]:
+        # One ARRAY_CONTAINS query per known partition (hint / pk cache), one cross-partition query for the rest
+        columns=resolve_fields(fields)
+        select='SELECT '+(', '.join(f'c.{f}' for f in columns) if columns else '*')+' FROM c WHERE ARRAY_CONTAINS(@ids, c.id)'
+        remaining=list(dict.fromkeys(job_ids)); groups: Dict[str, List[str]]={}
+        with self._pk_lock:
+            for jid in remaining: groups.setdefault(user_id or self._pk_cache.get(jid), []).append(jid)
+        found: Dict[str, Dict]={}
+        for pk, ids in groups.items():
+            if pk is None: continue
+            for it in self._jobs.query_items(query=select, parameters=[{'name':'@ids','value':ids}], partition_key=pk): found[it['id']]=it
+        rest=[jid for jid in remaining if jid not in found]
+        if rest:
+            self._stats['pk_lookups']+=1
+            for it in self._jobs.query_items(query=select, parameters=[{'name':'@ids','value':rest}], enable_cross_partition_query=True): found[it['id']]=it
+        for it in found.values(): self._remember_pk(it['id'], it.get('user_id'))
+        return [found[jid] for jid in remaining if jid in found]
+    def get_job_result(self, job_id: str) -> Optional[str]:
+        job = self._read_job(job_id)
+        if not job: return None
+        if job.get('result') is not None or not job.get('result_ref'): return job.get('result')
+        return self._results.get(job['result_ref'])
+    def get_job_version(self, job_id: str) -> Optional[int]:
+        job = self._read_job(job_id)
+        if not job: return None
+        return job.get('version') or 0
     def get_job_run_id(self, job_id: str) -> Optional[str]:
-        items = list(self._jobs.query_items(query='SELECT c.run_id FROM c WHERE c.id=@id', parameters=[{'name':'@id','value':job_id}], enable_cross_partition_query=True))
-        if items: return items[0].get('run_id'); return None
-    def get_jobs(self, user_id: str = None, status: str = None, limit: int = 50) -> List[Dict]:
+        job = self._read_job(job_id)
+        return job.get('run_id') if job else None
+    def get_jobs(self, user_id: str = None, status: str = None, limit: int = 50, fields=None) -> List[Dict]:
+        return self.get_jobs_page(user_id=user_id, status=status, limit=limit, fields=fields)[0]
+    def get_jobs_page(self, user_id: str = None, status: str = None, limit: int = 50, cursor: str = None, fields=None) -> Tuple[List[Dict], Optional[str]]:
+        # One page per call: Cosmos continuation tokens wrapped in our opaque cursor, so deep pages cost the same RU as the first
+        token=None
+        if cursor:
+            token=decode_cursor(cursor).get('ct')
+            if not token: raise ValueError('invalid cursor')
+        cond=[]; params=[]
+        if user_id: cond.append('c.user_id=@uid'); params.append({'name':'@uid','value':user_id})
+        if status: cond.append('c.status=@st'); params.append({'name':'@st','value':status})
+        columns=resolve_fields(fields)  # projection keeps result bodies out of list pages (and their RU)
+        query='SELECT '+(', '.join(f'c.{f}' for f in columns) if columns else '*')+' FROM c'+(' WHERE '+' AND '.join(cond) if cond else '')+' ORDER BY c.created_at DESC'
+        if user_id:
+            pages=self._jobs.query_items(query=query, parameters=params, partition_key=user_id, max_item_count=limit).by_page(token)
+        else:
+            pages=self._jobs.query_items(query=query, parameters=params, enable_cross_partition_query=True, max_item_count=limit).by_page(token)
+        items=list(next(pages, []))[:limit]
+        next_token=pages.continuation_token
+        for it in items: self._remember_pk(it.get('id'), it.get('user_id'))
+        return items, (encode_cursor({'ct':next_token}) if next_token else None)
+    def count_jobs_by_status(self, user_id: str = None) -> Dict[str, int]:
         if user_id:
-            query='SELECT TOP @limit * FROM c WHERE c.user_id=@uid'
-            params=[{'name':'@limit','value':limit},{'name':'@uid','value':user_id}]
-            if status:
-                query+=' AND c.status=@st'; params.append({'name':'@st','value':status})
-            return list(self._jobs.query_items(query=query, parameters=params, partition_key=user_id))
-        query='SELECT * FROM c'; params=[]
-        if status: query+=' WHERE c.status=@st'; params.append({'name':'@st','value':status})
-        query+=' ORDER BY c.created_at DESC'; items=list(self._jobs.query_items(query=query, parameters=params, enable_cross_partition_query=True))
-        return items[:limit]
+            items=self._jobs.query_items(query='SELECT c.status, COUNT(1) AS n FROM c GROUP BY c.status', partition_key=user_id)
+            return {it['status']: it['n'] for it in items if it.get('status')}
+        # The SDK cannot run GROUP BY across partitions: one cross-partition COUNT per known status
+        counts={}
+        for status in JOB_STATUSES:
+            n=next(iter(self._jobs.query_items(query='SELECT VALUE COUNT(1) FROM c WHERE c.status=@s', parameters=[{'name':'@s','value':status}], enable_cross_partition_query=True)), 0)
+            if n: counts[status]=n
+        return counts
     def add_job_step(self, job_id: str, step_name: str, step_details: str = None):
-        doc={'id':str(uuid.uuid4()),'job_id':job_id,'step_name':step_name,'step_details':step_details,'timestamp':datetime.utcnow().replace(microsecond=0).isoformat()+'Z'}
-        self._steps.create_item(doc)
+        self.add_job_steps(job_id, [(step_name, step_details)])
+    def _next_step_seqs(self, n: int) -> range:
+        # Epoch microseconds, strictly increasing in this process: orders steps within a batch and
+        # across batches written in the same second (timestamps have one-second resolution)
+        with self._seq_lock:
+            start=max(int(time.time()*1_000_000), self._step_seq+1); self._step_seq=start+n-1
+        return range(start, start+n)
+    def add_job_steps(self, job_id: str, steps: List[Tuple[str, Optional[str]]]):
+        # All steps share the /job_id partition: one transactional batch per 100 steps, then one version bump.
+        # The bump is a separate patch (the job lives in another container, outside the batch):
+        # every call costs the step writes plus one job patch.
+        if not steps: return
+        ts=datetime.utcnow().replace(microsecond=0).isoformat()+'Z'
+        docs=[{'id':str(uuid.uuid4()),'job_id':job_id,'step_name':name,'step_details':details,'timestamp':ts,'seq':seq}
+              for (name, details), seq in zip(steps, self._next_step_seqs(len(steps)))]
+        if len(docs)==1: self._steps.create_item(docs[0])
+        else:
+            for i in range(0, len(docs), 100):
+                self._steps.execute_item_batch(batch_operations=[('create',(d,)) for d in docs[i:i+100]], partition_key=job_id)
+        self._bump_version(job_id)
+    def _bump_version(self, job_id: str):
+        self._patch_job(job_id, [])
+    def get_stats(self) -> Dict[str, int]:
+        with self._pk_lock: cached=len(self._pk_cache)
+        return {'pk_cache_size':cached, **self._stats}
     def get_job_steps(self, job_id: str) -> List[Dict]:
-        return list(self._steps.query_items(query='SELECT * FROM c WHERE c.job_id=@job_id ORDER BY c.timestamp ASC', parameters=[{'name':'@job_id','value':job_id}], partition_key=job_id))
+        items=list(self._steps.query_items(query='SELECT * FROM c WHERE c.job_id=@job_id ORDER BY c.timestamp ASC', parameters=[{'name':'@job_id','value':job_id}], partition_key=job_id))
+        # seq breaks timestamp ties (steps written before it existed keep the query order)
+        items.sort(key=lambda it: (it.get('timestamp') or '', it.get('seq') or 0))
+        return items
+    def add_job_citations(self, job_id: str, citations: List[Dict]) -> int:
+        # id = hash of (type, marker, target) so duplicates are filtered before the batch and never stored twice
+        if not citations: return 0
+        existing={it['id'] for it in self._citations.query_items(query='SELECT c.id FROM c', partition_key=job_id)}
+        base=len(existing); docs=[]
+        for c in citations:
+            doc={k:(c.get(k) or '') for k in ('type','marker','url','file_id','title','quote')}
+            doc['type']=doc['type'] or 'url_citation'
+            doc['id']=hashlib.sha1('\n'.join((doc['type'],doc['marker'],doc['url'],doc['file_id'])).encode('utf-8')).hexdigest()
+            if doc['id'] in existing: continue
+            existing.add(doc['id']); doc['job_id']=job_id; doc['position']=base+len(docs); docs.append(doc)
+        for i in range(0, len(docs), 100):  # transactional batch limit
+            self._citations.execute_item_batch(batch_operations=[('create',(d,)) for d in docs[i:i+100]], partition_key=job_id)
+        if docs: self._bump_version(job_id)
+        return len(docs)
+    def get_job_citations(self, job_id: str) -> List[Dict]:
+        return list(self._citations.query_items(query='SELECT c.type, c.marker, c.url, c.file_id, c.title, c.quote, c.position FROM c ORDER BY c.position ASC', partition_key=job_id))
+    def add_job_messages(self, job_id: str, messages: List[Dict]) -> int:
+        # Message id is the document id (unique per /job_id partition); seq keeps arrival order
+        messages=[m for m in messages if m.get('id')]
+        if not messages: return 0
+        ids=[m['id'] for m in messages]
+        existing=set(self._messages.query_items(query='SELECT VALUE c.id FROM c WHERE ARRAY_CONTAINS(@ids, c.id)', parameters=[{'name':'@ids','value':ids}], partition_key=job_id))
+        top=list(self._messages.query_items(query='SELECT VALUE MAX(c.seq) FROM c', partition_key=job_id))
+        base=(top[0]+1) if top and top[0] is not None else 0; docs=[]
+        for m in messages:
+            if m['id'] in existing: continue
+            existing.add(m['id']); docs.append({'id':m['id'],'job_id':job_id,'seq':base+len(docs),'data':m})
+        for i in range(0, len(docs), 100):
+            self._messages.execute_item_batch(batch_operations=[('upsert',(d,)) for d in docs[i:i+100]], partition_key=job_id)
+        if docs: self._patch_job(job_id, [{'op':'set','path':'/last_message_id','value':docs[-1]['id']}])
+        return len(docs)
+    def get_job_messages(self, job_id: str, since_message_id: str = None) -> List[Dict]:
+        # Newest first; since_message_id -> only messages stored after it (all if unknown)
+        query='SELECT VALUE c.data FROM c'; params=[]
+        if since_message_id:
+            try:
+                since=self._messages.read_item(item=since_message_id, partition_key=job_id)
+                query+=' WHERE c.seq>@seq'; params.append({'name':'@seq','value':since['seq']})
+            except CosmosResourceNotFoundError:
+                pass
+        return list(self._messages.query_items(query=query+' ORDER BY c.seq DESC', parameters=params, partition_key=job_id))
@@ -0,0 +1,404 @@
+# In-process job backend (DATABASE_PROVIDER=memory, and the fallback when sqlite/cosmos cannot load).
+# Same contract as db_sqlite / db_cosmos. One lock guards everything; list queries walk
+# (created_at, id)-sorted indexes per user and per status instead of scanning every job.
+#
+# Memory is bounded by MEMORY_MAX_JOBS: past it, completed/failed jobs are evicted least
+# recently used first (jobs still running are never evicted). With MEMORY_SNAPSHOT_PATH set,
+# state is loaded from that JSON file on start and written back every
+# MEMORY_SNAPSHOT_INTERVAL_SECONDS when changed (and on close()).
+import bisect, json, os, threading, uuid, logging
+from collections import Counter, OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .cursors import encode_cursor, decode_cursor
+from .projection import JOB_FIELDS, resolve_fields
+from .errors import IdempotencyConflict
+
+MAX_JOBS = int(os.getenv('MEMORY_MAX_JOBS') or 10000)
+SNAPSHOT_PATH = os.getenv('MEMORY_SNAPSHOT_PATH') or None
+SNAPSHOT_INTERVAL_SECONDS = float(os.getenv('MEMORY_SNAPSHOT_INTERVAL_SECONDS') or 60)
+TERMINAL_STATUSES = ('completed', 'failed')
+CITATION_KEY = ('type', 'marker', 'url', 'file_id')
+
+def _now() -> str:
+    return datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
+
+class _SortedIndex:
+    """Job keys (created_at, id) kept ascending; read newest first."""
+    __slots__ = ('keys',)
+    def __init__(self):
+        self.keys: List[Tuple[str, str]] = []
+    def add(self, key: Tuple[str, str]):
+        bisect.insort(self.keys, key)
+    def remove(self, key: Tuple[str, str]):
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+    def newest_first(self, before: Optional[Tuple[str, str]] = None):
+        i = bisect.bisect_left(self.keys, before) if before is not None else len(self.keys)
+        keys = self.keys
+        for j in range(i - 1, -1, -1):
+            yield keys[j]
+
+class ResearchJobManager:
+    def __init__(self, max_jobs: Optional[int] = None, snapshot_path: Optional[str] = None):
+        self._lock = threading.RLock()
+        self._max_jobs = max(1, max_jobs or MAX_JOBS)
+        self._jobs: Dict[str, Dict] = {}
+        self._steps: Dict[str, List[Dict]] = {}
+        self._citations: Dict[str, List[Dict]] = {}
+        self._messages: Dict[str, 'OrderedDict[str, Dict]'] = {}  # job_id -> message id -> message, arrival order
+        self._all = _SortedIndex()
+        self._by_user: Dict[str, _SortedIndex] = {}
+        self._by_status: Dict[str, _SortedIndex] = {}
+        self._counts: Counter = Counter()                 # status -> n
+        self._user_counts: Dict[str, Counter] = {}        # user_id -> status -> n
+        self._terminal: 'OrderedDict[str, None]' = OrderedDict()  # eviction candidates, LRU first
+        self._by_idempotency: Dict[Tuple[str, str], str] = {}   # (user_id, idempotency_key) -> job_id
+        self._by_query_hash: Dict[Tuple[str, str], set] = {}    # (user_id, query_hash) -> job_ids
+        self._step_seq = 0
+        self._evictions = 0
+        self._snapshots = 0
+        self._dirty = False
+        self._snapshot_path = Path(snapshot_path or SNAPSHOT_PATH) if (snapshot_path or SNAPSHOT_PATH) else None
+        self._stop = threading.Event()
+        self._snapshot_thread = None
+        if self._snapshot_path is not None:
+            self._load_snapshot()
+            self._snapshot_thread = threading.Thread(target=self._snapshot_loop, name='memory-jobs-snapshot', daemon=True)
+            self._snapshot_thread.start()
+
+    # --- indexes -------------------------------------------------------------------------
+    def _index(self, job: Dict):
+        key = (job['created_at'], job['id'])
+        self._all.add(key)
+        self._by_user.setdefault(job['user_id'], _SortedIndex()).add(key)
+        self._by_status.setdefault(job['status'], _SortedIndex()).add(key)
+        self._counts[job['status']] += 1
+        self._user_counts.setdefault(job['user_id'], Counter())[job['status']] += 1
+        if job['status'] in TERMINAL_STATUSES:
+            self._terminal[job['id']] = None
+        if job.get('idempotency_key'):
+            self._by_idempotency[(job['user_id'], job['idempotency_key'])] = job['id']
+        if job.get('query_hash'):
+            self._by_query_hash.setdefault((job['user_id'], job['query_hash']), set()).add(job['id'])
+    def _unindex(self, job: Dict):
+        key = (job['created_at'], job['id'])
+        self._all.remove(key)
+        self._by_user[job['user_id']].remove(key)
+        self._by_status[job['status']].remove(key)
+        self._counts[job['status']] -= 1
+        self._user_counts[job['user_id']][job['status']] -= 1
+        self._terminal.pop(job['id'], None)
+        if job.get('idempotency_key'):
+            self._by_idempotency.pop((job['user_id'], job['idempotency_key']), None)
+        if job.get('query_hash'):
+            ids = self._by_query_hash.get((job['user_id'], job['query_hash']))
+            if ids is not None:
+                ids.discard(job['id'])
+                if not ids:
+                    del self._by_query_hash[(job['user_id'], job['query_hash'])]
+    def _set_status(self, job: Dict, status: str):
+        old = job['status']
+        if old != status:
+            key = (job['created_at'], job['id'])
+            self._by_status[old].remove(key)
+            self._by_status.setdefault(status, _SortedIndex()).add(key)
+            self._counts[old] -= 1
+            self._counts[status] += 1
+            user_counts = self._user_counts[job['user_id']]
+            user_counts[old] -= 1
+            user_counts[status] += 1
+            job['status'] = status
+        if status in TERMINAL_STATUSES:
+            self._terminal[job['id']] = None
+            self._terminal.move_to_end(job['id'])
+        else:
+            self._terminal.pop(job['id'], None)
+    def _touch(self, job_id: str):
+        if job_id in self._terminal:
+            self._terminal.move_to_end(job_id)
+    def _evict(self):
+        while len(self._jobs) > self._max_jobs and self._terminal:
+            job_id, _ = self._terminal.popitem(last=False)
+            self._drop(job_id)
+            self._evictions += 1
+    def _drop(self, job_id: str):
+        job = self._jobs.pop(job_id, None)
+        if job is not None:
+            self._unindex(job)
+        self._steps.pop(job_id, None)
+        self._citations.pop(job_id, None)
+        self._messages.pop(job_id, None)
+
+    # --- jobs ----------------------------------------------------------------------------
+    def delete_job(self, job_id: str):
+        with self._lock:
+            self._drop(job_id)
+            self._dirty = True
+    def create_job(self, query: str, user_id: str = 'anonymous', idempotency_key: str = None, query_hash: str = None,
+                   key_created_after: str = None) -> str:
+        job_id = str(uuid.uuid4())
+        job = dict.fromkeys(JOB_FIELDS)
+        job.update(id=job_id, user_id=user_id, query=query, status='created', created_at=_now(), version=0,
+                   idempotency_key=idempotency_key, query_hash=query_hash)
+        with self._lock:
+            holder = self._jobs.get(self._by_idempotency.get((user_id, idempotency_key))) if idempotency_key else None
+            if holder is not None:
+                if holder['created_at'] >= (key_created_after or ''):
+                    self._touch(holder['id'])
+                    raise IdempotencyConflict(dict(holder))
+                holder['idempotency_key'] = None  # expired: the new job takes the key over
+            self._jobs[job_id] = job
+            self._index(job)
+            self._evict()
+            self._dirty = True
+        return job_id
+    def update_job_status(self, job_id: str, status: str, current_step: str = None,
+                          thread_id: str = None, run_id: str = None, agent_id: str = None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            self._set_status(job, status)
+            job['current_step'] = current_step
+            if status in TERMINAL_STATUSES:
+                job['completed_at'] = _now()
+            for name, value in (('thread_id', thread_id), ('run_id', run_id), ('agent_id', agent_id)):
+                if value is not None:
+                    job[name] = value
+            job['version'] += 1
+            self._evict()
+            self._dirty = True
+    def update_job_result(self, job_id: str, result: str, current_step: str = None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            self._set_status(job, 'completed')
+            if current_step is not None:
+                job['current_step'] = current_step
+            job.update(result=result, result_size=len(result.encode('utf-8')) if result is not None else None,
+                       completed_at=_now(), version=job['version'] + 1)
+            self._evict()
+            self._dirty = True
+    def update_job_error(self, job_id: str, error_message: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            self._set_status(job, 'failed')
+            job.update(error_message=error_message, completed_at=_now(), version=job['version'] + 1)
+            self._evict()
+            self._dirty = True
+    def get_job(self, job_id: str, user_id: str = None) -> Optional[Dict]:
+        # user_id: partition hint used by the Cosmos backend; unused here
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._touch(job_id)
+            return dict(job)
+    def get_job_by_idempotency_key(self, user_id: str, idempotency_key: str, created_after: str = None) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(self._by_idempotency.get((user_id, idempotency_key)))
+            if job is None or job['created_at'] < (created_after or ''):
+                return None
+            self._touch(job['id'])
+            return dict(job)
+    def get_latest_completed_job(self, user_id: str, query_hash: str, completed_after: str = None) -> Optional[Dict]:
+        with self._lock:
+            done = [j for j in (self._jobs.get(i) for i in self._by_query_hash.get((user_id, query_hash), ()))
+                    if j is not None and j['status'] == 'completed' and (j['completed_at'] or '') >= (completed_after or '')]
+            if not done:
+                return None
+            job = max(done, key=lambda j: j['completed_at'] or '')
+            self._touch(job['id'])
+            return dict(job)
+    def get_jobs_by_ids(self, job_ids: List[str], user_id: str = None, fields=None) -> List[Dict]:
+        columns = resolve_fields(fields)
+        with self._lock:
+            jobs = [self._jobs[i] for i in dict.fromkeys(job_ids) if i in self._jobs]
+            return [{c: job[c] for c in columns} if columns else dict(job) for job in jobs]
+    def get_job_result(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._touch(job_id)
+            return job['result']
+    def get_job_version(self, job_id: str) -> Optional[int]:
+        job = self._jobs.get(job_id)
+        return job['version'] if job else None
+    def get_job_run_id(self, job_id: str) -> Optional[str]:
+        job = self._jobs.get(job_id)
+        return job['run_id'] if job else None
+    def get_jobs(self, user_id: str = None, status: str = None, limit: int = 50, fields=None) -> List[Dict]:
+        return self.get_jobs_page(user_id=user_id, status=status, limit=limit, fields=fields)[0]
+    def get_jobs_page(self, user_id: str = None, status: str = None, limit: int = 50,
+                      cursor: str = None, fields=None) -> Tuple[List[Dict], Optional[str]]:
+        """Newest-first page plus an opaque keyset cursor, as in db_sqlite."""
+        columns = resolve_fields(fields)
+        before = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if 'c' not in after or 'i' not in after:
+                raise ValueError('invalid cursor')
+            before = (after['c'], after['i'])
+        with self._lock:
+            # Walk the smaller of the user / status indexes and filter on the other field
+            empty = _SortedIndex()
+            candidates = [self._by_user.get(user_id, empty) if user_id else None,
+                          self._by_status.get(status, empty) if status else None]
+            candidates = [c for c in candidates if c is not None] or [self._all]
+            index = min(candidates, key=lambda c: len(c.keys))
+            rows = []
+            for _, job_id in index.newest_first(before):
+                job = self._jobs[job_id]
+                if (user_id and job['user_id'] != user_id) or (status and job['status'] != status):
+                    continue
+                rows.append({c: job[c] for c in columns} if columns else dict(job))
+                if len(rows) > limit:
+                    break
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor({'c': last['created_at'], 'i': last['id']})
+        return rows, next_cursor
+    def count_jobs_by_status(self, user_id: str = None) -> Dict[str, int]:
+        with self._lock:
+            counts = self._user_counts.get(user_id, Counter()) if user_id else self._counts
+            return {status: n for status, n in counts.items() if n}
+
+    # --- steps / citations ---------------------------------------------------------------
+    def add_job_step(self, job_id: str, step_name: str, step_details: str = None):
+        self.add_job_steps(job_id, [(step_name, step_details)])
+    def add_job_steps(self, job_id: str, steps: List[Tuple[str, Optional[str]]]):
+        if not steps:
+            return
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            stored = self._steps.setdefault(job_id, [])
+            for name, details in steps:
+                self._step_seq += 1
+                stored.append({'id': self._step_seq, 'job_id': job_id, 'step_name': name,
+                               'step_details': details, 'timestamp': timestamp})
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job['version'] += 1
+            self._dirty = True
+    def get_job_steps(self, job_id: str):
+        with self._lock:
+            return [dict(s) for s in self._steps.get(job_id, ())]
+    def add_job_citations(self, job_id: str, citations: List[Dict]) -> int:
+        """Append; citations already stored for the job (same type/marker/target) are skipped."""
+        if not citations:
+            return 0
+        with self._lock:
+            stored = self._citations.setdefault(job_id, [])
+            seen = {tuple(c[k] for k in CITATION_KEY) for c in stored}
+            added = 0
+            for c in citations:
+                rec = {k: c.get(k) or '' for k in ('type', 'marker', 'url', 'file_id', 'title', 'quote')}
+                rec['type'] = rec['type'] or 'url_citation'
+                key = tuple(rec[k] for k in CITATION_KEY)
+                if key in seen:
+                    continue
+                seen.add(key)
+                rec['position'] = len(stored)
+                stored.append(rec)
+                added += 1
+            job = self._jobs.get(job_id)
+            if added and job is not None:
+                job['version'] += 1
+            if added:
+                self._dirty = True
+            return added
+    def get_job_citations(self, job_id: str) -> List[Dict]:
+        with self._lock:
+            return [dict(c) for c in self._citations.get(job_id, ())]
+
+    def add_job_messages(self, job_id: str, messages: List[Dict]) -> int:
+        """Append thread messages (oldest first); ids already stored are skipped. Moves last_message_id."""
+        with self._lock:
+            stored = self._messages.setdefault(job_id, OrderedDict())
+            added = 0
+            for m in messages:
+                if m.get('id') and m['id'] not in stored:
+                    stored[m['id']] = dict(m)
+                    added += 1
+            job = self._jobs.get(job_id)
+            if added and job is not None:
+                job['last_message_id'] = next(reversed(stored))
+                job['version'] += 1
+            if added:
+                self._dirty = True
+            return added
+    def get_job_messages(self, job_id: str, since_message_id: str = None) -> List[Dict]:
+        """Stored messages newest first; with since_message_id only those stored after it (all if unknown)."""
+        with self._lock:
+            out = []
+            for message_id, m in reversed(self._messages.get(job_id, OrderedDict()).items()):
+                if message_id == since_message_id:
+                    return out
+                out.append(dict(m))
+            return out
+
+    # --- snapshot / stats ----------------------------------------------------------------
+    def _load_snapshot(self):
+        try:
+            data = json.loads(self._snapshot_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable job snapshot {self._snapshot_path}: {e}")
+            return
+        with self._lock:
+            for job in data.get('jobs', []):
+                rec = dict.fromkeys(JOB_FIELDS)
+                rec.update(job)
+                self._jobs[rec['id']] = rec
+                self._index(rec)
+            self._steps = {k: list(v) for k, v in data.get('steps', {}).items() if k in self._jobs}
+            self._citations = {k: list(v) for k, v in data.get('citations', {}).items() if k in self._jobs}
+            self._messages = {k: OrderedDict((m['id'], m) for m in v) for k, v in data.get('messages', {}).items() if k in self._jobs}
+            self._step_seq = max((s['id'] for v in self._steps.values() for s in v), default=0)
+            self._evict()
+    def snapshot(self) -> bool:
+        """Write state to the snapshot file if it changed since the last write."""
+        if self._snapshot_path is None:
+            return False
+        with self._lock:
+            if not self._dirty:
+                return False
+            # Oldest first so a reload re-creates the LRU order of terminal jobs roughly
+            data = json.dumps({'jobs': [self._jobs[i] for _, i in self._all.keys],
+                               'steps': self._steps, 'citations': self._citations,
+                               'messages': {k: list(v.values()) for k, v in self._messages.items()}},
+                              ensure_ascii=False, default=str)
+            self._dirty = False
+        tmp = self._snapshot_path.with_suffix('.tmp')
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(data, encoding='utf-8')
+        os.replace(tmp, self._snapshot_path)
+        self._snapshots += 1
+        return True
+    def _snapshot_loop(self):
+        while not self._stop.wait(SNAPSHOT_INTERVAL_SECONDS):
+            try:
+                self.snapshot()
+            except Exception as e:
+                self._dirty = True
+                logging.warning(f"Job snapshot failed: {e}")
+    def close(self):
+        self._stop.set()
+        if self._snapshot_path is not None:
+            self.snapshot()
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {'jobs': len(self._jobs), 'terminal': len(self._terminal), 'max_jobs': self._max_jobs,
+                    'evictions': self._evictions, 'users': len(self._user_counts),
+                    'snapshot_path': str(self._snapshot_path) if self._snapshot_path else None,
+                    'snapshots': self._snapshots}
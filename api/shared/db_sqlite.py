@@ -1,119 +1,459 @@
 # copied from DeepResearchFunctionApp/shared/db_sqlite.py
-import sqlite3, uuid
+import sqlite3, uuid, os, threading, json
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
+from .cursors import encode_cursor, decode_cursor
+from .projection import resolve_fields
+from .errors import IdempotencyConflict
+from .result_store import ResultStores, SqliteResultStore, BlobResultStore, file_store_factory
 
-DB_PATH = Path(__file__).parent / 'research_jobs.db'
+DB_PATH = Path(os.getenv('SQLITE_DB_PATH') or (Path(__file__).parent / 'research_jobs.db'))
+
+# Connection tuning. One long-lived connection per thread (sqlite3 connections are not
+# safe to share between threads mid-transaction); WAL lets readers run alongside the writer.
+BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS') or 5000)
+# Read ListJobs stats from the trigger-maintained job_status_counts table (0 = GROUP BY on research_jobs)
+USE_STATUS_COUNTERS = (os.getenv('SQLITE_STATUS_COUNTERS') or '1').lower() not in ('0', 'false', 'no')
+STATEMENT_CACHE_SIZE = 256
+IN_CHUNK_SIZE = 500  # ids per IN (...) query, below SQLITE_MAX_VARIABLE_NUMBER on old builds (999)
+# Where update_job_result puts result bodies (see shared/result_store.py): sqlite | file | blob | inline
+RESULT_STORE = os.getenv('RESULT_STORE') or 'sqlite'
+PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',  # durable across app crashes in WAL mode; fsync only at checkpoints
+    f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}',
+    'PRAGMA temp_store=MEMORY',
+)
+
+def _migration_1_base_tables(conn: sqlite3.Connection):
+    conn.execute('''CREATE TABLE IF NOT EXISTS research_jobs (
+            id TEXT PRIMARY KEY,
+            user_id TEXT DEFAULT 'anonymous',
+            query TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP,
+            current_step TEXT,
+            result TEXT,
+            error_message TEXT,
+            thread_id TEXT,
+            run_id TEXT,
+            agent_id TEXT
+        )''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS job_steps (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT,
+            step_name TEXT,
+            step_details TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''')
+
+def _migration_2_job_version(conn: sqlite3.Connection):
+    # version: bumped by every job/step mutation (used as ETag)
+    cols = [r[1] for r in conn.execute('PRAGMA table_info(research_jobs)')]
+    if 'version' not in cols:
+        conn.execute('ALTER TABLE research_jobs ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+
+def _migration_3_query_indexes(conn: sqlite3.Connection):
+    # Match the actual query shapes: steps by job in timestamp order (id = rowid breaks ties),
+    # jobs by user newest first, jobs by status newest first (status poller / filtered ListJobs)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_job_steps_job_ts ON job_steps (job_id, timestamp)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_user_created ON research_jobs (user_id, created_at DESC)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON research_jobs (status, created_at DESC)')
+
+def _migration_4_status_counters(conn: sqlite3.Connection):
+    # Per-user status counters kept current by triggers, so ListJobs stats read O(statuses) rows
+    conn.execute('''CREATE TABLE IF NOT EXISTS job_status_counts (
+            user_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, status)
+        )''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_jobs_count_insert AFTER INSERT ON research_jobs BEGIN
+            INSERT INTO job_status_counts (user_id, status, count) VALUES (IFNULL(NEW.user_id, ''), NEW.status, 1)
+                ON CONFLICT (user_id, status) DO UPDATE SET count = count + 1;
+        END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_jobs_count_update AFTER UPDATE OF status, user_id ON research_jobs
+        WHEN OLD.status IS NOT NEW.status OR OLD.user_id IS NOT NEW.user_id BEGIN
+            UPDATE job_status_counts SET count = count - 1 WHERE user_id = IFNULL(OLD.user_id, '') AND status = OLD.status;
+            INSERT INTO job_status_counts (user_id, status, count) VALUES (IFNULL(NEW.user_id, ''), NEW.status, 1)
+                ON CONFLICT (user_id, status) DO UPDATE SET count = count + 1;
+        END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_jobs_count_delete AFTER DELETE ON research_jobs BEGIN
+            UPDATE job_status_counts SET count = count - 1 WHERE user_id = IFNULL(OLD.user_id, '') AND status = OLD.status;
+        END''')
+    conn.execute('DELETE FROM job_status_counts')
+    conn.execute('''INSERT INTO job_status_counts (user_id, status, count)
+            SELECT IFNULL(user_id, ''), status, COUNT(*) FROM research_jobs GROUP BY IFNULL(user_id, ''), status''')
+
+def _migration_5_keyset_indexes(conn: sqlite3.Connection):
+    # Keyset pagination orders by (created_at, id); carry id in the index so pages never sort
+    conn.execute('DROP INDEX IF EXISTS idx_jobs_user_created')
+    conn.execute('DROP INDEX IF EXISTS idx_jobs_status_created')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_user_created_id ON research_jobs (user_id, created_at DESC, id DESC)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_created_id ON research_jobs (status, created_at DESC, id DESC)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created_id ON research_jobs (created_at DESC, id DESC)')
+
+CITATION_COLUMNS = ('type', 'marker', 'url', 'file_id', 'title', 'quote', 'position')
+
+def _parse_legacy_citation(detail: str) -> Optional[Dict]:
+    # Pre-v6 rows: "marker: url-or-file_id [title-or-quote]" in job_steps
+    marker, sep, rest = (detail or '').partition(': ')
+    if not sep:
+        return None
+    rest = rest.strip()
+    title = ''
+    if rest.endswith(']') and ' [' in rest:
+        rest, _, title = rest[:-1].rpartition(' [')
+    kind = 'url_citation' if '://' in rest else 'file_citation'
+    return {'type': kind, 'marker': marker.strip(),
+            'url': rest if kind == 'url_citation' else '', 'file_id': rest if kind == 'file_citation' else '',
+            'title': title if kind == 'url_citation' else '', 'quote': title if kind == 'file_citation' else ''}
+
+def _migration_6_job_citations(conn: sqlite3.Connection):
+    # Typed citations, one row per distinct (marker, target) per job; replaces "citation" job_steps
+    conn.execute('''CREATE TABLE IF NOT EXISTS job_citations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            marker TEXT NOT NULL DEFAULT '',
+            url TEXT NOT NULL DEFAULT '',
+            file_id TEXT NOT NULL DEFAULT '',
+            title TEXT NOT NULL DEFAULT '',
+            quote TEXT NOT NULL DEFAULT '',
+            UNIQUE (job_id, type, marker, url, file_id)
+        )''')
+    positions: Dict[str, int] = {}
+    migrated = []
+    rows = conn.execute("SELECT id, job_id, step_details FROM job_steps WHERE step_name = 'citation' ORDER BY job_id, timestamp, id").fetchall()
+    for step_id, job_id, detail in rows:
+        c = _parse_legacy_citation(detail)
+        if c is None:
+            continue
+        migrated.append((step_id,))
+        pos = positions.get(job_id, 0)
+        cur = conn.execute('''INSERT OR IGNORE INTO job_citations (job_id, position, type, marker, url, file_id, title, quote)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', (job_id, pos, c['type'], c['marker'], c['url'], c['file_id'], c['title'], c['quote']))
+        positions[job_id] = pos + cur.rowcount
+    conn.executemany('DELETE FROM job_steps WHERE id = ?', migrated)
+
+def _migration_7_result_store(conn: sqlite3.Connection):
+    # Result bodies move out of research_jobs (compressed, see result_store.py); rows keep ref + size.
+    # Legacy inline results stay where they are and are still served by get_job_result.
+    cols = [r[1] for r in conn.execute('PRAGMA table_info(research_jobs)')]
+    if 'result_ref' not in cols:
+        conn.execute('ALTER TABLE research_jobs ADD COLUMN result_ref TEXT')
+    if 'result_size' not in cols:
+        conn.execute('ALTER TABLE research_jobs ADD COLUMN result_size INTEGER')
+    conn.execute('''CREATE TABLE IF NOT EXISTS job_results (
+            job_id TEXT PRIMARY KEY,
+            data BLOB NOT NULL
+        )''')
+
+def _migration_8_job_messages(conn: sqlite3.Connection):
+    # Thread messages persisted as they arrive (seq = arrival order); last_message_id is the fetch cursor
+    cols = [r[1] for r in conn.execute('PRAGMA table_info(research_jobs)')]
+    if 'last_message_id' not in cols:
+        conn.execute('ALTER TABLE research_jobs ADD COLUMN last_message_id TEXT')
+    conn.execute('''CREATE TABLE IF NOT EXISTS job_messages (
+            job_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            message_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (job_id, seq),
+            UNIQUE (job_id, message_id)
+        )''')
+
+def _migration_9_job_reuse(conn: sqlite3.Connection):
+    # Idempotency-Key of the StartResearch that created the job (unique per user) and the
+    # normalized query fingerprint used to reuse recent results
+    cols = [r[1] for r in conn.execute('PRAGMA table_info(research_jobs)')]
+    if 'idempotency_key' not in cols:
+        conn.execute('ALTER TABLE research_jobs ADD COLUMN idempotency_key TEXT')
+    if 'query_hash' not in cols:
+        conn.execute('ALTER TABLE research_jobs ADD COLUMN query_hash TEXT')
+    conn.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_user_idempotency ON research_jobs (user_id, idempotency_key)
+            WHERE idempotency_key IS NOT NULL''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_jobs_user_query_hash ON research_jobs (user_id, query_hash, completed_at DESC)
+            WHERE query_hash IS NOT NULL''')
+
+# (version, migration) in order; append only. Each runs once per DB file.
+MIGRATIONS = [
+    (1, _migration_1_base_tables),
+    (2, _migration_2_job_version),
+    (3, _migration_3_query_indexes),
+    (4, _migration_4_status_counters),
+    (5, _migration_5_keyset_indexes),
+    (6, _migration_6_job_citations),
+    (7, _migration_7_result_store),
+    (8, _migration_8_job_messages),
+    (9, _migration_9_job_reuse),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
 
 class ResearchJobManager:
-    def __init__(self):
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = str(db_path or DB_PATH)
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
         self.init_database()
+        self._results = ResultStores(RESULT_STORE, {
+            'sqlite': lambda: SqliteResultStore(self._conn),
+            'file': file_store_factory(Path(self._db_path).parent / 'results'),
+            'blob': BlobResultStore.from_config,
+        })
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                   cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+    def close(self):
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
     def init_database(self):
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            conn.execute('''CREATE TABLE IF NOT EXISTS research_jobs (
-                    id TEXT PRIMARY KEY,
-                    user_id TEXT DEFAULT 'anonymous',
-                    query TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    completed_at TIMESTAMP,
-                    current_step TEXT,
-                    result TEXT,
-                    error_message TEXT,
-                    thread_id TEXT,
-                    run_id TEXT,
-                    agent_id TEXT
-                )''')
-            conn.execute('''CREATE TABLE IF NOT EXISTS job_steps (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    job_id TEXT,
-                    step_name TEXT,
-                    step_details TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )''')
+        """Bring the DB file up to SCHEMA_VERSION (recorded in PRAGMA user_version)."""
+        conn = self._conn()
+        if self.get_schema_version() >= SCHEMA_VERSION:
+            return
+        # IMMEDIATE: take the write lock up front so concurrent workers migrate one at a time
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            current = self.get_schema_version()
+            for version, migrate in MIGRATIONS:
+                if version > current:
+                    migrate(conn)
+                    conn.execute(f'PRAGMA user_version = {int(version)}')
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    def get_schema_version(self) -> int:
+        return self._conn().execute('PRAGMA user_version').fetchone()[0]
     def delete_job(self, job_id: str):
-        with sqlite3.connect(str(DB_PATH)) as conn:
+        conn = self._conn()
+        row = conn.execute('SELECT result_ref FROM research_jobs WHERE id = ?', (job_id,)).fetchone()
+        with conn:
             conn.execute('DELETE FROM job_steps WHERE job_id = ?', (job_id,))
+            conn.execute('DELETE FROM job_citations WHERE job_id = ?', (job_id,))
+            conn.execute('DELETE FROM job_messages WHERE job_id = ?', (job_id,))
             conn.execute('DELETE FROM research_jobs WHERE id = ?', (job_id,))
-            conn.commit()
-    def create_job(self, query: str, user_id: str = 'anonymous') -> str:
+        if row and row[0]:
+            self._results.delete(row[0])
+    def create_job(self, query: str, user_id: str = 'anonymous', idempotency_key: str = None, query_hash: str = None,
+                   key_created_after: str = None) -> str:
+        """New job id. Raises IdempotencyConflict when idempotency_key is held by a job of user_id
+        created at or after key_created_after; older holders lose the key."""
         job_id = str(uuid.uuid4())
         created_at = datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            conn.execute('''INSERT INTO research_jobs (id, user_id, query, status, created_at)
-                VALUES (?, ?, ?, ?, ?)''', (job_id, user_id, query, 'created', created_at))
-            conn.commit()
+        conn = self._conn()
+        try:
+            with conn:
+                if idempotency_key and key_created_after:
+                    # Release expired keys first, so the unique index only spans the TTL window
+                    conn.execute('''UPDATE research_jobs SET idempotency_key=NULL
+                        WHERE user_id = ? AND idempotency_key = ? AND created_at < ?''', (user_id, idempotency_key, key_created_after))
+                conn.execute('''INSERT INTO research_jobs (id, user_id, query, status, created_at, idempotency_key, query_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)''', (job_id, user_id, query, 'created', created_at, idempotency_key, query_hash))
+        except sqlite3.IntegrityError:
+            existing = self.get_job_by_idempotency_key(user_id, idempotency_key) if idempotency_key else None
+            if existing is None:
+                raise
+            raise IdempotencyConflict(existing)
         return job_id
     def update_job_status(self, job_id: str, status: str, current_step: str = None,
                           thread_id: str = None, run_id: str = None, agent_id: str = None):
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            cursor = conn.execute('SELECT thread_id, run_id, agent_id FROM research_jobs WHERE id = ?', (job_id,))
-            row = cursor.fetchone()
-            prev_thread_id = row[0] if row else None
-            prev_run_id = row[1] if row else None
-            prev_agent_id = row[2] if row else None
-            new_thread_id = thread_id if thread_id is not None else prev_thread_id
-            new_run_id = run_id if run_id is not None else prev_run_id
-            new_agent_id = agent_id if agent_id is not None else prev_agent_id
+        # None ids keep the stored value (COALESCE) so no read is needed before the write
+        conn = self._conn()
+        with conn:
             if status in ('completed', 'failed'):
                 completed_at = datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
                 conn.execute('''UPDATE research_jobs SET status=?, current_step=?, completed_at=?,
-                        thread_id=?, run_id=?, agent_id=? WHERE id = ?''',
-                        (status, current_step, completed_at, new_thread_id, new_run_id, new_agent_id, job_id))
+                        thread_id=COALESCE(?, thread_id), run_id=COALESCE(?, run_id), agent_id=COALESCE(?, agent_id),
+                        version=version+1 WHERE id = ?''',
+                        (status, current_step, completed_at, thread_id, run_id, agent_id, job_id))
             else:
-                conn.execute('''UPDATE research_jobs SET status=?, current_step=?, thread_id=?, run_id=?, agent_id=?
-                        WHERE id = ?''', (status, current_step, new_thread_id, new_run_id, new_agent_id, job_id))
-            conn.commit()
-    def update_job_result(self, job_id: str, result: str):
+                conn.execute('''UPDATE research_jobs SET status=?, current_step=?,
+                        thread_id=COALESCE(?, thread_id), run_id=COALESCE(?, run_id), agent_id=COALESCE(?, agent_id),
+                        version=version+1 WHERE id = ?''', (status, current_step, thread_id, run_id, agent_id, job_id))
+    def update_job_result(self, job_id: str, result: str, current_step: str = None):
+        """Store the result and mark the job completed in one write (current_step too, if given)."""
         completed_at = datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            conn.execute('''UPDATE research_jobs SET result=?, status='completed', completed_at=? WHERE id=?''',
-                         (result, completed_at, job_id))
-            conn.commit()
+        conn = self._conn()
+        if self._results.inline:
+            with conn:
+                conn.execute('''UPDATE research_jobs SET result=?, status='completed', completed_at=?,
+                    current_step=COALESCE(?, current_step), version=version+1 WHERE id=?''',
+                             (result, completed_at, current_step, job_id))
+            return
+        # Body first, then the reference: a crash in between leaves an orphan blob, never a dangling ref
+        ref, size = self._results.put(job_id, result)
+        with conn:
+            conn.execute('''UPDATE research_jobs SET result=NULL, result_ref=?, result_size=?, status='completed', completed_at=?,
+                current_step=COALESCE(?, current_step), version=version+1 WHERE id=?''', (ref, size, completed_at, current_step, job_id))
     def update_job_error(self, job_id: str, error_message: str):
         completed_at = datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            conn.execute('''UPDATE research_jobs SET error_message=?, status='failed', completed_at=? WHERE id=?''',
+        conn = self._conn()
+        with conn:
+            conn.execute('''UPDATE research_jobs SET error_message=?, status='failed', completed_at=?, version=version+1 WHERE id=?''',
                          (error_message, completed_at, job_id))
-            conn.commit()
-    def get_job(self, job_id: str) -> Optional[Dict]:
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute('SELECT * FROM research_jobs WHERE id = ?', (job_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+    def get_job(self, job_id: str, user_id: str = None) -> Optional[Dict]:
+        # user_id: partition hint used by the Cosmos backend; the primary key is enough here
+        row = self._conn().execute('SELECT * FROM research_jobs WHERE id = ?', (job_id,)).fetchone()
+        return dict(row) if row else None
+    def get_job_by_idempotency_key(self, user_id: str, idempotency_key: str, created_after: str = None) -> Optional[Dict]:
+        row = self._conn().execute('SELECT * FROM research_jobs WHERE user_id = ? AND idempotency_key = ? AND created_at >= ?',
+                                   (user_id, idempotency_key, created_after or '')).fetchone()
+        return dict(row) if row else None
+    def get_latest_completed_job(self, user_id: str, query_hash: str, completed_after: str = None) -> Optional[Dict]:
+        """Most recently completed job of user_id with this query fingerprint (completed_at >= completed_after)."""
+        row = self._conn().execute('''SELECT * FROM research_jobs WHERE user_id = ? AND query_hash = ? AND completed_at >= ?
+                AND status = 'completed' ORDER BY completed_at DESC LIMIT 1''',
+                                   (user_id, query_hash, completed_after or '')).fetchone()
+        return dict(row) if row else None
+    def get_jobs_by_ids(self, job_ids: List[str], user_id: str = None, fields=None) -> List[Dict]:
+        """Jobs for the given ids (in request order) with one IN (...) query per chunk; missing ids are left out."""
+        columns = resolve_fields(fields)
+        ids = list(dict.fromkeys(job_ids))
+        select = f"SELECT {', '.join(columns) if columns else '*'} FROM research_jobs WHERE id IN "
+        found = {}
+        for i in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[i:i + IN_CHUNK_SIZE]
+            for r in self._conn().execute(select + f"({', '.join('?' * len(chunk))})", chunk):
+                found[r['id']] = dict(r)
+        return [found[i] for i in ids if i in found]
+    def get_job_result(self, job_id: str) -> Optional[str]:
+        """Full result text: inline (legacy rows) or loaded from the result store."""
+        row = self._conn().execute('SELECT result, result_ref FROM research_jobs WHERE id = ?', (job_id,)).fetchone()
+        if not row:
+            return None
+        if row[0] is not None or not row[1]:
+            return row[0]
+        return self._results.get(row[1])
+    def get_job_version(self, job_id: str) -> Optional[int]:
+        row = self._conn().execute('SELECT version FROM research_jobs WHERE id = ?', (job_id,)).fetchone()
+        return row[0] if row else None
     def get_job_run_id(self, job_id: str) -> Optional[str]:
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            cursor = conn.execute('SELECT run_id FROM research_jobs WHERE id = ?', (job_id,))
-            row = cursor.fetchone()
-            return row[0] if row else None
-    def get_jobs(self, user_id: str = None, status: str = None, limit: int = 50) -> List[Dict]:
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            conn.row_factory = sqlite3.Row
-            query = 'SELECT * FROM research_jobs'
-            params = []
-            cond = []
-            if user_id:
-                cond.append('user_id = ?')
-                params.append(user_id)
-            if status:
-                cond.append('status = ?')
-                params.append(status)
-            if cond:
-                query += ' WHERE ' + ' AND '.join(cond)
-            query += ' ORDER BY created_at DESC LIMIT ?'
-            params.append(limit)
-            cursor = conn.execute(query, params)
-            return [dict(r) for r in cursor.fetchall()]
+        row = self._conn().execute('SELECT run_id FROM research_jobs WHERE id = ?', (job_id,)).fetchone()
+        return row[0] if row else None
+    def get_jobs(self, user_id: str = None, status: str = None, limit: int = 50, fields=None) -> List[Dict]:
+        return self.get_jobs_page(user_id=user_id, status=status, limit=limit, fields=fields)[0]
+    def get_jobs_page(self, user_id: str = None, status: str = None, limit: int = 50,
+                      cursor: str = None, fields=None) -> Tuple[List[Dict], Optional[str]]:
+        """Newest-first page of jobs plus an opaque cursor for the next page (None at the end).
+
+        Keyset pagination on (created_at, id): every page is an index range scan,
+        however deep into the history it is. ``fields`` ('summary', 'full' or a list of
+        columns) limits the columns read, so list views never load result bodies.
+        """
+        columns = resolve_fields(fields)
+        query = f"SELECT {', '.join(columns) if columns else '*'} FROM research_jobs"
+        params = []
+        cond = []
+        if user_id:
+            cond.append('user_id = ?')
+            params.append(user_id)
+        if status:
+            cond.append('status = ?')
+            params.append(status)
+        if cursor:
+            after = decode_cursor(cursor)
+            if 'c' not in after or 'i' not in after:
+                raise ValueError('invalid cursor')
+            cond.append('(created_at, id) < (?, ?)')
+            params.extend([after['c'], after['i']])
+        if cond:
+            query += ' WHERE ' + ' AND '.join(cond)
+        query += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+        rows = [dict(r) for r in self._conn().execute(query, params).fetchall()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor({'c': last['created_at'], 'i': last['id']})
+        return rows, next_cursor
+    def count_jobs_by_status(self, user_id: str = None) -> Dict[str, int]:
+        if USE_STATUS_COUNTERS:
+            query = 'SELECT status, SUM(count) AS n FROM job_status_counts'
+        else:
+            query = 'SELECT status, COUNT(*) AS n FROM research_jobs'
+        params = []
+        if user_id:
+            query += ' WHERE user_id = ?'
+            params.append(user_id)
+        query += ' GROUP BY status'
+        return {r['status']: r['n'] for r in self._conn().execute(query, params) if r['n']}
     def add_job_step(self, job_id: str, step_name: str, step_details: str = None):
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            conn.execute('''INSERT INTO job_steps (job_id, step_name, step_details) VALUES (?, ?, ?)''',
-                         (job_id, step_name, step_details))
-            conn.commit()
+        self.add_job_steps(job_id, [(step_name, step_details)])
+    def add_job_steps(self, job_id: str, steps: List[Tuple[str, Optional[str]]]):
+        """Insert (step_name, step_details) pairs in order, in one transaction with one version bump."""
+        if not steps:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany('''INSERT INTO job_steps (job_id, step_name, step_details) VALUES (?, ?, ?)''',
+                             [(job_id, name, details) for name, details in steps])
+            conn.execute('UPDATE research_jobs SET version=version+1 WHERE id=?', (job_id,))
     def get_job_steps(self, job_id: str):
-        with sqlite3.connect(str(DB_PATH)) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute('SELECT * FROM job_steps WHERE job_id=? ORDER BY timestamp ASC', (job_id,))
-            return [dict(r) for r in cursor.fetchall()]
+        cursor = self._conn().execute('SELECT * FROM job_steps WHERE job_id=? ORDER BY timestamp ASC, id ASC', (job_id,))
+        return [dict(r) for r in cursor.fetchall()]
+    def add_job_citations(self, job_id: str, citations: List[Dict]) -> int:
+        """Bulk insert; citations already stored for the job (same type/marker/target) are skipped."""
+        if not citations:
+            return 0
+        conn = self._conn()
+        with conn:
+            base = conn.execute('SELECT IFNULL(MAX(position) + 1, 0) FROM job_citations WHERE job_id=?', (job_id,)).fetchone()[0]
+            before = conn.total_changes
+            conn.executemany('''INSERT OR IGNORE INTO job_citations (job_id, position, type, marker, url, file_id, title, quote)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                [(job_id, base + i, c.get('type') or 'url_citation', c.get('marker') or '', c.get('url') or '',
+                  c.get('file_id') or '', c.get('title') or '', c.get('quote') or '') for i, c in enumerate(citations)])
+            added = conn.total_changes - before
+            if added:
+                conn.execute('UPDATE research_jobs SET version=version+1 WHERE id=?', (job_id,))
+        return added
+    def get_job_citations(self, job_id: str) -> List[Dict]:
+        cursor = self._conn().execute(f"SELECT {', '.join(CITATION_COLUMNS)} FROM job_citations WHERE job_id=? ORDER BY position ASC", (job_id,))
+        return [dict(r) for r in cursor.fetchall()]
+    def add_job_messages(self, job_id: str, messages: List[Dict]) -> int:
+        """Append thread messages (oldest first); ids already stored are skipped. Moves last_message_id."""
+        messages = [m for m in messages if m.get('id')]
+        if not messages:
+            return 0
+        conn = self._conn()
+        with conn:
+            base = conn.execute('SELECT IFNULL(MAX(seq) + 1, 0) FROM job_messages WHERE job_id=?', (job_id,)).fetchone()[0]
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO job_messages (job_id, seq, message_id, data) VALUES (?, ?, ?, ?)',
+                             [(job_id, base + i, m['id'], json.dumps(m, ensure_ascii=False, default=str)) for i, m in enumerate(messages)])
+            added = conn.total_changes - before
+            if added:
+                conn.execute('''UPDATE research_jobs SET last_message_id=(SELECT message_id FROM job_messages WHERE job_id=?
+                    ORDER BY seq DESC LIMIT 1), version=version+1 WHERE id=?''', (job_id, job_id))
+        return added
+    def get_job_messages(self, job_id: str, since_message_id: str = None) -> List[Dict]:
+        """Stored messages newest first; with since_message_id only those stored after it (all if unknown)."""
+        query = 'SELECT data FROM job_messages WHERE job_id=?'
+        params = [job_id]
+        if since_message_id:
+            query += ''' AND seq > IFNULL((SELECT seq FROM job_messages WHERE job_id=? AND message_id=?), -1)'''
+            params += [job_id, since_message_id]
+        cursor = self._conn().execute(query + ' ORDER BY seq DESC', params)
+        return [json.loads(r[0]) for r in cursor.fetchall()]
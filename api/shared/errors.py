@@ -0,0 +1,9 @@
+# Errors raised by the job backends (db_sqlite / db_memory / db_cosmos).
+from typing import Any, Dict
+
+class IdempotencyConflict(Exception):
+    """create_job: the user's idempotency key already belongs to a job created within the key TTL.
+    ``job`` is that job; callers answer with it instead of launching anything."""
+    def __init__(self, job: Dict[str, Any]):
+        super().__init__(f"idempotency key already used by job {job['id']}")
+        self.job = job
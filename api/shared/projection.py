@@ -0,0 +1,24 @@
+# Job field projections shared by the job backends.
+# 'summary' is what list views need; result / error_message bodies are only loaded for a single job.
+from typing import Iterable, Optional, Tuple, Union
+
+JOB_FIELDS = ('id', 'user_id', 'query', 'status', 'created_at', 'completed_at', 'current_step',
+              'result', 'result_ref', 'result_size', 'error_message', 'thread_id', 'run_id', 'agent_id', 'version',
+              'last_message_id', 'idempotency_key', 'query_hash')
+JOB_SUMMARY_FIELDS = ('id', 'user_id', 'query', 'status', 'created_at', 'completed_at', 'current_step',
+                      'result_size', 'thread_id', 'run_id', 'agent_id', 'version', 'last_message_id')
+
+def resolve_fields(fields: Union[None, str, Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    """None / 'full' -> None (whole row); 'summary' -> JOB_SUMMARY_FIELDS; else a validated tuple."""
+    if fields is None or fields == 'full':
+        return None
+    if fields == 'summary':
+        return JOB_SUMMARY_FIELDS
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    picked = tuple(dict.fromkeys(fields))
+    unknown = [f for f in picked if f not in JOB_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown job fields: {', '.join(unknown)}")
+    # id and created_at are needed for cursors
+    return tuple(dict.fromkeys(('id', 'created_at') + picked))
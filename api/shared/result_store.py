@@ -0,0 +1,188 @@
+# Out-of-row storage for job result bodies (long Deep Research markdown reports).
+# Jobs keep only result_ref ("<scheme>:<key>") and result_size (UTF-8 bytes); the text is
+# zlib-compressed into one of the stores below and read back only by get_job_result.
+#
+# RESULT_STORE selects where new results go:
+#   sqlite (SQLite backend default) - job_results table in the jobs DB
+#   cosmos (Cosmos backend default) - job_results container, partition /job_id
+#   file   - RESULT_STORE_PATH directory (default: ./results next to the jobs DB)
+#   blob   - Azure Blob Storage: RESULT_BLOB_CONTAINER + RESULT_BLOB_ACCOUNT_URL (managed identity)
+#            or RESULT_BLOB_CONNECTION_STRING; needs azure-storage-blob
+#   inline - legacy behaviour, result stays on the job row/document
+# Existing refs stay readable after RESULT_STORE changes: reads dispatch on the ref's scheme.
+import base64, os, zlib
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+try:
+    from azure.storage.blob import BlobServiceClient
+except Exception:
+    BlobServiceClient = None  # type: ignore
+try:
+    from azure.identity import DefaultAzureCredential
+except Exception:
+    DefaultAzureCredential = None  # type: ignore
+from .settings import get_config
+
+COMPRESSION_LEVEL = int(os.getenv('RESULT_STORE_COMPRESSION_LEVEL', '6'))
+
+def encode_result(text: str) -> bytes:
+    # 1-byte codec tag: 'z' zlib, 'r' raw (tiny results that do not shrink)
+    raw = text.encode('utf-8')
+    packed = zlib.compress(raw, COMPRESSION_LEVEL)
+    return b'z' + packed if len(packed) < len(raw) else b'r' + raw
+
+def decode_result(data: bytes) -> str:
+    tag, body = data[:1], data[1:]
+    if tag == b'z':
+        return zlib.decompress(body).decode('utf-8')
+    if tag == b'r':
+        return body.decode('utf-8')
+    raise ValueError(f'unknown result codec {tag!r}')
+
+def split_ref(ref: str) -> Tuple[str, str]:
+    scheme, sep, key = (ref or '').partition(':')
+    if not sep or not key:
+        raise ValueError(f'invalid result ref: {ref!r}')
+    return scheme, key
+
+class SqliteResultStore:
+    scheme = 'sqlite'
+    def __init__(self, conn_factory: Callable):
+        self._conn = conn_factory  # ResearchJobManager._conn (per-thread connection, table from migration 7)
+    def put(self, job_id: str, text: str) -> str:
+        conn = self._conn()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO job_results (job_id, data) VALUES (?, ?)', (job_id, encode_result(text)))
+        return f'{self.scheme}:{job_id}'
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn().execute('SELECT data FROM job_results WHERE job_id = ?', (key,)).fetchone()
+        return decode_result(bytes(row[0])) if row else None
+    def delete(self, key: str):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM job_results WHERE job_id = ?', (key,))
+
+class FileResultStore:
+    scheme = 'file'
+    def __init__(self, root):
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+    def _path(self, key: str) -> Path:
+        path = (self._root / key).resolve()
+        if path.parent != self._root.resolve():
+            raise ValueError(f'invalid result key: {key!r}')
+        return path
+    def put(self, job_id: str, text: str) -> str:
+        key = f'{job_id}.z'
+        path = self._path(key)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(encode_result(text))
+        os.replace(tmp, path)  # readers never see a partial file
+        return f'{self.scheme}:{key}'
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return decode_result(self._path(key).read_bytes())
+        except FileNotFoundError:
+            return None
+    def delete(self, key: str):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+class BlobResultStore:
+    scheme = 'blob'
+    def __init__(self, container_client):
+        self._container = container_client
+    @classmethod
+    def from_config(cls) -> 'BlobResultStore':
+        if BlobServiceClient is None:
+            raise RuntimeError('azure-storage-blob package not installed')
+        container = get_config('RESULT_BLOB_CONTAINER', 'job-results')
+        conn_str = get_config('RESULT_BLOB_CONNECTION_STRING')
+        if conn_str:
+            service = BlobServiceClient.from_connection_string(conn_str)
+        else:
+            account_url = get_config('RESULT_BLOB_ACCOUNT_URL')
+            if not account_url or DefaultAzureCredential is None:
+                raise RuntimeError('RESULT_BLOB_ACCOUNT_URL (with azure.identity) or RESULT_BLOB_CONNECTION_STRING required')
+            service = BlobServiceClient(account_url, credential=DefaultAzureCredential())
+        client = service.get_container_client(container)
+        try:
+            client.create_container()
+        except Exception:
+            pass  # already exists (or no permission to create; writes will surface real errors)
+        return cls(client)
+    def put(self, job_id: str, text: str) -> str:
+        key = f'{job_id}.z'
+        self._container.upload_blob(name=key, data=encode_result(text), overwrite=True)
+        return f'{self.scheme}:{key}'
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return decode_result(self._container.download_blob(key).readall())
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 404:
+                return None
+            raise
+    def delete(self, key: str):
+        try:
+            self._container.delete_blob(key)
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:
+                raise
+
+class CosmosResultStore:
+    scheme = 'cosmos'
+    def __init__(self, container):
+        self._container = container  # partition key /job_id; compressed bytes base64 in 'data'
+    def put(self, job_id: str, text: str) -> str:
+        self._container.upsert_item({'id': job_id, 'job_id': job_id, 'data': base64.b64encode(encode_result(text)).decode('ascii')})
+        return f'{self.scheme}:{job_id}'
+    def get(self, key: str) -> Optional[str]:
+        try:
+            item = self._container.read_item(item=key, partition_key=key)
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 404:
+                return None
+            raise
+        return decode_result(base64.b64decode(item['data']))
+    def delete(self, key: str):
+        try:
+            self._container.delete_item(item=key, partition_key=key)
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:
+                raise
+
+class ResultStores:
+    """Writes go to the configured store; reads/deletes dispatch on the ref scheme.
+
+    ``factories`` maps scheme -> zero-arg constructor; stores are built on first use.
+    """
+    def __init__(self, default: Optional[str], factories: Dict[str, Callable]):
+        self.default = None if default in (None, '', 'inline') else default
+        self._factories = factories
+        self._stores: Dict[str, object] = {}
+        if self.default is not None:
+            self._store(self.default)  # fail fast on misconfiguration
+    def _store(self, scheme: str):
+        store = self._stores.get(scheme)
+        if store is None:
+            factory = self._factories.get(scheme)
+            if factory is None:
+                raise ValueError(f'result store {scheme!r} not available for this backend')
+            store = self._stores[scheme] = factory()
+        return store
+    @property
+    def inline(self) -> bool:
+        return self.default is None
+    def put(self, job_id: str, text: str) -> Tuple[str, int]:
+        return self._store(self.default).put(job_id, text), len(text.encode('utf-8'))
+    def get(self, ref: str) -> Optional[str]:
+        scheme, key = split_ref(ref)
+        return self._store(scheme).get(key)
+    def delete(self, ref: str):
+        scheme, key = split_ref(ref)
+        self._store(scheme).delete(key)
+
+def file_store_factory(default_root) -> Callable:
+    return lambda: FileResultStore(get_config('RESULT_STORE_PATH') or default_root)
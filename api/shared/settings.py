@@ -1,6 +1,7 @@
 # copied from DeepResearchFunctionApp/shared/settings.py
-import os
-from typing import Optional
+import os, re, threading, time, logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
 
 try:
     from azure.identity import DefaultAzureCredential
@@ -10,30 +11,144 @@ try:
     from azure.keyvault.secrets import SecretClient
 except Exception:  # pragma: no cover
     SecretClient = None  # type: ignore
+try:
+    from azure.core.exceptions import ResourceNotFoundError
+except Exception:  # pragma: no cover
+    ResourceNotFoundError = None  # type: ignore
+
+# Key Vault lookups are cached per process. Secrets found are kept SETTINGS_CACHE_TTL_SECONDS, names
+# Key Vault does not have (or failed lookups) are cached as absent for SETTINGS_NEGATIVE_TTL_SECONDS;
+# either is refreshed in the background once stale (the stale answer is served meanwhile), so only
+# the first lookup of a name blocks (prefetch_config() warms KNOWN_KEYS at startup).
+# Key Vault names allow only letters, digits and '-': FOO_BAR is looked up as FOO-BAR.
+# Environment variables are read on every call (cheap) and remain the fallback.
+CACHE_TTL_SECONDS = float(os.getenv('SETTINGS_CACHE_TTL_SECONDS') or 300)
+NEGATIVE_TTL_SECONDS = float(os.getenv('SETTINGS_NEGATIVE_TTL_SECONDS') or 60)
+
+# Looked up by the API at startup / per request; prefetched in one parallel pass by prefetch_config()
+KNOWN_KEYS = (
+    'PROJECT_ENDPOINT', 'MODEL_DEPLOYMENT_NAME', 'DEEP_RESEARCH_MODEL_DEPLOYMENT_NAME', 'BING_RESOURCE_NAME',
+    'API_KEY', 'ALLOW_ANONYMOUS', 'DATABASE_PROVIDER',
+    'COSMOS_DB_ACCOUNT_URI', 'COSMOS_DB_URI', 'COSMOS_DB_KEY', 'COSMOS_DB_DATABASE', 'COSMOS_JOBS_CONTAINER',
+    'COSMOS_STEPS_CONTAINER', 'COSMOS_CITATIONS_CONTAINER', 'COSMOS_RESULTS_CONTAINER', 'COSMOS_MESSAGES_CONTAINER',
+    'RESULT_STORE', 'RESULT_STORE_PATH', 'RESULT_BLOB_CONTAINER', 'RESULT_BLOB_ACCOUNT_URL', 'RESULT_BLOB_CONNECTION_STRING',
+    'STATUS_POLLER_ENABLED', 'STATUS_POLL_INTERVAL_SECONDS', 'STATUS_POLL_MAX_CONCURRENCY', 'STATUS_POLL_BATCH_SIZE',
+    'START_RESEARCH_MODE', 'START_RESEARCH_QUEUE_SIZE', 'START_RESEARCH_WORKERS',
+    'SSE_KEEPALIVE_SECONDS', 'SSE_MAX_DURATION_SECONDS', 'PROJECT_CLIENT_MAX_AGE_SECONDS', 'FOUNDRY_HTTP_POOL_SIZE',
+    'JOB_STORE_WORKERS', 'FOUNDRY_WORKERS', 'JOB_CACHE_ENABLED', 'JOB_CACHE_SIZE', 'JOB_CACHE_TTL_SECONDS',
+    'CHECK_STATUS_BATCH_MAX_JOBS', 'STATUS_POLL_MIN_DELAY_SECONDS', 'STATUS_POLL_MAX_DELAY_SECONDS',
+    'STATUS_POLL_BACKOFF_FACTOR', 'STATUS_POLL_JITTER', 'START_RESEARCH_MAX_ACTIVE_RUNS',
+    'START_RESEARCH_MAX_ACTIVE_RUNS_PER_USER', 'START_RESEARCH_RECHECK_SECONDS', 'START_RESEARCH_RECOVER_QUEUED',
+    'IDEMPOTENCY_KEY_TTL_SECONDS', 'RESULT_CACHE_ENABLED', 'RESULT_CACHE_MAX_AGE_SECONDS',
+    'START_RESEARCH_MAX_RUN_AGE_SECONDS', 'START_RESEARCH_LAUNCH_TIMEOUT_SECONDS',
+)
+
+_kv_client = None
+_kv_client_uri: Optional[str] = None
+_lock = threading.Lock()
+_cache: Dict[str, Tuple[Optional[str], float]] = {}  # name -> (Key Vault value or None, fetched_at)
+_refreshing: set = set()
+_KV_NAME = re.compile(r'^[0-9A-Za-z-]{1,127}$')
+_stats = {'hits': 0, 'negative_hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0, 'prefetched': 0}
 
 def _get_kv_client():
+    # One SecretClient (and credential) per vault URI for the whole process
+    global _kv_client, _kv_client_uri
     kv_uri = os.getenv("KEY_VAULT_URI")
     if not kv_uri or SecretClient is None or DefaultAzureCredential is None:
         return None
+    if _kv_client is not None and _kv_client_uri == kv_uri:
+        return _kv_client
+    with _lock:
+        if _kv_client is None or _kv_client_uri != kv_uri:
+            try:
+                _kv_client = SecretClient(vault_url=kv_uri, credential=DefaultAzureCredential())
+                _kv_client_uri = kv_uri
+            except Exception:
+                return None
+        return _kv_client
+
+def _fetch_secret(client, name: str) -> Tuple[Optional[str], bool]:
+    """(value, definitive): definitive is False when a lookup failed for a reason other than not-found."""
+    kv_name = name.replace('_', '-')
+    if not _KV_NAME.match(kv_name):
+        return None, True  # Key Vault cannot hold this name
     try:
-        cred = DefaultAzureCredential()
-        return SecretClient(vault_url=kv_uri, credential=cred)
-    except Exception:
+        return client.get_secret(kv_name).value, True
+    except Exception as e:
+        if ResourceNotFoundError is not None and isinstance(e, ResourceNotFoundError):
+            return None, True
+        _stats['errors'] += 1
+        logging.debug(f"Key Vault lookup failed for {kv_name}: {e}")
+        return None, False
+
+def _store(name: str, value: Optional[str]):
+    with _lock:
+        _cache[name] = (value, time.monotonic())
+        _refreshing.discard(name)
+
+def _refresh(client, name: str):
+    value, definitive = _fetch_secret(client, name)
+    if definitive:
+        _store(name, value)
+        _stats['refreshes'] += 1
+    else:
+        with _lock: _refreshing.discard(name)  # keep serving the stale value; retried on a later hit
+
+def _kv_lookup(name: str) -> Optional[str]:
+    client = _get_kv_client()
+    if client is None:
         return None
+    now = time.monotonic()
+    entry = _cache.get(name)
+    if entry is not None:
+        value, fetched_at = entry
+        ttl = CACHE_TTL_SECONDS if value is not None else NEGATIVE_TTL_SECONDS
+        if now - fetched_at < ttl:
+            _stats['hits' if value is not None else 'negative_hits'] += 1
+            return value
+        # Stale-while-revalidate (found or absent): answer from cache, refresh once in the background
+        _stats['stale_hits'] += 1
+        with _lock:
+            start = name not in _refreshing
+            _refreshing.add(name)
+        if start:
+            threading.Thread(target=_refresh, args=(client, name), name=f'settings-refresh-{name}', daemon=True).start()
+        return value
+    _stats['misses'] += 1
+    value, _ = _fetch_secret(client, name)
+    _store(name, value)
+    return value
 
 def get_secret(name: str, default: Optional[str] = None) -> Optional[str]:
-    client = _get_kv_client()
-    if client:
-        try:
-            return client.get_secret(name).value
-        except Exception:
-            dashed = name.replace('_', '-')
-            if dashed != name:
-                try:
-                    return client.get_secret(dashed).value
-                except Exception:
-                    pass
+    value = _kv_lookup(name)
+    if value is not None:
+        return value
     return os.getenv(name, default)
 
 def get_config(name: str, default: Optional[str] = None) -> Optional[str]:
     return get_secret(name, default)
+
+def prefetch_config(names: Iterable[str] = KNOWN_KEYS, max_workers: int = 8) -> int:
+    """Warm the cache for ``names`` in parallel (app startup). Returns how many were fetched."""
+    client = _get_kv_client()
+    if client is None:
+        return 0
+    names = [n for n in dict.fromkeys(names) if n not in _cache]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='settings-prefetch') as pool:
+        for name, (value, _) in zip(names, pool.map(lambda n: _fetch_secret(client, n), names)):
+            _store(name, value)
+    _stats['prefetched'] += len(names)
+    return len(names)
+
+def clear_config_cache():
+    with _lock:
+        _cache.clear()
+        _refreshing.clear()
+
+def get_settings_stats() -> Dict[str, object]:
+    with _lock:
+        cached = len(_cache)
+        negative = sum(1 for v, _ in _cache.values() if v is None)
+    return {'key_vault': _get_kv_client() is not None, 'cached': cached, 'cached_absent': negative,
+            'ttl_seconds': CACHE_TTL_SECONDS, 'negative_ttl_seconds': NEGATIVE_TTL_SECONDS, **_stats}
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# `app` / `shared` are top-level packages (the container copies both into its workdir)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,57 @@
+"""HTTP behaviour of app.main on the memory backend (no Azure packages needed)."""
+import json
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def client():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('DATABASE_PROVIDER', 'memory')
+        from fastapi.testclient import TestClient
+        from app.main import app
+        with TestClient(app) as c:
+            yield c
+
+
+def _job(client):
+    r = client.post('/api/StartResearch', json={'query': 'hello'})
+    assert r.status_code == 200
+    return r.json()['job_id']
+
+
+def test_check_status_etag(client):
+    job_id = _job(client)
+    r = client.get(f'/api/CheckStatus/{job_id}')
+    assert r.status_code == 200 and r.json()['status'] == 'created'
+    etag = r.headers['etag']
+    r = client.get(f'/api/CheckStatus/{job_id}', headers={'If-None-Match': etag})
+    assert r.status_code == 304
+    assert r.headers['etag'] == etag and 'retry-after' in r.headers
+    assert client.get(f'/api/CheckStatus/{job_id}', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_idempotency_key_replays_job(client):
+    headers = {'Idempotency-Key': 'api-test-key'}
+    first = client.post('/api/StartResearch', json={'query': 'hello'}, headers=headers).json()
+    second = client.post('/api/StartResearch', json={'query': 'hello'}, headers=headers).json()
+    assert second['job_id'] == first['job_id'] and second['replayed'] is True
+
+
+def test_stream_of_finished_job(client):
+    job_id = _job(client)
+    from app.jobs import get_async_job_manager
+    get_async_job_manager().backend.update_job_result(job_id, 'answer')
+    with client.stream('GET', f'/api/research/stream/{job_id}') as r:
+        assert r.headers['content-type'].startswith('text/event-stream')
+        body = ''.join(r.iter_text())
+    events = [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+    assert events[0] == 'status' and events[-2:] == ['result', 'end']
+    status = json.loads(next(line for line in body.splitlines() if line.startswith('data: '))[6:])
+    assert status['status'] == 'completed'
+
+
+def test_delete_job(client):
+    job_id = _job(client)
+    assert client.delete(f'/api/DeleteJob/{job_id}').status_code == 200
+    assert client.get(f'/api/CheckStatus/{job_id}').status_code == 404
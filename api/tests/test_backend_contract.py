@@ -0,0 +1,228 @@
+"""Contract tests every job backend (shared/db_*.py) must pass.
+
+Runs against SQLite (temporary file) and the in-process memory backend; Cosmos
+runs too when COSMOS_DB_ACCOUNT_URI is configured and azure-cosmos is installed.
+Each test works on its own user id, so a shared Cosmos container stays usable.
+
+    cd api && python -m pytest -q tests
+"""
+import uuid
+
+import pytest
+
+from shared import db_memory, db_sqlite
+from shared.errors import IdempotencyConflict
+from shared.settings import get_config
+
+
+def _cosmos_backend():
+    try:
+        from shared import db_cosmos
+    except Exception as e:  # pragma: no cover
+        pytest.skip(f'Cosmos backend unavailable: {e}')
+    if db_cosmos.CosmosClient is None or not (get_config('COSMOS_DB_ACCOUNT_URI') or get_config('COSMOS_DB_URI')):
+        pytest.skip('Cosmos DB not configured')
+    return db_cosmos.ResearchJobManager()
+
+
+@pytest.fixture(params=['sqlite', 'memory', 'cosmos'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        manager = db_sqlite.ResearchJobManager(str(tmp_path / 'jobs.db'))
+    elif request.param == 'memory':
+        manager = db_memory.ResearchJobManager()
+    else:
+        manager = _cosmos_backend()
+    yield manager
+    if hasattr(manager, 'close'):
+        manager.close()
+
+
+@pytest.fixture
+def user(backend):
+    user_id = f'contract-{uuid.uuid4()}'
+    yield user_id
+    for job in backend.get_jobs(user_id=user_id, limit=1000, fields=('id',)):
+        backend.delete_job(job['id'])
+
+
+def test_create_and_get(backend, user):
+    job_id = backend.create_job('what is x', user)
+    job = backend.get_job(job_id, user_id=user)
+    assert job['id'] == job_id
+    assert job['user_id'] == user
+    assert job['query'] == 'what is x'
+    assert job['status'] == 'created'
+    assert job['created_at']
+    assert not job.get('completed_at')
+    assert backend.get_job(str(uuid.uuid4())) is None
+
+
+def test_status_update_keeps_ids_and_bumps_version(backend, user):
+    job_id = backend.create_job('q', user)
+    v0 = backend.get_job_version(job_id)
+    backend.update_job_status(job_id, 'in_progress', 'running', thread_id='t1', run_id='r1', agent_id='a1')
+    backend.update_job_status(job_id, 'in_progress', 'still running')
+    job = backend.get_job(job_id, user_id=user)
+    assert (job['status'], job['current_step']) == ('in_progress', 'still running')
+    assert (job['thread_id'], job['run_id'], job['agent_id']) == ('t1', 'r1', 'a1')
+    assert backend.get_job_run_id(job_id) == 'r1'
+    assert backend.get_job_version(job_id) > v0
+
+
+def test_result_completes_job(backend, user):
+    job_id = backend.create_job('q', user)
+    backend.update_job_status(job_id, 'in_progress', 'running')
+    backend.update_job_result(job_id, '結果 ' * 100, current_step='done')
+    job = backend.get_job(job_id, user_id=user)
+    assert job['status'] == 'completed'
+    assert job['current_step'] == 'done'
+    assert job['completed_at']
+    assert backend.get_job_result(job_id) == '結果 ' * 100
+
+
+def test_error_fails_job(backend, user):
+    job_id = backend.create_job('q', user)
+    backend.update_job_error(job_id, 'boom')
+    job = backend.get_job(job_id, user_id=user)
+    assert (job['status'], job['error_message']) == ('failed', 'boom')
+    assert job['completed_at']
+
+
+def test_delete(backend, user):
+    job_id = backend.create_job('q', user)
+    backend.add_job_step(job_id, 'a')
+    backend.delete_job(job_id)
+    assert backend.get_job(job_id) is None
+
+
+def test_steps_keep_insertion_order(backend, user):
+    job_id = backend.create_job('q', user)
+    backend.add_job_step(job_id, 's0', 'first')
+    backend.add_job_steps(job_id, [(f's{i}', f'detail {i}') for i in range(1, 8)])
+    backend.add_job_step(job_id, 's8')
+    backend.add_job_steps(job_id, [])
+    steps = backend.get_job_steps(job_id)
+    assert [s['step_name'] for s in steps] == [f's{i}' for i in range(9)]
+    assert steps[0]['step_details'] == 'first'
+    assert steps[3]['step_details'] == 'detail 3'
+
+
+def test_steps_bump_version(backend, user):
+    job_id = backend.create_job('q', user)
+    v0 = backend.get_job_version(job_id)
+    backend.add_job_steps(job_id, [('a', None), ('b', None)])
+    assert backend.get_job_version(job_id) > v0
+
+
+def test_citations_dedupe_and_order(backend, user):
+    job_id = backend.create_job('q', user)
+    first = [
+        {'type': 'url_citation', 'marker': '[1]', 'url': 'https://a.example/', 'title': 'A'},
+        {'type': 'file_citation', 'marker': '[2]', 'file_id': 'file-1', 'quote': 'q'},
+        {'type': 'url_citation', 'marker': '[1]', 'url': 'https://a.example/', 'title': 'A again'},
+    ]
+    assert backend.add_job_citations(job_id, first) == 2
+    assert backend.add_job_citations(job_id, first[:1] + [
+        {'type': 'url_citation', 'marker': '[3]', 'url': 'https://b.example/', 'title': 'B'}]) == 1
+    assert backend.add_job_citations(job_id, []) == 0
+    cits = backend.get_job_citations(job_id)
+    assert [(c['type'], c['marker']) for c in cits] == [('url_citation', '[1]'), ('file_citation', '[2]'), ('url_citation', '[3]')]
+    assert (cits[0]['url'], cits[0]['title']) == ('https://a.example/', 'A')
+    assert (cits[1]['file_id'], cits[1]['quote']) == ('file-1', 'q')
+
+
+def test_messages_cursor(backend, user):
+    job_id = backend.create_job('q', user)
+    msgs = [{'id': f'm{i}', 'role': 'assistant' if i else 'user', 'content': f'text {i}'} for i in range(4)]
+    assert backend.add_job_messages(job_id, msgs[:2]) == 2
+    assert backend.get_job(job_id, user_id=user)['last_message_id'] == 'm1'
+    assert backend.add_job_messages(job_id, msgs[1:]) == 2  # m1 already stored
+    assert backend.add_job_messages(job_id, [{'content': 'no id'}]) == 0
+    assert backend.get_job(job_id, user_id=user)['last_message_id'] == 'm3'
+    assert [m['id'] for m in backend.get_job_messages(job_id)] == ['m3', 'm2', 'm1', 'm0']
+    assert [m['id'] for m in backend.get_job_messages(job_id, since_message_id='m1')] == ['m3', 'm2']
+    assert backend.get_job_messages(job_id, since_message_id='m3') == []
+    assert backend.get_job_messages(job_id)[0]['content'] == 'text 3'
+
+
+def test_cursor_pagination(backend, user):
+    ids = [backend.create_job(f'q{i}', user) for i in range(7)]
+    backend.update_job_status(ids[0], 'in_progress', 'running')
+    everything = [j['id'] for j in backend.get_jobs(user_id=user, limit=100)]
+    assert sorted(everything) == sorted(ids)
+    pages, cursor = [], None
+    while True:
+        page, cursor = backend.get_jobs_page(user_id=user, limit=3, cursor=cursor, fields='summary')
+        assert len(page) <= 3
+        pages.append([j['id'] for j in page])
+        if cursor is None:
+            break
+    assert [i for p in pages for i in p] == everything  # newest first, no gaps or repeats
+    assert len(pages) == 3
+    assert all('result' not in j for j in backend.get_jobs_page(user_id=user, limit=3, fields='summary')[0])
+    only, cursor = backend.get_jobs_page(user_id=user, status='in_progress', limit=3)
+    assert [j['id'] for j in only] == [ids[0]] and cursor is None
+    with pytest.raises(ValueError):
+        backend.get_jobs_page(user_id=user, cursor='not-a-cursor')
+
+
+def test_jobs_by_ids(backend, user):
+    ids = [backend.create_job(f'q{i}', user) for i in range(3)]
+    missing = str(uuid.uuid4())
+    found = backend.get_jobs_by_ids([ids[2], missing, ids[0], ids[2]], user_id=user, fields=('status',))
+    assert [j['id'] for j in found] == [ids[2], ids[0]]
+    assert all(j['status'] == 'created' for j in found)
+
+
+def test_status_counts(backend, user):
+    ids = [backend.create_job(f'q{i}', user) for i in range(5)]
+    backend.update_job_status(ids[0], 'in_progress', 'running')
+    backend.update_job_status(ids[1], 'queued', 'waiting')
+    backend.update_job_result(ids[2], 'r')
+    backend.update_job_error(ids[3], 'e')
+    backend.update_job_status(ids[1], 'in_progress', 'running')
+    assert backend.count_jobs_by_status(user_id=user) == {'created': 1, 'in_progress': 2, 'completed': 1, 'failed': 1}
+    backend.delete_job(ids[4])
+    assert backend.count_jobs_by_status(user_id=user) == {'in_progress': 2, 'completed': 1, 'failed': 1}
+
+
+def test_status_counts_all_users(backend, user):
+    other = f'{user}-other'
+    before = backend.count_jobs_by_status(user_id=None)
+    try:
+        backend.create_job('q', user)
+        failed = backend.create_job('q', other)
+        backend.update_job_error(failed, 'e')
+        after = backend.count_jobs_by_status(user_id=None)
+        assert after.get('created', 0) - before.get('created', 0) == 1
+        assert after.get('failed', 0) - before.get('failed', 0) == 1
+    finally:
+        for job in backend.get_jobs(user_id=other, limit=1000, fields=('id',)):
+            backend.delete_job(job['id'])
+
+
+def test_idempotency_key(backend, user):
+    job_id = backend.create_job('q', user, idempotency_key='k', query_hash='h')
+    assert backend.get_job_by_idempotency_key(user, 'k')['id'] == job_id
+    assert backend.get_job_by_idempotency_key(user, 'k', created_after='2999-01-01T00:00:00Z') is None
+    assert backend.get_job_by_idempotency_key(user, 'other') is None
+    with pytest.raises(IdempotencyConflict) as conflict:
+        backend.create_job('q', user, idempotency_key='k', key_created_after='2000-01-01T00:00:00Z')
+    assert conflict.value.job['id'] == job_id
+    # Expired key: a new job takes it over
+    renewed = backend.create_job('q', user, idempotency_key='k', key_created_after='2999-01-01T00:00:00Z')
+    assert renewed != job_id
+    assert backend.get_job_by_idempotency_key(user, 'k')['id'] == renewed
+
+
+def test_latest_completed_by_query_hash(backend, user):
+    older = backend.create_job('q', user, query_hash='h')
+    newer = backend.create_job('q', user, query_hash='h')
+    backend.create_job('q', user, query_hash='h')  # not completed
+    assert backend.get_latest_completed_job(user, 'h') is None
+    backend.update_job_result(older, 'r1')
+    backend.update_job_result(newer, 'r2')
+    assert backend.get_latest_completed_job(user, 'h')['id'] in (older, newer)
+    assert backend.get_latest_completed_job(user, 'other') is None
+    assert backend.get_latest_completed_job(user, 'h', completed_after='2999-01-01T00:00:00Z') is None
@@ -0,0 +1,49 @@
+"""Per-job poll schedule (app/backoff.py)."""
+from datetime import datetime, timedelta, timezone
+
+from app.backoff import PollSchedule
+
+
+def _job(job_id='j1', age_seconds=3600, status='in_progress'):
+    created = datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+    return {'id': job_id, 'status': status, 'created_at': created.replace(tzinfo=None).isoformat() + 'Z'}
+
+
+def test_delay_backs_off_and_is_capped():
+    schedule = PollSchedule(min_delay=2, max_delay=10, factor=2, jitter=0)
+    assert [schedule.delay(n, 'in_progress', None) for n in range(5)] == [2, 4, 8, 10, 10]
+    assert schedule.delay(4, 'requires_action', None) == 2
+    assert schedule.delay(4, 'in_progress', 30) == 3  # young run: a tenth of its age
+    assert schedule.delay(4, 'in_progress', 1) == 2   # never below the minimum
+
+
+def test_observe_resets_on_transition():
+    schedule = PollSchedule(min_delay=2, max_delay=60, factor=2, jitter=0)
+    job = _job()
+    assert [schedule.observe(job, 'in_progress') for _ in range(3)] == [2, 4, 8]
+    assert schedule.observe(job, None) == 16  # failed poll keeps backing off
+    assert schedule.observe(job, 'requires_action') == 2
+    assert schedule.stats()['transitions'] == 1
+
+
+def test_due_and_retry_after():
+    schedule = PollSchedule(min_delay=5, max_delay=5, jitter=0)
+    job = _job()
+    assert schedule.is_due('j1')
+    assert schedule.retry_after(job) == 5  # untracked: the minimum
+    schedule.observe(job, 'in_progress')
+    assert not schedule.is_due('j1')
+    assert 5 < schedule.retry_after(job) <= 6
+    assert schedule.retry_after(_job(status='completed')) is None
+    assert 0 < schedule.next_due_in() <= 5
+    schedule.forget('j1')
+    assert schedule.is_due('j1') and schedule.next_due_in() is None
+
+
+def test_retain_drops_untracked_jobs():
+    schedule = PollSchedule(min_delay=1, jitter=0)
+    for job_id in ('a', 'b', 'c'):
+        schedule.observe(_job(job_id), 'in_progress')
+    schedule.retain(['b'])
+    assert schedule.stats()['scheduled'] == 1
+    assert schedule.is_due('a') and not schedule.is_due('b')
@@ -0,0 +1,98 @@
+"""Read-through job cache (app/job_cache.py)."""
+import threading
+
+from app.job_cache import CachedJobManager
+from shared import db_memory
+
+
+class _Counting:
+    def __init__(self, backend):
+        self.backend = backend
+        self.reads = 0
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def get_job(self, job_id, user_id=None):
+        self.reads += 1
+        return self.backend.get_job(job_id, user_id=user_id)
+
+
+def _cached(ttl_seconds=60.0):
+    backend = _Counting(db_memory.ResearchJobManager())
+    return CachedJobManager(backend, size=16, ttl_seconds=ttl_seconds), backend
+
+
+def test_hits_and_write_through():
+    cache, backend = _cached()
+    job_id = cache.create_job('q', 'u1')
+    assert cache.get_job(job_id)['status'] == 'created'
+    assert cache.get_job(job_id)['status'] == 'created'
+    assert backend.reads == 1
+    cache.update_job_status(job_id, 'in_progress', 'running')
+    assert cache.get_job(job_id)['status'] == 'in_progress'  # own write is never stale
+    assert backend.reads == 2
+    cache.get_job(job_id)['status'] = 'mutated'  # callers get copies
+    assert cache.get_job(job_id)['status'] == 'in_progress'
+
+
+def test_non_terminal_entries_expire():
+    cache, backend = _cached(ttl_seconds=0)
+    job_id = cache.create_job('q', 'u1')
+    cache.get_job(job_id)
+    cache.get_job(job_id)
+    assert backend.reads == 2
+    cache.update_job_result(job_id, 'r')
+    cache.get_job(job_id)
+    cache.get_job(job_id)  # completed: kept without expiry
+    assert backend.reads == 3
+    assert cache.cache_stats()['terminal'] == 1
+
+
+def test_steps_are_invalidated_by_writes():
+    cache, _ = _cached()
+    job_id = cache.create_job('q', 'u1')
+    cache.add_job_step(job_id, 'a')
+    assert [s['step_name'] for s in cache.get_job_steps(job_id)] == ['a']
+    cache.add_job_steps(job_id, [('b', None)])
+    assert [s['step_name'] for s in cache.get_job_steps(job_id)] == ['a', 'b']
+    cache.delete_job(job_id)
+    assert cache.get_job(job_id) is None
+
+
+def test_read_racing_a_write_is_not_cached():
+    cache, backend = _cached()
+    job_id = cache.create_job('q', 'u1')
+    reading, written = threading.Event(), threading.Event()
+    read = backend.backend.get_job
+
+    def slow_read(job_id, user_id=None):
+        job = read(job_id, user_id=user_id)  # old row
+        reading.set()
+        written.wait(5)
+        return job
+    backend.get_job = slow_read
+    reader = threading.Thread(target=cache.get_job, args=(job_id,))
+    reader.start()
+    reading.wait(5)
+    cache.update_job_status(job_id, 'in_progress', 'running')
+    written.set()
+    reader.join(5)
+    backend.get_job = read
+    assert cache.cache_stats()['discarded'] == 1
+    assert cache.get_job(job_id)['status'] == 'in_progress'
+
+
+def test_jobs_by_ids_fetches_only_misses():
+    cache, _ = _cached()
+    ids = [cache.create_job(f'q{i}', 'u1') for i in range(3)]
+    cache.get_job(ids[0])
+    calls = []
+    fetch = cache.backend.backend.get_jobs_by_ids
+
+    def by_ids(job_ids, **kwargs):
+        calls.append(list(job_ids))
+        return fetch(job_ids, **kwargs)
+    cache.backend.get_jobs_by_ids = by_ids
+    assert [j['id'] for j in cache.get_jobs_by_ids(ids)] == ids
+    assert calls == [ids[1:]]
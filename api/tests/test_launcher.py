@@ -0,0 +1,60 @@
+"""ResearchLauncher (app/launcher.py) recovery against the in-process memory backend."""
+import asyncio
+
+from app.jobs import AsyncJobManager
+from app.launcher import ResearchLauncher
+from shared import db_memory
+
+
+def _launcher(backend):
+    return ResearchLauncher(AsyncJobManager(backend), queue_size=10, workers=1)
+
+
+def test_recover_leaves_foreign_starting_launch_alone():
+    backend = db_memory.ResearchJobManager()
+    foreign = backend.create_job('q', 'u1')
+    orphan = backend.create_job('q', 'u2')
+    backend.update_job_status(foreign, 'starting', 'starting')
+    backend.update_job_status(orphan, 'starting', 'starting')
+    launcher = _launcher(backend)
+
+    async def scenario():
+        await launcher._recover()
+        await launcher._fail_interrupted()  # launch timeout not reached yet
+        assert backend.get_job(foreign)['status'] == 'starting'
+        assert backend.get_job(orphan)['status'] == 'starting'
+        # The other replica's launch completes; the orphan never moves
+        backend.update_job_status(foreign, 'in_progress', 'running', thread_id='t1', run_id='r1')
+        launcher._interrupted_due = dict.fromkeys(launcher._interrupted_due, 0)
+        await launcher._fail_interrupted()
+
+    asyncio.run(scenario())
+    assert backend.get_job(foreign)['status'] == 'in_progress'
+    assert backend.get_job(orphan)['status'] == 'failed'
+    assert [s['step_name'] for s in backend.get_job_steps(orphan)] == ['error']
+    assert launcher.stats()['interrupted'] == 1
+
+
+def test_recover_requeues_queued_jobs_oldest_first(monkeypatch):
+    stamps = iter(f'2026-01-01T00:00:0{i}Z' for i in range(10))
+    monkeypatch.setattr(db_memory, '_now', lambda: next(stamps))  # distinct created_at
+    backend = db_memory.ResearchJobManager()
+    ids = [backend.create_job(f'q{i}', 'u1') for i in range(3)]
+    for job_id in ids:
+        backend.update_job_status(job_id, 'queued', 'waiting')
+    launcher = _launcher(backend)
+    asyncio.run(launcher._recover())
+    assert [launcher.queue_position(j) for j in ids] == [1, 2, 3]
+    assert launcher.stats()['recovered'] == 3
+
+
+def test_launch_skips_job_no_longer_queued():
+    backend = db_memory.ResearchJobManager()
+    job_id = backend.create_job('q', 'u1')
+    backend.update_job_status(job_id, 'in_progress', 'running', thread_id='t1', run_id='r1')
+    launcher = _launcher(backend)
+    launcher._reserved[job_id] = 'u1'
+    asyncio.run(launcher._launch({'job_id': job_id, 'query': 'q', 'user_id': 'u1'}))
+    assert launcher.stats()['skipped'] == 1
+    assert job_id not in launcher._reserved
+    assert backend.get_job(job_id)['status'] == 'in_progress'
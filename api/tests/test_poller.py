@@ -0,0 +1,70 @@
+"""Background run-status poller (app/poller.py) with a stubbed StatusService."""
+import asyncio
+
+from app.backoff import PollSchedule
+from app.jobs import AsyncJobManager
+from app.poller import RunStatusPoller
+from app.status import StatusService
+from shared import db_memory
+
+
+def _running_job(backend, user='u1'):
+    job_id = backend.create_job('q', user)
+    backend.update_job_status(job_id, 'in_progress', 'running', thread_id='t', run_id='r')
+    return job_id
+
+
+def test_poll_once_polls_due_runs_and_reports_finished(monkeypatch):
+    backend = db_memory.ResearchJobManager()
+    done, running = _running_job(backend), _running_job(backend)
+    backend.create_job('not started', 'u1')
+    polled, finished = [], []
+
+    def update_and_collect(self, job):
+        polled.append(job['id'])
+        if job['id'] == done:
+            backend.update_job_result(done, 'r')
+            return {'updated': True, 'run_status': 'completed'}
+        return {'updated': False, 'run_status': 'in_progress'}
+
+    monkeypatch.setattr(StatusService, 'update_and_collect', update_and_collect)
+    schedule = PollSchedule(min_delay=60, max_delay=60, jitter=0)
+    poller = RunStatusPoller(AsyncJobManager(backend), schedule=schedule, on_finished=lambda: finished.append(1))
+
+    async def cycles():
+        await poller.poll_once()
+        await poller.poll_once()  # the running job is not due again yet
+
+    asyncio.run(cycles())
+    assert sorted(polled) == sorted([done, running])
+    assert finished == [1]
+    stats = poller.stats()
+    assert (stats['polls'], stats['updates'], stats['terminal_transitions'], stats['deferred']) == (2, 1, 1, 1)
+    assert not schedule.is_due(running) and schedule.is_due(done)
+
+
+def test_failed_poll_backs_off(monkeypatch):
+    backend = db_memory.ResearchJobManager()
+    job_id = _running_job(backend)
+
+    def update_and_collect(self, job):
+        raise RuntimeError('foundry down')
+
+    monkeypatch.setattr(StatusService, 'update_and_collect', update_and_collect)
+    schedule = PollSchedule(min_delay=60, jitter=0)
+    poller = RunStatusPoller(AsyncJobManager(backend), schedule=schedule)
+    asyncio.run(poller.poll_once())
+    assert poller.stats()['errors'] == 1
+    assert not schedule.is_due(job_id)
+
+
+def test_messages_for_reads_the_store():
+    backend = db_memory.ResearchJobManager()
+    job_id = _running_job(backend)
+    poller = RunStatusPoller(AsyncJobManager(backend), schedule=PollSchedule())
+    assert asyncio.run(poller.messages_for(backend.get_job(job_id))) is None  # nothing yet
+    backend.add_job_messages(job_id, [{'id': 'm1', 'role': 'assistant', 'content': 'a'},
+                                      {'id': 'm2', 'role': 'assistant', 'content': 'b'}])
+    job = backend.get_job(job_id)
+    assert [m['id'] for m in asyncio.run(poller.messages_for(job))] == ['m2', 'm1']
+    assert [m['id'] for m in asyncio.run(poller.messages_for(job, since_message_id='m1'))] == ['m2']
@@ -0,0 +1,85 @@
+"""DeepResearchService.launch (app/research.py) with a fake Foundry project."""
+from types import SimpleNamespace
+
+import pytest
+
+from app import research
+from shared import db_memory
+
+
+class _Recorder:
+    """Memory backend that logs every write."""
+
+    def __init__(self):
+        self.backend = db_memory.ResearchJobManager()
+        self.writes = []
+
+    def __getattr__(self, name):
+        attr = getattr(self.backend, name)
+        if name.startswith(('update_', 'add_')):
+            def call(*args, **kwargs):
+                self.writes.append((name, args[1] if name == 'update_job_status' else None))
+                return attr(*args, **kwargs)
+            return call
+        return attr
+
+
+class _Registry:
+    def resolve_connection_id(self, project, name):
+        return 'conn-1'
+
+    def get_agent_id(self, project, model, dr_model, bing_id, make_tool):
+        return 'agent-1', False
+
+
+def _project(fail_run=False):
+    def create_run(**kwargs):
+        if fail_run:
+            raise RuntimeError('quota exceeded')
+        return SimpleNamespace(id='run-1')
+    agents = SimpleNamespace(
+        threads=SimpleNamespace(create=lambda: SimpleNamespace(id='thread-1')),
+        messages=SimpleNamespace(create=lambda **kwargs: None),
+        runs=SimpleNamespace(create=create_run, get_messages=lambda **kwargs: []))
+    return SimpleNamespace(agents=agents)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    config = {'PROJECT_ENDPOINT': 'https://example', 'BING_RESOURCE_NAME': 'bing'}
+    monkeypatch.setattr(research, 'project_clients_available', lambda: True)
+    monkeypatch.setattr(research, 'DeepResearchTool', lambda **kwargs: object())
+    monkeypatch.setattr(research, 'get_agent_registry', lambda: _Registry())
+    monkeypatch.setattr(research, 'get_config', lambda name, default=None: config.get(name, default))
+    recorder = _Recorder()
+    return research.DeepResearchService(recorder), recorder, monkeypatch
+
+
+def test_inline_launch_writes_steps_once(service):
+    svc, recorder, monkeypatch = service
+    monkeypatch.setattr(research, 'get_project_client', lambda endpoint: _project())
+    job_id = recorder.backend.create_job('q', 'u1')
+    assert svc.launch(job_id, 'q')['status'] == 'created'
+    assert recorder.writes == [('update_job_status', 'in_progress'), ('add_job_steps', None)]
+    assert [s['step_name'] for s in recorder.backend.get_job_steps(job_id)] == [
+        'connection_resolved', 'agent_ready', 'thread_created', 'message_created', 'id_debug', 'run_created']
+    assert recorder.backend.get_job_run_id(job_id) == 'run-1'
+
+
+def test_inline_launch_failure_keeps_progress(service):
+    svc, recorder, monkeypatch = service
+    monkeypatch.setattr(research, 'get_project_client', lambda endpoint: _project(fail_run=True))
+    job_id = recorder.backend.create_job('q', 'u1')
+    assert svc.launch(job_id, 'q')['status'] == 'failed'
+    assert recorder.writes == [('update_job_error', None), ('add_job_steps', None)]
+    assert [s['step_name'] for s in recorder.backend.get_job_steps(job_id)][-2:] == ['message_created', 'error']
+
+
+def test_queued_launch_reports_progress(service):
+    svc, recorder, monkeypatch = service
+    monkeypatch.setattr(research, 'get_project_client', lambda endpoint: _project())
+    job_id = recorder.backend.create_job('q', 'u1')
+    svc.launch(job_id, 'q', fetch_early_messages=False, incremental=True)
+    assert recorder.writes[0] == ('update_job_status', 'starting')
+    assert len(recorder.writes) == 6
+    assert recorder.backend.get_job(job_id)['status'] == 'in_progress'
@@ -0,0 +1,60 @@
+"""Idempotency keys and result reuse (app/reuse.py)."""
+import asyncio
+
+from app.jobs import AsyncJobManager
+from app.reuse import ResearchReuse, normalize_query, query_fingerprint
+from shared import db_memory
+
+
+def test_normalize_query():
+    assert normalize_query('  What   IS\tＡＩ？ ') == 'what is ai?'
+    assert normalize_query(None) == ''
+
+
+def test_fingerprint_covers_options():
+    base = query_fingerprint('What is AI?', 'dr-model', None, [{'connection_id': 'c1'}])
+    assert query_fingerprint('what is  ai?', 'dr-model', None, [{'connection_id': 'c1'}]) == base
+    assert query_fingerprint('What is AI?', 'other-model', None, [{'connection_id': 'c1'}]) != base
+    assert query_fingerprint('What is AI?', 'dr-model', 'auto', [{'connection_id': 'c1'}]) != base
+    assert query_fingerprint('What is AI?', 'dr-model', None, [{'connection_id': 'c2'}]) != base
+
+
+def test_key_lock_serializes_same_key():
+    reuse = ResearchReuse()
+    order = []
+
+    async def request(name, key):
+        async with reuse.key_lock('u1', key):
+            order.append(f'{name}+')
+            await asyncio.sleep(0.01)
+            order.append(f'{name}-')
+
+    async def main():
+        await asyncio.gather(request('a', 'k'), request('b', 'k'), request('c', 'other'))
+
+    asyncio.run(main())
+    assert order.index('a-') < order.index('b+')
+    assert order.index('c+') < order.index('a-')  # other keys do not wait
+
+
+def test_replay_and_cached_result(monkeypatch):
+    backend = db_memory.ResearchJobManager()
+    jobs = AsyncJobManager(backend)
+    reuse = ResearchReuse()
+    job_id = backend.create_job('q', 'u1', idempotency_key='k', query_hash='h')
+
+    async def lookups():
+        replay = await reuse.find_replay(jobs, 'u1', 'k')
+        other_user = await reuse.find_replay(jobs, 'u2', 'k')
+        before = await reuse.find_cached(jobs, 'u1', 'h', requested=True)
+        backend.update_job_result(job_id, 'r')
+        disabled = await reuse.find_cached(jobs, 'u1', 'h', requested=None)
+        after = await reuse.find_cached(jobs, 'u1', 'h', requested=True)
+        return replay, other_user, before, disabled, after
+
+    monkeypatch.setenv('RESULT_CACHE_ENABLED', 'false')
+    replay, other_user, before, disabled, after = asyncio.run(lookups())
+    assert replay['id'] == job_id and other_user is None
+    assert before is None and disabled is None and after['id'] == job_id
+    stats = reuse.stats()
+    assert (stats['idempotent_replay_rate'], stats['cache_hit_rate']) == (0.5, 0.5)
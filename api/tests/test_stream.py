@@ -0,0 +1,63 @@
+"""SSE stream (app/stream.py) against the in-process memory backend."""
+import asyncio
+import json
+
+from app import stream
+from app.backoff import PollSchedule
+from app.jobs import AsyncJobManager
+from app.status import StatusService
+from shared import db_memory
+
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+
+def _events(chunks):
+    out = []
+    for chunk in chunks:
+        fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines() if not line.startswith((':', 'retry')))
+        if 'event' in fields:
+            out.append((fields['event'], json.loads(fields['data'])))
+    return out
+
+
+async def _collect(gen, limit=50):
+    chunks = []
+    async for chunk in gen:
+        chunks.append(chunk)
+        if len(chunks) >= limit:
+            break
+    return chunks
+
+
+def test_stream_refreshes_run_without_poller(monkeypatch):
+    backend = db_memory.ResearchJobManager()
+    job_id = backend.create_job('q', 'u1')
+    backend.update_job_status(job_id, 'in_progress', 'running', thread_id='t1', run_id='r1')
+    calls = []
+
+    def update_and_collect(self, job):
+        calls.append(job['id'])
+        backend.add_job_messages(job_id, [{'id': 'm1', 'role': 'assistant', 'content': 'answer'}])
+        backend.update_job_result(job_id, 'answer')
+        return {'messages': None, 'updated': True, 'run_status': 'completed'}
+
+    monkeypatch.setattr(StatusService, 'update_and_collect', update_and_collect)
+    monkeypatch.setattr(stream, 'get_poll_schedule', lambda: PollSchedule(min_delay=1, max_delay=1))
+    monkeypatch.setenv('SSE_MAX_DURATION_SECONDS', '10')
+
+    gen = stream.job_event_stream(job_id, AsyncJobManager(backend), None, _Request())
+    events = _events(asyncio.run(asyncio.wait_for(_collect(gen), 5)))
+    assert calls == [job_id]
+    names = [name for name, _ in events]
+    assert names[-2:] == ['result', 'end']
+    assert [data['id'] for name, data in events if name == 'message'] == ['m1']
+    assert events[0][1]['status'] == 'completed'
+
+
+def test_stream_reports_deleted_job(monkeypatch):
+    backend = db_memory.ResearchJobManager()
+    gen = stream.job_event_stream('missing', AsyncJobManager(backend), None, _Request())
+    assert _events(asyncio.run(_collect(gen))) == [('end', {'reason': 'deleted'})]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+ListJobs のプロジェクション効果ベンチマーク: 1 ページ (既定 50 件) を全列 (SELECT *) で読む場合と
+一覧用の 'summary' 列だけを読む場合で、1 回あたりのレイテンシと JSON 応答サイズを比較する
+
+一時ディレクトリの SQLite DB に数 KB の result を持つジョブを投入し (既定 10,000 件)、
+バックエンド呼び出し + JSON 直列化までを計測する。最後に FastAPI の ListJobs を TestClient で
+叩いた値も出す (本番 DB には触れない)。
+
+    python devtools/bench_list_jobs.py --jobs 10000 --result-kb 8 --iterations 200
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'api'))
+
+from shared.db_sqlite import ResearchJobManager  # noqa: E402
+
+
+def populate(manager: ResearchJobManager, jobs: int, users: int, result_kb: int):
+    rnd = random.Random(42)
+    body = ''.join(rnd.choice(string.ascii_letters + ' \n') for _ in range(result_kb * 1024))
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(jobs):
+        status = rnd.choice(('completed', 'completed', 'completed', 'failed', 'in_progress'))
+        rows.append((str(uuid.uuid4()), f'user-{i % users}', f'調査クエリ {i}', status,
+                     (start + timedelta(seconds=i)).isoformat() + 'Z',
+                     body if status == 'completed' else None,
+                     'Run ended with status failed' if status == 'failed' else None))
+    conn = manager._conn()
+    with conn:
+        conn.executemany('INSERT INTO research_jobs (id, user_id, query, status, created_at, result, error_message) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+
+
+def measure(fn, iterations: int):
+    samples = []
+    size = 0
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        size = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        'bytes': size,
+        'mean_ms': statistics.mean(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--jobs', type=int, default=10000)
+    ap.add_argument('--users', type=int, default=20)
+    ap.add_argument('--result-kb', type=int, default=8)
+    ap.add_argument('--limit', type=int, default=50)
+    ap.add_argument('--iterations', type=int, default=200)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='bench-list-jobs-')
+    db_path = os.path.join(tmp, 'jobs.db')
+    manager = ResearchJobManager(db_path)
+    populate(manager, args.jobs, args.users, args.result_kb)
+    print(f"populated {args.jobs} jobs ({args.result_kb} KB result each) in {db_path}")
+
+    for label, fields in (('full', None), ('summary', 'summary')):
+        def one():
+            jobs, _ = manager.get_jobs_page(user_id='user-3', limit=args.limit, fields=fields)
+            return len(json.dumps({'jobs': jobs}, ensure_ascii=False).encode('utf-8'))
+        r = measure(one, args.iterations)
+        print(f"{label:8s} bytes/page={r['bytes']:>9,d}  mean={r['mean_ms']:.2f}ms  p50={r['p50_ms']:.2f}ms  p99={r['p99_ms']:.2f}ms")
+
+    try:
+        from fastapi.testclient import TestClient
+        import shared.db_sqlite as dbs
+        os.environ['SQLITE_DB_PATH'] = db_path
+        os.environ['STATUS_POLLER_ENABLED'] = '0'
+        dbs.DB_PATH = Path(db_path)
+        from app.main import app
+    except Exception as e:  # FastAPI 未インストール時はバックエンド計測のみ
+        print(f"skip ListJobs endpoint: {e}")
+        return
+    with TestClient(app) as client:
+        def endpoint():
+            return len(client.get('/api/ListJobs', params={'limit': args.limit, 'user_id': 'user-3'}).content)
+        r = measure(endpoint, args.iterations)
+        print(f"ListJobs bytes/resp={r['bytes']:>9,d}  mean={r['mean_ms']:.2f}ms  p50={r['p50_ms']:.2f}ms  p99={r['p99_ms']:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+AIProjectClient をリクエスト毎に生成する場合と app/clients.py のプール済みファクトリを使う場合の比較ベンチマーク
+
+Azure には接続しない。フェイククライアントの生成コスト (credential chain + TLS handshake 相当) と
+呼び出しコストを sleep で模擬する。
+
+    python devtools/bench_project_clients.py --calls 200 --init-ms 150 --call-ms 20 --threads 4
+"""
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'api'))
+
+from app.clients import get_project_client, get_client_stats, set_project_client_factory  # noqa: E402
+
+
+class FakeProjectClient:
+    init_seconds = 0.0
+    call_seconds = 0.0
+
+    def __init__(self, endpoint: str):
+        time.sleep(self.init_seconds)
+        self.endpoint = endpoint
+
+    def get_run(self):
+        time.sleep(self.call_seconds)
+        return {'status': 'in_progress'}
+
+
+def _run(label, fn, calls, threads):
+    latencies = []
+
+    def one(_):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(calls)))
+    total = time.perf_counter() - t0
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<10} total={total:6.2f}s  mean={statistics.mean(latencies):7.1f}ms  p95={p95:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--init-ms', type=float, default=150.0)
+    parser.add_argument('--call-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    FakeProjectClient.init_seconds = args.init_ms / 1000
+    FakeProjectClient.call_seconds = args.call_ms / 1000
+    endpoint = 'https://fake.services.ai.azure.com/api/projects/bench'
+
+    _run('fresh', lambda: FakeProjectClient(endpoint).get_run(), args.calls, args.threads)
+
+    set_project_client_factory(FakeProjectClient)
+    _run('pooled', lambda: get_project_client(endpoint).get_run(), args.calls, args.threads)
+    print('factory stats:', get_client_stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SQLite バックエンドの同時実行ベンチマーク: 旧実装 (呼び出し毎に sqlite3.connect / rollback journal)
+と現行の api/shared/db_sqlite.py (スレッド毎の常駐接続 + WAL) を比較する
+
+CheckStatus ポーリング相当の読み取り (get_job + get_job_steps) と、ポーラー相当の書き込み
+(update_job_status + add_job_step) を複数スレッドで混在実行し、スループット / レイテンシ /
+'database is locked' 発生数を出す。DB は一時ディレクトリに作るので本番 DB には触れない。
+
+    python devtools/bench_sqlite_pool.py --threads 8 --ops 500 --write-ratio 0.2
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'api'))
+
+from shared.db_sqlite import ResearchJobManager  # noqa: E402
+
+
+class LegacyJobManager:
+    """旧 db_sqlite の接続パターン (メソッド毎に connect → 1 文 → commit → close) を再現"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # スキーマは現行実装で作成し、journal_mode を旧来の rollback journal に戻す
+        ResearchJobManager(db_path).close()
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('PRAGMA journal_mode=DELETE')
+
+    def create_job(self, query, user_id='anonymous'):
+        job_id = str(uuid.uuid4())
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('INSERT INTO research_jobs (id, user_id, query, status, created_at) VALUES (?, ?, ?, ?, ?)',
+                         (job_id, user_id, query, 'created', time.strftime('%Y-%m-%dT%H:%M:%SZ')))
+            conn.commit()
+        return job_id
+
+    def update_job_status(self, job_id, status, current_step=None):
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute('SELECT thread_id, run_id, agent_id FROM research_jobs WHERE id = ?', (job_id,)).fetchone()
+            conn.execute('UPDATE research_jobs SET status=?, current_step=?, thread_id=?, run_id=?, agent_id=? WHERE id = ?',
+                         (status, current_step, row[0], row[1], row[2], job_id))
+            conn.commit()
+
+    def add_job_step(self, job_id, step_name, step_details=None):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('INSERT INTO job_steps (job_id, step_name, step_details) VALUES (?, ?, ?)', (job_id, step_name, step_details))
+            conn.commit()
+
+    def get_job(self, job_id):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('SELECT * FROM research_jobs WHERE id = ?', (job_id,)).fetchone()
+            return dict(row) if row else None
+
+    def get_job_steps(self, job_id):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(r) for r in conn.execute('SELECT * FROM job_steps WHERE job_id=? ORDER BY timestamp ASC', (job_id,))]
+
+    def close(self):
+        pass
+
+
+def run(label, manager, threads, ops, write_ratio, jobs):
+    job_ids = [manager.create_job(f'bench query {i}') for i in range(jobs)]
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker(seed):
+        rnd = random.Random(seed)
+        local_lat, local_err = [], 0
+        for _ in range(ops):
+            job_id = rnd.choice(job_ids)
+            t0 = time.perf_counter()
+            try:
+                if rnd.random() < write_ratio:
+                    manager.update_job_status(job_id, 'in_progress', 'bench')
+                    manager.add_job_step(job_id, 'bench', 'step')
+                else:
+                    manager.get_job(job_id)
+                    manager.get_job_steps(job_id)
+            except sqlite3.OperationalError:
+                local_err += 1
+            local_lat.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            latencies.extend(local_lat)
+            errors.append(local_err)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    total = time.perf_counter() - t0
+    manager.close()
+    latencies.sort()
+    n = len(latencies)
+    print(f"{label:<8} ops={n:6d}  {n / total:8.0f} ops/s  p50={latencies[n // 2]:6.2f}ms  "
+          f"p99={latencies[int(n * 0.99) - 1]:7.2f}ms  max={latencies[-1]:7.2f}ms  locked_errors={sum(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=500, help='operations per thread')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--jobs', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run('legacy', LegacyJobManager(str(Path(tmp) / 'legacy.db')), args.threads, args.ops, args.write_ratio, args.jobs)
+        run('pooled', ResearchJobManager(str(Path(tmp) / 'pooled.db')), args.threads, args.ops, args.write_ratio, args.jobs)
+
+
+if __name__ == '__main__':
+    main()
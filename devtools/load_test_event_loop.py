@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+イベントループ非ブロッキングの負荷テスト: 遅い Foundry 呼び出し (フェイク) を伴う StartResearch を
+同時に流している間の /healthz と /api/ListJobs のレイテンシ (p50 / p99) を計測する
+
+Azure には接続しない。runs.create などを sleep で遅くしたフェイク AIProjectClient を
+app/clients.py のファクトリに差し込み、httpx の ASGITransport でアプリを同一プロセス内で叩く。
+比較のため --compare を付けると、executor (app/executors.py) を経由せずイベントループ上で
+同期呼び出しする旧来の動作も計測する。DB は一時ディレクトリの SQLite を使う。
+
+    python devtools/load_test_event_loop.py --starts 8 --foundry-ms 1500 --compare
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace as NS
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'api'))
+
+tmp = tempfile.mkdtemp(prefix='load-test-')
+os.environ['SQLITE_DB_PATH'] = os.path.join(tmp, 'jobs.db')
+os.environ['STATUS_POLLER_ENABLED'] = 'false'  # Foundry 負荷は StartResearch だけに絞る
+os.environ.setdefault('PROJECT_ENDPOINT', 'https://fake.services.ai.azure.com/api/projects/load')
+os.environ.setdefault('BING_RESOURCE_NAME', 'bing-fake')
+
+import httpx  # noqa: E402
+import shared.db_sqlite as db_sqlite  # noqa: E402
+db_sqlite.DB_PATH = Path(os.environ['SQLITE_DB_PATH'])
+
+import app.executors as executors  # noqa: E402
+import app.research as research  # noqa: E402
+from app.clients import set_project_client_factory  # noqa: E402
+from app.storage import get_job_manager  # noqa: E402
+from app.main import app  # noqa: E402
+
+FOUNDRY_SECONDS = 1.0
+
+
+class _Slow:
+    def __init__(self, result):
+        self._result = result
+
+    def __call__(self, *args, **kwargs):
+        time.sleep(FOUNDRY_SECONDS)
+        return self._result(*args, **kwargs) if callable(self._result) else self._result
+
+
+class FakeProjectClient:
+    """runs.create だけが遅い (Deep Research の run 作成相当)。他は即時"""
+
+    def __init__(self, endpoint=None, credential=None, **kwargs):
+        self.connections = NS(get=lambda name, **kw: NS(id=f'/connections/{name}'))
+        self.agents = NS(
+            create_agent=lambda **kw: NS(id='asst_fake'),
+            threads=NS(create=lambda **kw: NS(id='thread_fake')),
+            messages=NS(create=lambda **kw: NS(id='msg_fake'), list=lambda **kw: iter(())),
+            runs=NS(create=_Slow(NS(id='run_fake', status='queued')), get_messages=lambda **kw: iter(())),
+        )
+
+
+class FakeTool:
+    def __init__(self, **kwargs):
+        self.definitions = [{'type': 'deep_research'}]
+
+
+async def _inline_run(name, fn, *args, **kwargs):
+    # 旧来の動作: ハンドラ内でそのまま同期呼び出し (イベントループをブロックする)
+    return fn(*args, **kwargs)
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    return (f"n={len(samples):4d}  p50={samples[len(samples) // 2]:8.1f}ms  "
+            f"p99={samples[min(len(samples) - 1, int(len(samples) * 0.99))]:8.1f}ms  max={samples[-1]:8.1f}ms")
+
+
+async def _probe(client, path, params, stop, out, interval=0.02):
+    # 固定レートで発行し、予定時刻からの遅れも含めて計測する (ループが止まっていた時間を取りこぼさない)
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        r = await client.get(path, params=params)
+        r.raise_for_status()
+        out.append((time.perf_counter() - scheduled) * 1000)
+        scheduled += interval
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+
+
+async def _scenario(label, starts, probe_seconds):
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url='http://test', timeout=120) as client:
+            backend = get_job_manager()
+            for i in range(50):
+                backend.create_job(f'seed {i}', 'anonymous')
+            results = {}
+            for phase, load in (('idle', 0), ('loaded', starts)):
+                stop = asyncio.Event()
+                health, listing = [], []
+                probes = [asyncio.create_task(_probe(client, '/healthz', None, stop, health)),
+                          asyncio.create_task(_probe(client, '/api/ListJobs', {'limit': 50}, stop, listing))]
+                t0 = time.perf_counter()
+                if load:
+                    await asyncio.gather(*(client.post('/api/StartResearch', json={'query': f'load {i}'}) for i in range(load)))
+                else:
+                    await asyncio.sleep(probe_seconds)
+                stop.set()
+                await asyncio.gather(*probes)
+                results[phase] = (health, listing, time.perf_counter() - t0)
+    print(f"--- {label}")
+    for phase, (health, listing, elapsed) in results.items():
+        print(f"{phase:6s} ({elapsed:5.1f}s)  /healthz      {_summary(health)}")
+        print(f"{'':6s}           /api/ListJobs {_summary(listing)}")
+
+
+def main():
+    global FOUNDRY_SECONDS
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--starts', type=int, default=8, help='同時に投入する (同期モードの) StartResearch 数')
+    parser.add_argument('--foundry-ms', type=float, default=1500.0, help='フェイク runs.create の所要時間')
+    parser.add_argument('--compare', action='store_true', help='executor を使わない旧来の動作も計測する')
+    args = parser.parse_args()
+    FOUNDRY_SECONDS = args.foundry_ms / 1000
+
+    research.DeepResearchTool = FakeTool
+    set_project_client_factory(FakeProjectClient)
+
+    asyncio.run(_scenario(f'executors ({args.starts} slow starts in flight)', args.starts, FOUNDRY_SECONDS))
+    if args.compare:
+        executors._run = _inline_run
+        asyncio.run(_scenario(f'inline / blocking ({args.starts} slow starts in flight)', args.starts, FOUNDRY_SECONDS))
+
+
+if __name__ == '__main__':
+    main()
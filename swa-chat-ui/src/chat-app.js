@@ -1049,11 +1049,22 @@ class ChatApp extends LitElement {
 
     try {
       // 1. Deep Research開始
-      const startResponse = await fetch(API_CONFIG.getUrl('/api/StartResearch'), {
+      // 送信毎に冪等キーを付与: 通信エラーで再送しても同じジョブが返り、Deep Research は二重起動しない
+      // (Idempotency-Key ヘッダと同じ。CORS の許可ヘッダを増やさないよう body で送る)
+      const idempotencyKey = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+      const startRequest = () => fetch(API_CONFIG.getUrl('/api/StartResearch'), {
         method: 'POST',
         headers: API_CONFIG.getHeaders(),
-        body: JSON.stringify({ query, user_id: 'anonymous' })
+        body: JSON.stringify({ query, user_id: 'anonymous', idempotency_key: idempotencyKey })
       })
+      let startResponse
+      try {
+        startResponse = await startRequest()
+      } catch (networkError) {
+        console.warn('[DEBUG] StartResearch network error, retrying with the same Idempotency-Key:', networkError)
+        await new Promise(resolve => setTimeout(resolve, 1000))
+        startResponse = await startRequest()
+      }
 
       if (!startResponse.ok) {
         throw new Error(`HTTP error! status: ${startResponse.status}`)
@@ -1095,8 +1106,8 @@ class ChatApp extends LitElement {
         msg
       )
       
-      // 2. ポーリングで状態確認
-      const pollResult = await this.pollJobStatus(jobId)
+      // 2. SSEストリーム（不可ならポーリング）で状態確認
+      const pollResult = await this.waitForJob(jobId)
 
       // プログレス表示を削除してAIメッセージを追加
       this.messages = this.messages.filter(msg => msg.type !== 'progress')
@@ -1145,17 +1156,297 @@ class ChatApp extends LitElement {
     }
   }
 
-  async pollJobStatus(jobId, maxAttempts = 360) { // 最大1時間（10秒間隔）
+  // ジョブ完了待ち: SSEストリーム優先、使えなければポーリングにフォールバック
+  async waitForJob(jobId) {
+    const viewState = this._newJobViewState();
+    try {
+      return await this.streamJobStatus(jobId, viewState);
+    } catch (error) {
+      console.warn('[DEBUG] SSE stream unavailable, falling back to polling:', error);
+      return await this.pollJobStatus(jobId, 360, viewState);
+    }
+  }
+
+  _newJobViewState() {
+    return {
+      lastStepCount: 0,
+      shownMessageIds: new Set() // メッセージ重複表示防止用！
+    };
+  }
+
+  _scrollMessagesToBottom() {
+    this.updateComplete.then(() => {
+      const messagesEl = this.shadowRoot.getElementById('messages');
+      if (messagesEl) messagesEl.scrollTop = messagesEl.scrollHeight;
+    });
+  }
+
+  // 進捗stepsを表示
+  _appendProgressSteps(newSteps) {
+    newSteps.forEach(step => {
+      let ts = undefined;
+      if (typeof step.timestamp === 'number' && !isNaN(step.timestamp)) {
+        try {
+          ts = new Date(step.timestamp * 1000).toISOString();
+        } catch (e) {
+          ts = undefined;
+        }
+      }
+      this.messages = [
+        ...this.messages,
+        {
+          type: 'progress',
+          content: step.message || step.status || '進捗更新',
+          progress: {
+            ...this.currentProgress,
+            message: step.message || step.status,
+            timestamp: ts,
+            step: step.status || undefined
+          }
+        }
+      ];
+      this.requestUpdate();
+      this._scrollMessagesToBottom();
+    });
+  }
+
+  // Threadメッセージを表示（表示済みIDはスキップ）
+  _appendJobMessages(jobId, messages, shownMessageIds) {
+    // 最新Threadのみ表示！他jobIdのメッセージは除外
+    this.messages = this.messages.filter(msg => msg.jobId === jobId || !msg.jobId || msg.type === 'progress');
+
+    // 📝 全メッセージのannotationsを事前に集約してグローバルマップを作成
+    const globalAnnotationsMap = new Map();
+    messages.forEach((msg, msgIndex) => {
+      if (Array.isArray(msg.annotations)) {
+        msg.annotations.forEach((annotation, annIndex) => {
+          const key = `${msgIndex}:${annIndex}`;
+          globalAnnotationsMap.set(key, annotation);
+          console.log('[DEBUG] Added global annotation mapping:', key, annotation);
+        });
+      }
+    });
+    console.log('[DEBUG] Global annotations map created with keys:', Array.from(globalAnnotationsMap.keys()));
+
+    messages.forEach((msg, messageIndex) => {
+      console.log('[DEBUG] Processing message with messageIndex:', messageIndex, 'msg.id:', msg.id);
+      if (msg.id && shownMessageIds.has(msg.id)) return; // 既に表示済みはスキップ
+      let content = '';
+      let references = [];
+      let annotations = [];
+      // content抽出ロジック（履歴と同じ！）
+      if (Array.isArray(msg.content)) {
+        content = msg.content.map(c => typeof c === 'string' ? c : JSON.stringify(c)).join('\n');
+      } else if (typeof msg.content === 'string') {
+        content = msg.content;
+      } else if (msg.content && typeof msg.content === 'object') {
+        if (typeof msg.content.text === 'string') {
+          content = msg.content.text;
+        } else if (Array.isArray(msg.content.parts)) {
+          content = msg.content.parts.map(p => p.text).join('\n');
+        } else {
+          content = JSON.stringify(msg.content);
+        }
+      }
+
+      // annotations配列も取得！
+      if (Array.isArray(msg.annotations)) {
+        annotations = msg.annotations;
+        console.log('[DEBUG] pollJobStatus - Message annotations found:', annotations);
+      } else {
+        console.log('[DEBUG] pollJobStatus - No annotations found:', msg.annotations);
+      }
+
+      // citations配列も取得！（annotations と同じデータを citations としても設定）
+      let citations = [];
+      if (Array.isArray(msg.citations)) {
+        citations = msg.citations;
+        console.log('[DEBUG] pollJobStatus - Message citations found:', citations);
+      } else if (Array.isArray(msg.annotations)) {
+        citations = msg.annotations; // annotationsをcitationsとしても使用
+        console.log('[DEBUG] pollJobStatus - Using annotations as citations:', citations);
+      } else {
+        console.log('[DEBUG] pollJobStatus - No citations found:', msg.citations);
+      }
+
+      // citations, references, urls, sourcesも全部referencesにまとめる
+      if (Array.isArray(msg.citations)) {
+        msg.citations.forEach(cite => {
+          references.push({ url: cite.url, title: cite.title || cite.url });
+        });
+      }
+      if (Array.isArray(msg.references)) {
+        msg.references.forEach(ref => {
+          references.push({ url: ref.url || ref, title: ref.title || ref.url || ref });
+        });
+      }
+      if (Array.isArray(msg.urls)) {
+        msg.urls.forEach(url => {
+          references.push({ url: url, title: url });
+        });
+      }
+      if (Array.isArray(msg.sources)) {
+        msg.sources.forEach(src => {
+          references.push({ url: src, title: src });
+        });
+      }
+      let type = 'ai';
+      if (msg.role === 'user') type = 'user';
+      console.log('[DEBUG] Adding message to this.messages with messageIndex:', messageIndex);
+      this.messages = [
+        ...this.messages,
+        {
+          type,
+          content,
+          references,
+          annotations,  // annotations配列を追加！
+          citations,    // citations配列も追加！
+          messageIndex, // messageIndexを追加！
+          globalAnnotationsMap, // グローバルannotationsマップを追加！
+          jobId: jobId,
+          messageId: msg.id,
+          timestamp: msg.created_at || ''
+        }
+      ];
+      if (msg.id) shownMessageIds.add(msg.id);
+      this.requestUpdate();
+      this._scrollMessagesToBottom();
+    });
+  }
+
+  // プログレス表示も更新（current_stepがあれば）
+  _updateProgressFromStatus(statusData) {
+    if (this.currentProgress && statusData.current_step) {
+      // 同時実行数の上限で起動待ちのジョブは待ち順も表示
+      const stepText = statusData.queue_position
+        ? `${statusData.current_step} (待ち順: ${statusData.queue_position} 番目)`
+        : statusData.current_step;
+      let start_time = statusData.created_at || this.currentProgress.timestamp;
+      let end_time = statusData.completed_at || (statusData.status === 'completed' ? new Date().toISOString() : undefined);
+      this.currentProgress = {
+        ...this.currentProgress,
+        message: `🔍 ${stepText}`,
+        step: statusData.status,
+        timestamp: start_time,
+        endTime: end_time,
+        thread_id: statusData.thread_id,
+        run_id: statusData.run_id
+      }
+      this.messages = this.messages.map(msg => 
+        msg.type === 'progress' ? 
+        { ...msg, content: `${stepText}\n[Thread ID: ${statusData.thread_id || '-'} / Run ID: ${statusData.run_id || '-'}]`, progress: this.currentProgress } : 
+        msg
+      )
+      this.requestUpdate()
+    }
+  }
+
+  // 完了/失敗時の戻り値を組み立て（完了ならGetResultを取得）。未完了ならnull
+  async _buildJobOutcome(jobId, statusData) {
+    if (statusData.status === 'completed') {
+      const resultResponse = await fetch(API_CONFIG.getUrl(`/api/GetResult/${jobId}`), {
+        headers: API_CONFIG.getHeaders()
+      })
+      const resultData = await resultResponse.json()
+      return {
+        success: true,
+        result: resultData.result + `\n\n[Thread ID: ${statusData.thread_id || '-'} / Run ID: ${statusData.run_id || '-'}]`,
+        steps: resultData.steps,
+        messages: statusData.messages || []
+      }
+    } else if (statusData.status === 'failed') {
+      return {
+        success: false,
+        error: (statusData.error_message || statusData.error || '調査に失敗しました') + `\n[Thread ID: ${statusData.thread_id || '-'} / Run ID: ${statusData.run_id || '-'}]`,
+        messages: statusData.messages || []
+      }
+    }
+    return null
+  }
+
+  _parseSseBlock(block) {
+    let event = 'message';
+    const dataLines = [];
+    block.split('\n').forEach(line => {
+      if (line.startsWith(':')) return; // keepalive コメント
+      if (line.startsWith('event:')) event = line.slice(6).trim();
+      else if (line.startsWith('data:')) dataLines.push(line.slice(5).replace(/^ /, ''));
+    });
+    if (dataLines.length === 0) return null;
+    try {
+      return { event, data: JSON.parse(dataLines.join('\n')) };
+    } catch (e) {
+      console.warn('[DEBUG] SSE parse error:', e, block);
+      return null;
+    }
+  }
+
+  // SSE (/api/research/stream) で進捗を受信。ヘッダ(API Key)を送るためEventSourceではなくfetchで読む
+  async streamJobStatus(jobId, viewState = this._newJobViewState()) {
+    window.currentJobId = jobId;
+    const resp = await fetch(API_CONFIG.getUrl(`/api/research/stream/${jobId}`), {
+      headers: { ...API_CONFIG.getHeaders(), 'Accept': 'text/event-stream' }
+    });
+    if (!resp.ok || !resp.body) {
+      throw new Error(`Stream failed: ${resp.status}`);
+    }
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let statusData = {};
+    const messages = [];
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n');
+      let sep;
+      while ((sep = buffer.indexOf('\n\n')) !== -1) {
+        const evt = this._parseSseBlock(buffer.slice(0, sep));
+        buffer = buffer.slice(sep + 2);
+        if (!evt) continue;
+        if (evt.event === 'status') {
+          statusData = { ...statusData, ...evt.data };
+          this._updateProgressFromStatus(statusData);
+        } else if (evt.event === 'step') {
+          this._appendProgressSteps([evt.data]);
+          viewState.lastStepCount += 1;
+        } else if (evt.event === 'message') {
+          messages.push(evt.data);
+          this._appendJobMessages(jobId, messages, viewState.shownMessageIds);
+        } else if (evt.event === 'result') {
+          statusData = { ...statusData, ...evt.data };
+        } else if (evt.event === 'end') {
+          reader.cancel().catch(() => {});
+          const outcome = await this._buildJobOutcome(jobId, { ...statusData, messages });
+          if (outcome) return outcome;
+          throw new Error(`Stream ended: ${evt.data.reason || 'unknown'}`);
+        }
+      }
+    }
+    throw new Error('Stream closed before job finished');
+  }
+
+  // 次の CheckStatus までの待ち時間 (ms)。サーバーの retry_after_ms / Retry-After に従い、無ければ10秒
+  _nextPollDelay(statusResponse, statusData) {
+    let delay = Number(statusData && statusData.retry_after_ms);
+    if (!Number.isFinite(delay) || delay <= 0) {
+      delay = Number(statusResponse && statusResponse.headers.get('Retry-After')) * 1000;
+    }
+    if (!Number.isFinite(delay) || delay <= 0) delay = 10000;
+    return Math.min(60000, Math.max(1000, delay));
+  }
+
+  async pollJobStatus(jobId, maxAttempts = 360, viewState = this._newJobViewState()) { // 最大1時間（maxAttempts × 10秒）
     // ブラウザから参照できるようにグローバルに設定
     window.currentJobId = jobId;
     console.log('[DEBUG] pollJobStatus - Set currentJobId:', jobId);
-    
-    let lastStepCount = 0;
-    let lastSteps = [];
-    const shownMessageIds = new Set(); // メッセージ重複表示防止用！
-    for (let attempt = 0; attempt < maxAttempts; attempt++) {
+    // 間隔はサーバーのヒントで変わるため、打ち切りは回数ではなく経過時間で判定する
+    const deadline = Date.now() + maxAttempts * 10000;
+
+    for (let attempt = 0; Date.now() < deadline; attempt++) {
+      let statusResponse = null;
       try {
-        const statusResponse = await fetch(API_CONFIG.getUrl(`/api/CheckStatus/${jobId}`), {
+        statusResponse = await fetch(API_CONFIG.getUrl(`/api/CheckStatus/${jobId}`), {
           headers: API_CONFIG.getHeaders()
         })
         if (!statusResponse.ok) {
@@ -1166,192 +1457,27 @@ class ChatApp extends LitElement {
 
         // 進捗stepsがあれば都度表示！
         const steps = Array.isArray(statusData.steps) ? statusData.steps : [];
-        if (steps.length > lastStepCount) {
-          const newSteps = steps.slice(lastStepCount);
-          newSteps.forEach(step => {
-            let ts = undefined;
-            if (typeof step.timestamp === 'number' && !isNaN(step.timestamp)) {
-              try {
-                ts = new Date(step.timestamp * 1000).toISOString();
-              } catch (e) {
-                ts = undefined;
-              }
-            }
-            this.messages = [
-              ...this.messages,
-              {
-                type: 'progress',
-                content: step.message || step.status || '進捗更新',
-                progress: {
-                  ...this.currentProgress,
-                  message: step.message || step.status,
-                  timestamp: ts,
-                  step: step.status || undefined
-                }
-              }
-            ];
-            this.requestUpdate();
-            this.updateComplete.then(() => {
-              const messagesEl = this.shadowRoot.getElementById('messages');
-              if (messagesEl) messagesEl.scrollTop = messagesEl.scrollHeight;
-            });
-          });
-          lastStepCount = steps.length;
-          lastSteps = steps;
+        if (steps.length > viewState.lastStepCount) {
+          this._appendProgressSteps(steps.slice(viewState.lastStepCount));
+          viewState.lastStepCount = steps.length;
         }
 
-      if (Array.isArray(statusData.messages)) {
-        // 最新Threadのみ表示！他jobIdのメッセージは除外
-        this.messages = this.messages.filter(msg => msg.jobId === jobId || !msg.jobId || msg.type === 'progress');
-        
-        // 📝 全メッセージのannotationsを事前に集約してグローバルマップを作成
-        const globalAnnotationsMap = new Map();
-        statusData.messages.forEach((msg, msgIndex) => {
-          if (Array.isArray(msg.annotations)) {
-            msg.annotations.forEach((annotation, annIndex) => {
-              const key = `${msgIndex}:${annIndex}`;
-              globalAnnotationsMap.set(key, annotation);
-              console.log('[DEBUG] Added global annotation mapping:', key, annotation);
-            });
-          }
-        });
-        console.log('[DEBUG] Global annotations map created with keys:', Array.from(globalAnnotationsMap.keys()));
-        
-        statusData.messages.forEach((msg, messageIndex) => {
-          console.log('[DEBUG] Processing message with messageIndex:', messageIndex, 'msg.id:', msg.id);
-          if (msg.id && shownMessageIds.has(msg.id)) return; // 既に表示済みはスキップ
-          let content = '';
-          let references = [];
-          let annotations = [];
-          // content抽出ロジック（履歴と同じ！）
-          if (Array.isArray(msg.content)) {
-            content = msg.content.map(c => typeof c === 'string' ? c : JSON.stringify(c)).join('\n');
-          } else if (typeof msg.content === 'string') {
-            content = msg.content;
-          } else if (msg.content && typeof msg.content === 'object') {
-            if (typeof msg.content.text === 'string') {
-              content = msg.content.text;
-            } else if (Array.isArray(msg.content.parts)) {
-              content = msg.content.parts.map(p => p.text).join('\n');
-            } else {
-              content = JSON.stringify(msg.content);
-            }
-          }
-          
-          // annotations配列も取得！
-          if (Array.isArray(msg.annotations)) {
-            annotations = msg.annotations;
-            console.log('[DEBUG] pollJobStatus - Message annotations found:', annotations);
-          } else {
-            console.log('[DEBUG] pollJobStatus - No annotations found:', msg.annotations);
-          }
-          
-          // citations配列も取得！（annotations と同じデータを citations としても設定）
-          let citations = [];
-          if (Array.isArray(msg.citations)) {
-            citations = msg.citations;
-            console.log('[DEBUG] pollJobStatus - Message citations found:', citations);
-          } else if (Array.isArray(msg.annotations)) {
-            citations = msg.annotations; // annotationsをcitationsとしても使用
-            console.log('[DEBUG] pollJobStatus - Using annotations as citations:', citations);
-          } else {
-            console.log('[DEBUG] pollJobStatus - No citations found:', msg.citations);
-          }
-          
-          // citations, references, urls, sourcesも全部referencesにまとめる
-          if (Array.isArray(msg.citations)) {
-            msg.citations.forEach(cite => {
-              references.push({ url: cite.url, title: cite.title || cite.url });
-            });
-          }
-          if (Array.isArray(msg.references)) {
-            msg.references.forEach(ref => {
-              references.push({ url: ref.url || ref, title: ref.title || ref.url || ref });
-            });
-          }
-          if (Array.isArray(msg.urls)) {
-            msg.urls.forEach(url => {
-              references.push({ url: url, title: url });
-            });
-          }
-          if (Array.isArray(msg.sources)) {
-            msg.sources.forEach(src => {
-              references.push({ url: src, title: src });
-            });
-          }
-          let type = 'ai';
-          if (msg.role === 'user') type = 'user';
-          console.log('[DEBUG] Adding message to this.messages with messageIndex:', messageIndex);
-          this.messages = [
-            ...this.messages,
-            {
-              type,
-              content,
-              references,
-              annotations,  // annotations配列を追加！
-              citations,    // citations配列も追加！
-              messageIndex, // messageIndexを追加！
-              globalAnnotationsMap, // グローバルannotationsマップを追加！
-              jobId: jobId,
-              messageId: msg.id,
-              timestamp: msg.created_at || ''
-            }
-          ];
-          if (msg.id) shownMessageIds.add(msg.id);
-          this.requestUpdate();
-          this.updateComplete.then(() => {
-            const messagesEl = this.shadowRoot.getElementById('messages');
-            if (messagesEl) messagesEl.scrollTop = messagesEl.scrollHeight;
-          });
-        });
-      }
-
-        // プログレス表示も更新（current_stepがあれば）
-        if (this.currentProgress && statusData.current_step) {
-          let start_time = statusData.created_at || this.currentProgress.timestamp;
-          let end_time = statusData.completed_at || (statusData.status === 'completed' ? new Date().toISOString() : undefined);
-          this.currentProgress = {
-            ...this.currentProgress,
-            message: `🔍 ${statusData.current_step}`,
-            step: statusData.status,
-            timestamp: start_time,
-            endTime: end_time,
-            thread_id: statusData.thread_id,
-            run_id: statusData.run_id
-          }
-          this.messages = this.messages.map(msg => 
-            msg.type === 'progress' ? 
-            { ...msg, content: `${statusData.current_step}\n[Thread ID: ${statusData.thread_id || '-'} / Run ID: ${statusData.run_id || '-'}]`, progress: this.currentProgress } : 
-            msg
-          )
-          this.requestUpdate()
+        if (Array.isArray(statusData.messages)) {
+          this._appendJobMessages(jobId, statusData.messages, viewState.shownMessageIds);
         }
 
-        if (statusData.status === 'completed') {
-          const resultResponse = await fetch(API_CONFIG.getUrl(`/api/GetResult/${jobId}`), {
-            headers: API_CONFIG.getHeaders()
-          })
-          const resultData = await resultResponse.json()
-          return {
-            success: true,
-            result: resultData.result + `\n\n[Thread ID: ${statusData.thread_id || '-'} / Run ID: ${statusData.run_id || '-'}]`,
-            steps: resultData.steps,
-            messages: statusData.messages || []
-          }
-        } else if (statusData.status === 'failed') {
-          return {
-            success: false,
-            error: (statusData.error_message || statusData.error || '調査に失敗しました') + `\n[Thread ID: ${statusData.thread_id || '-'} / Run ID: ${statusData.run_id || '-'}]`,
-            messages: statusData.messages || []
-          }
-        }
+        this._updateProgressFromStatus(statusData);
+
+        const outcome = await this._buildJobOutcome(jobId, statusData);
+        if (outcome) return outcome;
 
-        await new Promise(resolve => setTimeout(resolve, 10000))
+        await new Promise(resolve => setTimeout(resolve, this._nextPollDelay(statusResponse, statusData)))
 
       } catch (error) {
         console.error(`Status polling attempt ${attempt + 1} failed:`, error)
-        if (attempt < maxAttempts - 1) {
-          await new Promise(resolve => setTimeout(resolve, 10000))
+        const delay = this._nextPollDelay(statusResponse, null);
+        if (Date.now() + delay < deadline) {
+          await new Promise(resolve => setTimeout(resolve, delay))
           continue
         }
         return {